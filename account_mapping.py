@@ -0,0 +1,256 @@
+"""Rekeningschema: grootboekrekeningen -> rubrieken van het dashboard.
+
+Een schema bestaat uit reeksen (van, tot en met, rubriek) voor alle
+administraties, plus afwijkingen per administratie. Het wordt één keer
+gecompileerd tot een gesorteerde opzoektabel, zodat een blok mutaties in
+één ``searchsorted`` naar rubriekcodes gaat. Configuratie als CSV
+(SNELSTART_ACCOUNT_MAPPING) met de kolommen Administratie (leeg = alle),
+Van, Tot en Rubriek:
+
+    Administratie;Van;Tot;Rubriek
+    ;2000;2099;Kortlopende schulden
+    A00042;4500;4599;Kostprijs van de omzet
+
+Rapport van rekeningen die buiten het schema vallen:
+
+    python account_mapping.py exports/ --schema rekeningschema.csv --out niet_gemapt.csv
+"""
+import argparse
+import hashlib
+import os
+from pathlib import Path
+
+import numpy as np
+import pandas as pd
+
+from cache import LRUCache
+
+# Rubrieken waarop grootboekmutaties worden geaggregeerd. De afgeleide regels
+# (Brutomarge, Bedrijfsresultaat, Nettowinst, kasstromen) volgen hieruit.
+LEDGER_RUBRICS = (
+    "Immateriële vaste activa",
+    "Materiële vaste activa",
+    "Financiële vaste activa",
+    "Vorderingen en overlopende activa",
+    "Liquide middelen",
+    "Eigen vermogen",
+    "Kortlopende schulden",
+    "Netto-omzet",
+    "Kostprijs van de omzet",
+    "Bedrijfskosten",
+    "Financiële baten en lasten",
+)
+
+# Standaard decimaal rekeningschema: (van, tot en met, rubriek)
+DEFAULT_ACCOUNT_RANGES = (
+    (0, 99, "Immateriële vaste activa"),
+    (100, 499, "Materiële vaste activa"),
+    (500, 599, "Financiële vaste activa"),
+    (600, 799, "Eigen vermogen"),
+    (1000, 1099, "Liquide middelen"),
+    (1100, 1399, "Vorderingen en overlopende activa"),
+    (1400, 1999, "Kortlopende schulden"),
+    (4000, 4999, "Bedrijfskosten"),
+    (7000, 7999, "Kostprijs van de omzet"),
+    (8000, 8999, "Netto-omzet"),
+    (9000, 9999, "Financiële baten en lasten"),
+)
+
+# Rubriekcode voor een rekening buiten het schema
+UNMAPPED = -1
+
+# Rekeningnummers per schema in een eigen blok van de opzoektabel
+ACCOUNT_STRIDE = 1 << 40
+
+# Kolomnamen in het configuratiebestand -> interne namen
+MAPPING_COLUMNS = {
+    "administratie": "entity",
+    "administratiecode": "entity",
+    "van": "start",
+    "rekening": "start",
+    "grootboekrekening": "start",
+    "tot": "end",
+    "tot en met": "end",
+    "t/m": "end",
+    "rubriek": "rubric",
+}
+
+# Ingelezen configuratiebestanden per (pad, grootte, mtime)
+mapping_cache = LRUCache("rekeningschema", maxsize=4)
+
+
+def _validate(rules):
+    checked = []
+    for start, end, rubric in rules:
+        start, end = int(start), int(end)
+        if rubric not in LEDGER_RUBRICS:
+            raise ValueError(f"Onbekende rubriek in rekeningschema: {rubric!r}")
+        if not 0 <= start <= end < ACCOUNT_STRIDE:
+            raise ValueError(f"Ongeldige rekeningreeks in rekeningschema: {start}-{end}")
+        checked.append((start, end, rubric))
+    return tuple(checked)
+
+
+def _segments(rules):
+    # Stuksgewijs constante rubriekcode over de rekeningnummers: grenzen op
+    # elk begin en elk einde+1, latere regels overschrijven eerdere
+    bounds = np.unique(np.array([0] + [b for start, end, _ in rules for b in (start, end + 1)], dtype=np.int64))
+    bounds = bounds[bounds < ACCOUNT_STRIDE]
+    codes = np.full(len(bounds), UNMAPPED, dtype=np.int8)
+    for start, end, rubric in rules:
+        codes[(bounds >= start) & (bounds <= end)] = LEDGER_RUBRICS.index(rubric)
+    # Aangrenzende segmenten met dezelfde rubriek samenvoegen
+    keep = np.r_[True, codes[1:] != codes[:-1]]
+    return bounds[keep], codes[keep]
+
+
+class AccountMapping:
+    """Gecompileerd rekeningschema: standaardreeksen plus afwijkingen per administratie.
+
+    Afwijkingen gaan voor op de standaardreeksen; binnen een lijst wint een
+    latere regel van een eerdere. ``key`` identificeert de inhoud (voor
+    cachesleutels), onafhankelijk van waar het schema vandaan komt.
+    """
+
+    def __init__(self, ranges=DEFAULT_ACCOUNT_RANGES, overrides=None):
+        self.ranges = _validate(ranges)
+        self.overrides = {str(entity): _validate(rules) for entity, rules in sorted((overrides or {}).items())}
+        self.key = hashlib.blake2b(repr((self.ranges, self.overrides)).encode(), digest_size=8).hexdigest()
+
+        # Schema 0 is het standaardschema; administraties met afwijkingen
+        # krijgen elk een eigen blok van ACCOUNT_STRIDE rekeningnummers
+        self._profile_entities = pd.Index(list(self.overrides), dtype=object)
+        bounds, codes = [], []
+        for profile, rules in enumerate([self.ranges, *(self.ranges + extra for extra in self.overrides.values())]):
+            profile_bounds, profile_codes = _segments(rules)
+            bounds.append(profile_bounds + profile * ACCOUNT_STRIDE)
+            codes.append(profile_codes)
+        self._bounds = np.concatenate(bounds)
+        self._codes = np.concatenate(codes)
+
+    def __repr__(self):
+        return f"AccountMapping({len(self.ranges)} reeksen, {len(self.overrides)} administraties met afwijkingen)"
+
+    def _profiles(self, entities):
+        # Schemanummer per rij; alleen de unieke administraties worden opgezocht
+        if not self.overrides or entities is None:
+            return 0
+        codes, uniques = pd.factorize(np.asarray(entities, dtype=object))
+        profiles = self._profile_entities.get_indexer(uniques) + 1
+        return np.where(codes >= 0, profiles[codes], 0)
+
+    def classify(self, accounts, entities=None):
+        """Rubriekcodes (index in LEDGER_RUBRICS, ``UNMAPPED`` erbuiten) als int8-array."""
+        numbers = pd.to_numeric(pd.Series(accounts), errors="coerce").to_numpy(dtype=np.float64, na_value=np.nan)
+        valid = (numbers >= 0) & (numbers < ACCOUNT_STRIDE)
+        keys = np.where(valid, numbers, 0).astype(np.int64) + np.asarray(self._profiles(entities), dtype=np.int64) * ACCOUNT_STRIDE
+        codes = self._codes[np.searchsorted(self._bounds, keys, side="right") - 1]
+        return np.where(valid, codes, UNMAPPED).astype(np.int8)
+
+    def categorical(self, accounts, entities=None):
+        return pd.Categorical.from_codes(self.classify(accounts, entities), categories=LEDGER_RUBRICS)
+
+    def rules(self, entity=None):
+        # Geldende regels voor één administratie (of het standaardschema) als tabel
+        rules = self.ranges + self.overrides.get(entity, ())
+        return pd.DataFrame(rules, columns=["Van", "Tot", "Rubriek"])
+
+
+DEFAULT_MAPPING = AccountMapping()
+
+
+def as_mapping(mapping):
+    # Losse reeksen (zoals vroeger ``ranges``) worden een schema zonder afwijkingen
+    if mapping is None:
+        return DEFAULT_MAPPING
+    if isinstance(mapping, AccountMapping):
+        return mapping
+    return AccountMapping(mapping)
+
+
+def mapping_from_frame(frame):
+    """Schema uit een tabel met Administratie (optioneel), Van, Tot (optioneel) en Rubriek.
+
+    Regels zonder administratie vullen het standaardschema aan (en gaan voor
+    op de standaardreeksen); regels met een administratie gelden alleen daar.
+    """
+    frame = frame.rename(columns=lambda c: MAPPING_COLUMNS.get(str(c).strip().lower(), str(c).strip().lower()))
+    missing = {"start", "rubric"} - set(frame.columns)
+    if missing:
+        raise ValueError(f"Rekeningschema mist kolommen: {', '.join(sorted(missing))}")
+
+    start = pd.to_numeric(frame["start"], errors="raise").astype(np.int64)
+    end = pd.to_numeric(frame["end"], errors="raise").fillna(start).astype(np.int64) if "end" in frame else start
+    entity = frame["entity"].astype("string").str.strip().fillna("") if "entity" in frame else pd.Series("", index=frame.index)
+    rubric = frame["rubric"].astype("string").str.strip()
+
+    ranges, overrides = list(DEFAULT_ACCOUNT_RANGES), {}
+    for code, first, last, name in zip(entity, start, end, rubric):
+        rule = (int(first), int(last), name)
+        if code:
+            overrides.setdefault(code, []).append(rule)
+        else:
+            ranges.append(rule)
+    return AccountMapping(ranges, overrides)
+
+
+def load_mapping(path):
+    path = Path(path)
+    stat = path.stat()
+
+    def read():
+        if path.suffix.lower() in (".xlsx", ".xlsm"):
+            frame = pd.read_excel(path, dtype=object)
+        else:
+            frame = pd.read_csv(path, sep=None, engine="python", dtype=str, encoding="utf-8-sig")
+        return mapping_from_frame(frame)
+
+    return mapping_cache.get_or_create((str(path.resolve()), stat.st_size, stat.st_mtime_ns), read)
+
+
+def mapping_from_env():
+    path = os.environ.get("SNELSTART_ACCOUNT_MAPPING", "")
+    return load_mapping(path) if path else DEFAULT_MAPPING
+
+
+def unmapped_report(unmapped, entities=None):
+    """Niet-gemapte rekeningen, grootste saldo eerst.
+
+    ``unmapped`` komt uit ``LedgerAggregate.unmapped`` (administratie,
+    rekening, aantal mutaties, saldo in centen).
+    """
+    if entities is not None:
+        unmapped = unmapped[unmapped["entity"].isin(list(entities))]
+    order = np.argsort(-np.abs(unmapped["cents"].to_numpy()), kind="stable")
+    unmapped = unmapped.iloc[order]
+    return pd.DataFrame({
+        "Administratie": unmapped["entity"].to_numpy(dtype=object),
+        "Grootboekrekening": unmapped["account"].to_numpy(dtype=object),
+        "Mutaties": unmapped["rows"].to_numpy(),
+        "Saldo": unmapped["cents"].to_numpy() / 100,
+    })
+
+
+def main(argv=None):
+    from ingest import ingest_exports
+
+    parser = argparse.ArgumentParser(description="Rapport van grootboekrekeningen buiten het rekeningschema")
+    parser.add_argument("exports", nargs="+", help="exportbestanden of mappen")
+    parser.add_argument("--schema", help="rekeningschema (CSV/Excel); standaard SNELSTART_ACCOUNT_MAPPING")
+    parser.add_argument("--out", help="rapport als CSV in plaats van op het scherm")
+    args = parser.parse_args(argv)
+
+    mapping = load_mapping(args.schema) if args.schema else mapping_from_env()
+    aggregate = ingest_exports(args.exports, mapping=mapping)
+    report = unmapped_report(aggregate.unmapped)
+    print(f"{len(report)} rekeningen buiten het schema ({int(report['Mutaties'].sum())} van "
+          f"{aggregate.rows_read} mutaties)")
+    if args.out:
+        report.to_csv(args.out, index=False, sep=";", decimal=",")
+    else:
+        print(report.head(50).to_string(index=False))
+    return 1 if len(report) else 0
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
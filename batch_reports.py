@@ -0,0 +1,89 @@
+"""Maak KERNCIJFERS/RATIO'S-rapporten voor veel administraties tegelijk, buiten Streamlit.
+
+Voorbeeld:
+
+    python batch_reports.py --out rapporten --workers 8
+    python batch_reports.py --exports exports/ --years 2024 --entities A1 A2
+"""
+import argparse
+import os
+import time
+from concurrent.futures import ProcessPoolExecutor
+from pathlib import Path
+
+from dataset import load_dataset
+from ingest import export_paths_from_env
+from reports import build_report, report_filename
+
+# Per worker-proces één keer geladen (bij exports: memory-mapped, gedeelde pagina's)
+_store = None
+
+
+def _init_worker(export_paths):
+    global _store
+    _store = load_dataset(export_paths)
+
+
+def _write_reports(jobs, out_dir):
+    written = 0
+    for entity, year in jobs:
+        path = Path(out_dir) / report_filename(entity, year)
+        path.write_text(build_report(_store, entity, year), encoding="utf-8")
+        written += 1
+    return written
+
+
+def report_jobs(store, entities=None, years=None):
+    jobs = []
+    for entity in entities or store.entities:
+        for year in years or store.years:
+            # Alleen jaren waarin de administratie cijfers heeft
+            if store.has(entity, year, "Netto-omzet"):
+                jobs.append((entity, str(year)))
+    return jobs
+
+
+def generate_reports(out_dir, export_paths=(), entities=None, years=None, workers=None, batch_size=250):
+    out_dir = Path(out_dir)
+    out_dir.mkdir(parents=True, exist_ok=True)
+    export_paths = tuple(export_paths)
+
+    started = time.perf_counter()
+    store = load_dataset(export_paths)
+    jobs = report_jobs(store, entities, years)
+    batches = [jobs[i:i + batch_size] for i in range(0, len(jobs), batch_size)]
+
+    workers = min(workers or os.cpu_count() or 1, max(len(batches), 1))
+    if workers == 1:
+        _init_worker(export_paths)
+        written = sum(_write_reports(batch, out_dir) for batch in batches)
+    else:
+        with ProcessPoolExecutor(max_workers=workers, initializer=_init_worker, initargs=(export_paths,)) as pool:
+            written = sum(pool.map(_write_reports, batches, [out_dir] * len(batches)))
+
+    elapsed = time.perf_counter() - started
+    return {
+        "reports": written,
+        "seconds": elapsed,
+        "per_second": written / elapsed if elapsed else float("inf"),
+        "workers": workers,
+    }
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--out", default="rapporten", help="map voor de rapporten")
+    parser.add_argument("--exports", nargs="*", default=None, help="exportbestanden of -mappen (standaard SNELSTART_EXPORTS)")
+    parser.add_argument("--entities", nargs="*", default=None, help="administraties (standaard alle)")
+    parser.add_argument("--years", nargs="*", default=None, help="jaren (standaard alle)")
+    parser.add_argument("--workers", type=int, default=None, help="aantal processen (standaard aantal cores)")
+    args = parser.parse_args(argv)
+
+    export_paths = args.exports if args.exports is not None else export_paths_from_env()
+    stats = generate_reports(args.out, export_paths, args.entities, args.years, args.workers)
+    print(f"{stats['reports']} rapporten in {stats['seconds']:.2f}s "
+          f"({stats['per_second']:.0f}/s, {stats['workers']} processen) -> {args.out}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,530 @@
+"""Benchmarks voor laden, ratio's, figuren en volledige reruns op synthetische data.
+
+Voorbeeld:
+
+    python benchmarks.py                              # volledig raster, 1-10.000 administraties x 3-50 jaar
+    python benchmarks.py --entities 1 100 --years 3 10 --no-rerun
+    python benchmarks.py --compare benchmark-results/vorige.json
+    python benchmarks.py --entities 100 --years 10 --only ratios figures
+
+Draait volledig offline. Resultaten gaan naar een JSON-bestand (één record
+per datasetgrootte), zodat runs van verschillende versies te vergelijken zijn.
+Een nieuwe meting is een functie ``bench_x(case)`` met ``@benchmark("x")``.
+"""
+import argparse
+import json
+import os
+import platform
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+from datetime import datetime
+from functools import cached_property
+from pathlib import Path
+
+ROOT = Path(__file__).resolve().parent
+APP = ROOT / "snelstart-dashboard-improved.py"
+
+DEFAULT_ENTITIES = (1, 10, 100, 1_000, 10_000)
+DEFAULT_YEARS = (3, 10, 50)
+DEFAULT_MAX_LEDGER_ROWS = 1_000_000
+# Grotere datasets duren via de (sequentiële) API-sync te lang voor een benchmark
+MAX_SYNC_ENTITIES = 1_000
+
+# Koude start: importtijd van de dashboardmodules en tijd tot de eerste
+# weergave (titel), gemeten vanaf het starten van het proces
+STARTUP_BUDGET = {"import_s": 2.0, "first_paint_s": 3.0}
+
+# Modules die het dashboard bij het opstarten importeert
+APP_MODULES = (
+    "streamlit", "pandas", "dataset", "disk_cache", "figures", "formatting", "ingest",
+    "presentation", "profiling", "ratios", "recommendations", "reports", "timeseries", "warmup",
+    "workbook_export",
+)
+
+_STARTUP_SCRIPT = """
+import importlib, json, sys, time
+started = time.perf_counter()
+for name in {modules!r}:
+    importlib.import_module(name)
+import_s = time.perf_counter() - started
+deferred = {{name: name not in sys.modules for name in ("plotly.express", "pyarrow", "openpyxl")}}
+
+from streamlit.testing.v1 import AppTest
+app = AppTest.from_file({app!r}, default_timeout={timeout!r})
+app.run()
+print(json.dumps({{"import_s": import_s, "deferred": deferred, "exception": bool(app.exception)}}))
+"""
+
+# Figuren per tab van het dashboard
+TAB_FIGURES = {
+    "Dashboard": ("omzet_winst", "winstgevendheid"),
+    "Financiële Analyse": ("activa", "passiva"),
+    "Trends": ("trends", "kasstroom"),
+    "Aanbevelingen": ("benchmark",),
+}
+
+
+# Kerncijfers per datasetgrootte op de console: (meting, sleutel, label, schaal)
+SUMMARY = (
+    ("load", "warm_load_s", "laden {:.1f} ms", 1000),
+    ("ratios", "frame_s", "ratio's {:.1f} ms", 1000),
+    ("rerun", "first_run_s", "eerste rerun {:.2f}s", 1),
+)
+
+
+def _timed(fn, repeat=1):
+    # Mediaan van ``repeat`` runs in seconden, plus de laatste uitkomst
+    times, result = [], None
+    for _ in range(repeat):
+        started = time.perf_counter()
+        result = fn()
+        times.append(time.perf_counter() - started)
+    return statistics.median(times), result
+
+
+def _environment():
+    import numpy
+    import pandas
+    import plotly
+    import streamlit
+
+    try:
+        commit = subprocess.run(
+            ["git", "rev-parse", "--short", "HEAD"], cwd=ROOT, capture_output=True, text=True, check=True
+        ).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        commit = None
+    return {
+        "commit": commit,
+        "timestamp": datetime.now().isoformat(timespec="seconds"),
+        "python": platform.python_version(),
+        "platform": platform.platform(),
+        "cpu_count": os.cpu_count(),
+        "packages": {
+            "numpy": numpy.__version__,
+            "pandas": pandas.__version__,
+            "plotly": plotly.__version__,
+            "streamlit": streamlit.__version__,
+        },
+    }
+
+
+def bench_startup(repeat, timeout):
+    with tempfile.TemporaryDirectory(prefix="snelstart-bench-") as workdir:
+        metrics = Path(workdir) / "reruns.jsonl"
+        # Ingebouwde cijfers, lege caches, eigen metrics-bestand
+        env = dict(os.environ, SNELSTART_EXPORTS="", SNELSTART_CACHE_DIR=str(Path(workdir) / "cache"),
+                   SNELSTART_METRICS_FILE=str(metrics))
+        script = _STARTUP_SCRIPT.format(modules=APP_MODULES, app=str(APP), timeout=timeout)
+
+        runs = []
+        for _ in range(repeat):
+            launched = time.time()
+            output = subprocess.run(
+                [sys.executable, "-c", script], cwd=ROOT, env=env, capture_output=True, text=True, check=True
+            ).stdout
+            run = json.loads(output.strip().splitlines()[-1])
+            if run["exception"]:
+                raise RuntimeError("Dashboard faalde bij de koude start")
+            record = json.loads(metrics.read_text(encoding="utf-8").strip().splitlines()[-1])
+            run["first_paint_s"] = record["timestamp"] + record["marks_ms"]["eerste weergave"] / 1000 - launched
+            runs.append(run)
+
+    results = {
+        "import_s": statistics.median(r["import_s"] for r in runs),
+        "first_paint_s": statistics.median(r["first_paint_s"] for r in runs),
+        "deferred": runs[-1]["deferred"],
+        "budget": STARTUP_BUDGET,
+    }
+    results["within_budget"] = all(results[key] <= limit for key, limit in STARTUP_BUDGET.items())
+    return results
+
+
+class Case:
+    # Eén datasetgrootte: synthetische store plus (als het aantal mutaties het
+    # toelaat) exports in een tijdelijke werkmap
+    def __init__(self, n_entities, n_years, args, workdir):
+        from synthetic_data import ledger_rows, synthetic_store, write_synthetic_exports
+
+        self.args = args
+        self.n_entities, self.n_years = n_entities, n_years
+        self.repeat = args.repeat
+        self.workdir = workdir
+        self.store = synthetic_store(n_entities, n_years, seed=args.seed)
+        # Eerste administratie met cijfers in het laatste jaar
+        self.entity = next(e for e in self.store.entities if self.store.has(e, self.store.years[-1], "Netto-omzet"))
+        self.year = self.store.years[-1]
+
+        self.rows = ledger_rows(n_entities, n_years)
+        self.export_paths, self.ledger = [], None
+        if self.rows <= args.max_ledger_rows:
+            write_s, self.export_paths = _timed(
+                lambda: write_synthetic_exports(workdir / "exports", n_entities, n_years, seed=args.seed)
+            )
+            self.ledger = {"rows": self.rows, "write_s": write_s}
+
+    @cached_property
+    def daily(self):
+        from disk_cache import entry_dir, fingerprint, load_daily, load_or_ingest
+
+        if not self.export_paths:
+            return None
+        # Zet de cache-entry neer als ``load`` niet gedraaid heeft
+        load_or_ingest(self.export_paths)
+        return load_daily(entry_dir(fingerprint(self.export_paths)))[0]
+
+
+# Metingen per datasetgrootte, in deze volgorde; ``when(case)`` slaat een
+# meting over als die voor de dataset niet zinvol of te duur is
+BENCHMARKS = {}
+
+
+def benchmark(name, when=None):
+    def register(fn):
+        BENCHMARKS[name] = (fn, when)
+        return fn
+    return register
+
+
+def _per_call_us(fn, items, repeat):
+    # Gemiddelde tijd per aanroep in microseconden
+    seconds, _ = _timed(lambda: [fn(item) for item in items], repeat)
+    return seconds / len(items) * 1e6
+
+
+def _spec(build, repeat):
+    # Ongecached: opbouw plus JSON-serialisatie, zoals bij een cache-miss
+    seconds, spec = _timed(lambda: build().to_json(), repeat)
+    return {"build_s": seconds, "spec_bytes": len(spec)}
+
+
+@benchmark("load")
+def bench_load(case):
+    from disk_cache import load_or_ingest, load_store, save_store
+
+    store, repeat = case.store, case.repeat
+    results = {"store_mb": store.nbytes / 1e6}
+    store_dir = case.workdir / "store"
+    store_dir.mkdir(exist_ok=True)
+    results["cache_write_s"], _ = _timed(lambda: save_store(store, store_dir))
+    results["warm_load_s"], _ = _timed(lambda: load_store(store_dir), repeat)
+
+    if case.export_paths:
+        # Koud: exports inlezen en de cache-entry schrijven; warm: cache-hit
+        results["ingest_s"], _ = _timed(lambda: load_or_ingest(case.export_paths))
+        results["load_or_ingest_warm_s"], _ = _timed(lambda: load_or_ingest(case.export_paths), repeat)
+        results["ingest_rows_per_s"] = case.rows / results["ingest_s"]
+    return results
+
+
+@benchmark("ratios")
+def bench_ratios(case):
+    from health import build_health, health, portfolio_alerts
+    from ratios import build_ratio_frame, ratio_frame, ratios_for
+
+    store, repeat = case.store, case.repeat
+    cells = len(store.entities) * len(store.years)
+    frame_s, _ = _timed(lambda: build_ratio_frame(store), repeat)
+    ratio_frame(store)
+
+    # Gezondheidsregels over alle cellen plus de signalenlijst van één jaar
+    health_s, _ = _timed(lambda: build_health(store), repeat)
+    health(store)
+    alerts_s, _ = _timed(lambda: portfolio_alerts(store, case.year, limit=50), repeat)
+    return {
+        "frame_s": frame_s,
+        "entity_years_per_s": cells / frame_s if frame_s else None,
+        # Losse opvragingen zoals de sidebar en rapporten ze doen
+        "ratios_for_us": _per_call_us(
+            lambda cell: ratios_for(store, *cell),
+            [(e, y) for e in store.entities[:100] for y in store.years], repeat,
+        ),
+        "health_s": health_s,
+        "alerts_s": alerts_s,
+    }
+
+
+@benchmark("peers")
+def bench_peers(case):
+    from peer_benchmarks import build_peer_benchmarks, peer_benchmarks, peer_comparison
+
+    store, year = case.store, case.year
+    build_s, benchmarks = _timed(lambda: build_peer_benchmarks(store), case.repeat)
+    peer_benchmarks(store)
+    peer_comparison(store, case.entity, year)
+
+    # Rangopvragingen zoals de benchmarkgrafiek ze doet, na de eerste opbouw
+    lookups = [e for e in store.entities[:100] if store.has(e, year, "Netto-omzet")]
+    return {
+        "build_s": build_s,
+        "sketches": len(benchmarks.sketches),
+        "comparison_us": _per_call_us(lambda e: peer_comparison(store, e, year), lookups, case.repeat),
+    }
+
+
+@benchmark("mapping")
+def bench_mapping(case, rows=2_000_000):
+    import numpy as np
+
+    from account_mapping import DEFAULT_ACCOUNT_RANGES, AccountMapping
+
+    # Rubriekcodes voor ``rows`` mutaties: standaardschema en met afwijkingen
+    # voor één op de tien administraties
+    store, repeat = case.store, case.repeat
+    rng = np.random.default_rng(0)
+    accounts = rng.integers(0, 10_000, rows)
+    entities = np.array(store.entities, dtype=object)[rng.integers(0, len(store.entities), rows)]
+    overrides = {e: [(4000, 4099, "Kostprijs van de omzet")] for e in store.entities[::10]}
+    compile_s, mapping = _timed(lambda: AccountMapping(DEFAULT_ACCOUNT_RANGES, overrides), repeat)
+    default_s, _ = _timed(lambda: AccountMapping().classify(accounts), repeat)
+    override_s, _ = _timed(lambda: mapping.classify(accounts, entities), repeat)
+    return {
+        "rows": rows,
+        "overrides": len(overrides),
+        "compile_s": compile_s,
+        "default_rows_per_s": rows / default_s,
+        "override_rows_per_s": rows / override_s,
+    }
+
+
+@benchmark("scenarios")
+def bench_scenarios(case):
+    from scenarios import build_scenario, historical_assumptions
+
+    # Ongecached, zoals bij elke slideraanpassing in de Aanbevelingen-tab
+    assumptions = historical_assumptions(case.store, case.entity, case.year)
+    seconds, _ = _timed(lambda: build_scenario(case.store, case.entity, case.year, assumptions), case.repeat)
+    return {"paths": assumptions.paths, "horizon": assumptions.horizon, "build_s": seconds}
+
+
+@benchmark("figures")
+def bench_figures(case):
+    from figures import FIGURES, timeseries_figure
+
+    store, entity, year = case.store, case.entity, case.year
+    results = {}
+    for tab, figure_ids in TAB_FIGURES.items():
+        results[tab] = {
+            figure_id: _spec(lambda: FIGURES[figure_id][0](store, entity, year), case.repeat)
+            for figure_id in figure_ids
+            if figure_id != "kasstroom" or store.has(entity, year, "Netto kasstroom")
+        }
+    if case.daily is not None:
+        results["Trends"]["tijdreeks"] = _spec(lambda: timeseries_figure(case.daily, entity, "Dag"), case.repeat)
+    return results
+
+
+@benchmark("excel")
+def bench_excel(case, max_entities=100):
+    import tracemalloc
+
+    from workbook_export import write_workbook
+
+    # Excel-export van (hooguit) ``max_entities`` administraties; de doorvoer
+    # in rijen/s geldt ook voor de hele portefeuille, het geheugen moet vlak blijven
+    entities = case.store.entities[:max_entities]
+    path = case.workdir / "export.xlsx"
+    seconds, counts = _timed(lambda: write_workbook(case.store, path, entities, case.daily))
+    tracemalloc.start()
+    write_workbook(case.store, path, entities, case.daily)
+    peak = tracemalloc.get_traced_memory()[1]
+    tracemalloc.stop()
+    rows = sum(counts.values())
+    return {
+        "entities": len(entities),
+        "rows": rows,
+        "write_s": seconds,
+        "rows_per_s": rows / seconds,
+        "file_bytes": path.stat().st_size,
+        "peak_mb": peak / 1e6,
+    }
+
+
+@benchmark("sync", when=lambda case: case.args.sync and case.n_entities <= MAX_SYNC_ENTITIES)
+def bench_sync(case):
+    import asyncio
+
+    from snelstart_stub import StubData, start_stub
+    from snelstart_sync import AggregateWriter, SyncConfig, sync
+
+    latency = case.args.sync_latency
+
+    # API-sync tegen de lokale stub (zelfde proces), sequentieel en parallel
+    async def run(**options):
+        runner, url = await start_stub(StubData(case.n_entities, case.n_years, seed=case.args.seed), latency=latency)
+        try:
+            writer = AggregateWriter()
+            stats = await sync(SyncConfig(base_url=url, rate_limit=10_000, **options), writer)
+            writer.flush()
+        finally:
+            await runner.cleanup()
+        return stats
+
+    results = {"latency_s": latency}
+    for name, options in [("sequential", {"concurrency": 1, "page_window": 1}), ("concurrent", {})]:
+        stats = asyncio.run(run(**options))
+        results[f"{name}_s"] = stats.seconds
+        results[f"{name}_requests"] = stats.requests
+    return results
+
+
+def _restore(app, section):
+    # AppTest houdt na een fragment-rerun alleen de fragmentuitvoer vast (en
+    # stuurt dus de overige widgetwaarden niet mee); volledige run terug
+    app.run()
+    app.radio(key="section").set_value(section).run()
+
+
+def _script_ms(run):
+    # Scripttijd van de (fragment-)reruns die ``run`` veroorzaakt, uit de
+    # rerun-profielen; zonder de vaste overhead van AppTest zelf
+    from profiling import metrics_file
+
+    path = metrics_file()
+    offset = path.stat().st_size if path.exists() else 0
+    run()
+    if path.stat().st_size < offset:
+        # Tussendoor geroteerd (zie METRICS_MAX_BYTES)
+        offset = 0
+    with open(path, encoding="utf-8") as handle:
+        handle.seek(offset)
+        records = [json.loads(line) for line in handle if line.strip()]
+    return sum(r["total_ms"] for r in records), sorted({r["scope"] for r in records})
+
+
+@benchmark("rerun", when=lambda case: case.args.rerun and case.export_paths)
+def bench_rerun(case):
+    from streamlit.testing.v1 import AppTest
+
+    repeat = case.repeat
+    os.environ["SNELSTART_EXPORTS"] = str(case.workdir / "exports")
+    os.environ["SNELSTART_CACHE_DIR"] = str(case.workdir / "cache")
+
+    app = AppTest.from_file(str(APP), default_timeout=case.args.timeout)
+    first_s, _ = _timed(app.run)
+    if app.exception:
+        raise RuntimeError(f"Dashboard faalde: {app.exception}")
+
+    sections, section_ms, year_changes = {}, {}, {}
+    for section in app.radio(key="section").options:
+        app.radio(key="section").set_value(section)
+        sections[section] = _timed(app.run, repeat)[0]
+        if app.exception:
+            raise RuntimeError(f"Sectie {section} faalde: {app.exception}")
+        section_ms[section], _ = _script_ms(app.run)
+
+        # Jaarwissel (tussen twee al berekende jaren): alleen de fragmenten
+        # die het jaar lezen draaien opnieuw
+        years = app.selectbox(key="year").options
+        if len(years) > 1:
+            app.selectbox(key="year").select(years[1]).run()
+            _restore(app, section)
+            other = next(y for y in years[:2] if y != app.selectbox(key="year").value)
+            app.selectbox(key="year").select(other)
+            script_ms, scopes = _script_ms(app.run)
+            if app.exception:
+                raise RuntimeError(f"Jaarwissel in {section} faalde: {app.exception}")
+            year_changes[section] = {"script_ms": script_ms, "reruns": scopes}
+            _restore(app, section)
+    return {"first_run_s": first_s, "sections_s": sections, "sections_script_ms": section_ms,
+            "year_change": year_changes}
+
+
+def run_case(n_entities, n_years, args):
+    record = {"entities": n_entities, "years": n_years}
+    with tempfile.TemporaryDirectory(prefix="snelstart-bench-") as workdir:
+        workdir = Path(workdir)
+        os.environ["SNELSTART_CACHE_DIR"] = str(workdir / "cache")
+        case = Case(n_entities, n_years, args, workdir)
+        if case.ledger:
+            record["ledger"] = case.ledger
+        for name, (bench, when) in BENCHMARKS.items():
+            if (not args.only or name in args.only) and (when is None or when(case)):
+                record[name] = bench(case)
+    return record
+
+
+def _flatten(value, prefix=""):
+    if isinstance(value, dict):
+        for key, child in value.items():
+            yield from _flatten(child, f"{prefix}{key}.")
+    elif isinstance(value, (int, float)):
+        # Alleen tijden (``*_s``), geen doorvoer (``*_per_s``)
+        parts = prefix[:-1].split(".")
+        if any(p.endswith("_s") and not p.endswith("_per_s") for p in parts):
+            yield prefix[:-1], value
+
+
+def compare(results, baseline, threshold=0.2):
+    # Tijden die meer dan ``threshold`` trager zijn dan de baseline
+    previous = {(r["entities"], r["years"]): dict(_flatten(r)) for r in baseline["results"]}
+    regressions = []
+    for record in results["results"]:
+        before = previous.get((record["entities"], record["years"]), {})
+        for metric, seconds in _flatten(record):
+            old = before.get(metric)
+            if old and seconds > old * (1 + threshold) and seconds - old > 0.001:
+                regressions.append((record["entities"], record["years"], metric, old, seconds))
+    return regressions
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--entities", type=int, nargs="*", default=list(DEFAULT_ENTITIES), help="aantallen administraties")
+    parser.add_argument("--years", type=int, nargs="*", default=list(DEFAULT_YEARS), help="aantallen jaren")
+    parser.add_argument("--repeat", type=int, default=3, help="herhalingen per meting (mediaan)")
+    parser.add_argument("--max-ledger-rows", type=int, default=DEFAULT_MAX_LEDGER_ROWS,
+                        help="grotere datasets alleen als store, zonder exports en reruns")
+    parser.add_argument("--only", nargs="*", choices=list(BENCHMARKS), default=None, help="alleen deze metingen")
+    parser.add_argument("--no-rerun", dest="rerun", action="store_false", help="geen volledige reruns via AppTest")
+    parser.add_argument("--timeout", type=float, default=300, help="timeout per rerun in seconden")
+    parser.add_argument("--sync", action="store_true", help="ook de API-sync tegen de lokale stub meten (aiohttp)")
+    parser.add_argument("--sync-latency", type=float, default=0.02, help="gesimuleerde latency per API-verzoek")
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--out", default=None, help="JSON-bestand (standaard benchmark-results/<commit>-<tijd>.json)")
+    parser.add_argument("--compare", default=None, help="eerder resultaatbestand om tegen te vergelijken")
+    parser.add_argument("--threshold", type=float, default=0.2, help="relatieve vertraging die als regressie telt")
+    args = parser.parse_args(argv)
+
+    # Metrics van de reruns niet in het metrics-bestand van het dashboard
+    os.environ.setdefault("SNELSTART_METRICS_FILE", os.path.join(tempfile.gettempdir(), "snelstart-bench-reruns.jsonl"))
+
+    results = {"environment": _environment(), "results": []}
+    results["startup"] = bench_startup(args.repeat, args.timeout)
+    startup = results["startup"]
+    print(f"Koude start: imports {startup['import_s']:.2f}s, eerste weergave {startup['first_paint_s']:.2f}s "
+          f"(budget {STARTUP_BUDGET['import_s']:.1f}s / {STARTUP_BUDGET['first_paint_s']:.1f}s)", flush=True)
+
+    for n_entities in args.entities:
+        for n_years in args.years:
+            started = time.perf_counter()
+            record = run_case(n_entities, n_years, args)
+            results["results"].append(record)
+            summary = [label.format(record[name][key] * scale) for name, key, label, scale in SUMMARY if name in record]
+            print(f"{n_entities:>6} administraties x {n_years:>2} jaar: {', '.join(summary)} "
+                  f"({time.perf_counter() - started:.1f}s)", flush=True)
+
+    environment = results["environment"]
+    out = Path(args.out or ROOT / "benchmark-results" / f"{environment['commit'] or 'lokaal'}-{datetime.now():%Y%m%d-%H%M%S}.json")
+    out.parent.mkdir(parents=True, exist_ok=True)
+    out.write_text(json.dumps(results, indent=2, ensure_ascii=False), encoding="utf-8")
+    print(f"Resultaten -> {out}")
+
+    failed = not startup["within_budget"]
+    if failed:
+        print("BUDGET OVERSCHREDEN voor de koude start")
+
+    if args.compare:
+        baseline = json.loads(Path(args.compare).read_text(encoding="utf-8"))
+        regressions = compare(results, baseline, args.threshold)
+        for n_entities, n_years, metric, old, new in regressions:
+            print(f"REGRESSIE {n_entities}x{n_years} {metric}: {old * 1000:.1f} -> {new * 1000:.1f} ms")
+        failed = failed or bool(regressions)
+    return 1 if failed else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
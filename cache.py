@@ -0,0 +1,289 @@
+import numbers
+import os
+import sys
+import threading
+import time
+from collections import OrderedDict
+
+# Gezamenlijk geheugenbudget van alle caches in het proces (MB), zodat een
+# langlopende worker niet onbegrensd groeit
+BUDGET_ENV = "SNELSTART_CACHE_BUDGET_MB"
+DEFAULT_BUDGET_MB = 1024
+
+_MISSING = object()
+
+# Levensduur (s) van de gedeelde dataset en alles wat per datasetversie
+# berekend wordt; daarna opnieuw van de cache op schijf
+DATA_TTL = 6 * 3600
+
+# Grootteschatting: zo diep in containers/objecten, en bij lange containers
+# een steekproef van zoveel elementen
+_SIZE_DEPTH = 4
+_SIZE_SAMPLE = 64
+
+
+def estimate_size(value, _depth=0):
+    """Geschatte geheugengrootte in bytes.
+
+    Arrays, frames en de store exact (buffers, zonder inhoud van
+    objectkolommen); containers en objecten recursief tot een paar niveaus
+    diep, lange containers via een steekproef.
+    """
+    if isinstance(value, (str, bytes, bytearray)):
+        return sys.getsizeof(value)
+    usage = getattr(value, "memory_usage", None)
+    if callable(usage):
+        # pandas: DataFrame geeft een Series per kolom (incl. index), Series en Index een getal
+        usage = usage()
+        return int(usage.sum() if hasattr(usage, "sum") else usage)
+    nbytes = getattr(value, "nbytes", None)
+    if isinstance(nbytes, numbers.Integral):
+        return int(nbytes)
+
+    size = sys.getsizeof(value)
+    if _depth >= _SIZE_DEPTH:
+        return size
+    if isinstance(value, dict):
+        children = [*value.keys(), *value.values()]
+    elif isinstance(value, (list, tuple, set, frozenset)):
+        children = list(value)
+    elif hasattr(value, "__dict__"):
+        children = list(vars(value).values())
+    else:
+        return size
+    sample = children[:_SIZE_SAMPLE]
+    if sample:
+        size += sum(estimate_size(child, _depth + 1) for child in sample) * len(children) // len(sample)
+    return size
+
+
+class _Entry:
+    __slots__ = ("value", "nbytes", "created", "accessed")
+
+    def __init__(self, value, nbytes):
+        self.value = value
+        self.nbytes = nbytes
+        self.created = self.accessed = time.monotonic()
+
+
+class CacheBudget:
+    """Geheugenbudget over alle caches heen.
+
+    Boven ``maxbytes`` wordt per cache het minst recent gebruikte item
+    kandidaat; daarvan gaat het item met de grootste (ongebruikte tijd x
+    grootte) eruit, zodat één groot, oud item voor veel kleine recente gaat.
+    Het zojuist toegevoegde item blijft altijd staan: een dataset die alleen
+    al groter is dan het budget verdringt de rest, niet zichzelf.
+    """
+
+    def __init__(self, maxbytes):
+        self.maxbytes = maxbytes
+        self.evictions = 0
+        self.caches = []
+        self._lock = threading.Lock()
+
+    def register(self, cache):
+        with self._lock:
+            self.caches.append(cache)
+
+    @property
+    def used(self):
+        return sum(cache.bytes for cache in self.caches)
+
+    def enforce(self, protect=None):
+        # Nooit twee cache-locks tegelijk: per kandidaat alleen die van de cache zelf
+        with self._lock:
+            while self.used > self.maxbytes:
+                now = time.monotonic()
+                best, victim = -1.0, None
+                for cache in self.caches:
+                    cache.purge_expired()
+                    # Het beschermde item overslaan, niet de hele cache
+                    oldest = cache.oldest(skip=protect[1] if protect and protect[0] is cache else _MISSING)
+                    if oldest is None:
+                        continue
+                    accessed, key, nbytes = oldest
+                    score = (now - accessed + 1e-3) * (nbytes + 1)
+                    if score > best:
+                        best, victim = score, (cache, key)
+                if victim is None:
+                    return
+                if victim[0].evict(victim[1]):
+                    self.evictions += 1
+
+    def stats(self):
+        return {
+            "budget_bytes": self.maxbytes,
+            "used_bytes": self.used,
+            "caches": len(self.caches),
+            "evictions": self.evictions,
+        }
+
+
+def budget_from_env():
+    return int(float(os.environ.get(BUDGET_ENV, DEFAULT_BUDGET_MB)) * 1e6)
+
+
+budget = CacheBudget(budget_from_env())
+
+
+class LRUCache:
+    """Thread-safe LRU cache with a bounded number of entries and hit/miss counters.
+
+    ``ttl`` (seconden) laat items na die tijd verlopen; ``sizeof`` schat de
+    grootte van een item voor het geheugenbudget (standaard het gezamenlijke
+    ``budget`` van het proces).
+    """
+
+    def __init__(self, name, maxsize=128, ttl=None, sizeof=estimate_size, budget=budget):
+        self.name = name
+        self.maxsize = maxsize
+        self.ttl = ttl
+        self.sizeof = sizeof
+        self.budget = budget
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self.expirations = 0
+        self.bytes = 0
+        self._entries = OrderedDict()
+        self._building = {}
+        self._lock = threading.Lock()
+        self.budget.register(self)
+
+    def _expired(self, entry, now):
+        return self.ttl is not None and now - entry.created > self.ttl
+
+    def _remove(self, key):
+        # Aanroepen met de lock
+        entry = self._entries.pop(key)
+        self.bytes -= entry.nbytes
+        return entry
+
+    def get(self, key, default=None):
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None:
+                now = time.monotonic()
+                if not self._expired(entry, now):
+                    self._entries.move_to_end(key)
+                    entry.accessed = now
+                    self.hits += 1
+                    return entry.value
+                self._remove(key)
+                self.expirations += 1
+            self.misses += 1
+            return default
+
+    def peek(self, key, default=None):
+        # Opvragen zonder LRU-volgorde of tellers te beïnvloeden
+        with self._lock:
+            entry = self._entries.get(key)
+            return default if entry is None else entry.value
+
+    def put(self, key, value):
+        # Grootte buiten de lock bepalen; kan bij grote objecten even duren
+        entry = _Entry(value, self.sizeof(value))
+        with self._lock:
+            if key in self._entries:
+                self._remove(key)
+            self._entries[key] = entry
+            self.bytes += entry.nbytes
+            self.purge_expired(locked=True)
+            while len(self._entries) > self.maxsize:
+                self._remove(next(iter(self._entries)))
+                self.evictions += 1
+        self.budget.enforce(protect=(self, key))
+
+    def get_or_create(self, key, factory):
+        value = self.get(key, _MISSING)
+        if value is not _MISSING:
+            return value
+        # Eén build per sleutel tegelijk: andere threads wachten op het
+        # resultaat in plaats van hetzelfde (grote) object nog eens te bouwen
+        with self._lock:
+            building = self._building.setdefault(key, threading.Lock())
+        try:
+            with building:
+                value = self.peek(key, _MISSING)
+                if value is _MISSING:
+                    value = factory()
+                    self.put(key, value)
+        finally:
+            with self._lock:
+                if self._building.get(key) is building:
+                    del self._building[key]
+        return value
+
+    def purge_expired(self, locked=False):
+        if self.ttl is None:
+            return 0
+        if not locked:
+            with self._lock:
+                return self.purge_expired(locked=True)
+        now = time.monotonic()
+        stale = [key for key, entry in self._entries.items() if self._expired(entry, now)]
+        for key in stale:
+            self._remove(key)
+        self.expirations += len(stale)
+        return len(stale)
+
+    def oldest(self, skip=_MISSING):
+        # (laatste gebruik, sleutel, grootte) van het minst recent gebruikte
+        # item, met uitzondering van ``skip``
+        with self._lock:
+            for key, entry in self._entries.items():
+                if key != skip:
+                    return entry.accessed, key, entry.nbytes
+            return None
+
+    def evict(self, key):
+        # Door het budget: alleen als het item er nog is
+        with self._lock:
+            if key not in self._entries:
+                return False
+            self._remove(key)
+            self.evictions += 1
+            return True
+
+    def invalidate(self, predicate=None):
+        with self._lock:
+            if predicate is None:
+                removed = len(self._entries)
+                self._entries.clear()
+                self.bytes = 0
+                return removed
+            stale = [key for key in self._entries if predicate(key)]
+            for key in stale:
+                self._remove(key)
+            return len(stale)
+
+    def __contains__(self, key):
+        with self._lock:
+            return key in self._entries
+
+    def __len__(self):
+        with self._lock:
+            return len(self._entries)
+
+    def stats(self):
+        with self._lock:
+            lookups = self.hits + self.misses
+            return {
+                "name": self.name,
+                "entries": len(self._entries),
+                "maxsize": self.maxsize,
+                "bytes": self.bytes,
+                "ttl": self.ttl,
+                "hits": self.hits,
+                "misses": self.misses,
+                "evictions": self.evictions,
+                "expirations": self.expirations,
+                "hit_rate": self.hits / lookups if lookups else 0.0,
+            }
+
+
+def cache_stats():
+    # Statistieken van alle caches in het proces, grootste eerst
+    return sorted((cache.stats() for cache in budget.caches), key=lambda s: -s["bytes"])
+
@@ -0,0 +1,48 @@
+from account_mapping import mapping_from_env
+from cache import DATA_TTL, LRUCache
+from demo_data import demo_store
+from disk_cache import fingerprint, load_or_ingest, load_or_ingest_daily, load_or_ingest_unmapped
+
+DEMO_VERSION = "demo"
+
+# Gedeelde, read-only datasets per (soort, exports, versie): één kopie per
+# proces voor alle sessies, binnen het cachebudget (store, dagtotalen en
+# niet-gemapte rekeningen van de huidige en vorige versie)
+dataset_cache = LRUCache("dataset", maxsize=6, ttl=DATA_TTL)
+
+
+def dataset_version(export_paths=()):
+    # Versiesleutel van de brondata: vingerafdruk van de exports (pad, grootte,
+    # mtime) en het rekeningschema, of de ingebouwde cijfers. Nieuwe of
+    # gewijzigde exports of een ander schema geven een nieuwe versie en dus
+    # een nieuwe gedeelde dataset.
+    if export_paths:
+        return fingerprint(export_paths, mapping_from_env())
+    return DEMO_VERSION
+
+
+def load_dataset(export_paths=()):
+    # Grootboekexports (SNELSTART_EXPORTS) gaan voor op de ingebouwde cijfers;
+    # ingelezen exports komen uit de cache op schijf zolang ze niet wijzigen
+    if export_paths:
+        return load_or_ingest(export_paths, mapping_from_env())
+    return demo_store()
+
+
+def load_daily_totals(export_paths):
+    # Dagtotalen per rubriek; alleen bij ingelezen grootboekexports
+    if not export_paths:
+        return None
+    return load_or_ingest_daily(export_paths, mapping_from_env())
+
+
+def load_unmapped_accounts(export_paths):
+    # Rekeningen buiten het rekeningschema; alleen bij ingelezen grootboekexports
+    if not export_paths:
+        return None
+    return load_or_ingest_unmapped(export_paths, mapping_from_env())
+
+
+def shared_dataset(kind, export_paths, version):
+    loaders = {"store": load_dataset, "daily": load_daily_totals, "unmapped": load_unmapped_accounts}
+    return dataset_cache.get_or_create((kind, tuple(export_paths), version), lambda: loaders[kind](export_paths))
@@ -0,0 +1,150 @@
+import numpy as np
+import pandas as pd
+
+from cache import DATA_TTL, LRUCache
+from ingest import BALANCE_RUBRICS, CREDIT_RUBRICS, LEDGER_RUBRICS
+from timeseries import BALANCE_METRICS, FLOW_METRICS
+
+# Meerjarige CAGR-horizonten (in jaren)
+CAGR_HORIZONS = (3, 5)
+
+# Vergelijkingen op ledgerperiodes: soort -> granulariteit
+PERIOD_DELTAS = {
+    "QoQ": "Kwartaal",
+    "MoM": "Maand",
+}
+PERIODS_PER_YEAR = {"Kwartaal": 4, "Maand": 12}
+
+PERIOD_METRICS = FLOW_METRICS + BALANCE_METRICS
+
+# Deltamatrices per dataset-versie (en granulariteit voor ledgerperiodes)
+delta_cache = LRUCache("deltas", maxsize=8, ttl=DATA_TTL)
+
+
+def growth(current, previous):
+    # Procentuele verandering t.o.v. |vorige|, zodat het teken altijd de
+    # richting aangeeft (ook bij een negatieve basis); NaN zonder basis
+    current = np.asarray(current, dtype=np.float64)
+    previous = np.asarray(previous, dtype=np.float64)
+    out = np.full(np.broadcast(current, previous).shape, np.nan)
+    np.divide(current - previous, np.abs(previous), out=out, where=(previous != 0) & ~np.isnan(previous))
+    return out * 100
+
+
+def lag_positions(periods, lag=1):
+    # Positie van periode - lag op de as, -1 waar die niet bestaat
+    periods = np.asarray(periods, dtype=np.int64)
+    order = np.argsort(periods)
+    found = np.searchsorted(periods, periods - lag, sorter=order)
+    found = np.minimum(found, len(periods) - 1)
+    positions = order[found]
+    return np.where(periods[positions] == periods - lag, positions, -1)
+
+
+def _lagged(values, positions):
+    # values[:, positions] met NaN waar de vergelijkingsperiode ontbreekt
+    lagged = values[:, np.maximum(positions, 0)]
+    lagged[:, positions < 0] = np.nan
+    return lagged
+
+
+def build_year_deltas(store):
+    """YoY en CAGR voor elke administratie, elk jaar en elke rubriek tegelijk.
+
+    Alle arrays hebben de vorm van de store (entity x jaar x rubriek); NaN waar
+    een van beide jaren niet gerapporteerd is.
+    """
+    values = np.where(store.present, store.values / 100, np.nan)
+    years = [int(y) for y in store.years]
+
+    deltas = {"YoY": growth(values, _lagged(values, lag_positions(years, 1)))}
+    for horizon in CAGR_HORIZONS:
+        start = _lagged(values, lag_positions(years, horizon))
+        # CAGR is alleen gedefinieerd tussen twee positieve standen
+        valid = (start > 0) & (values > 0)
+        ratio = np.divide(values, start, out=np.ones_like(values), where=valid)
+        cagr = (ratio ** (1 / horizon) - 1) * 100
+        deltas[f"CAGR {horizon}j"] = np.where(valid, cagr, np.nan)
+    return deltas
+
+
+def year_deltas(store):
+    return delta_cache.get_or_create(("jaar", store.version), lambda: build_year_deltas(store))
+
+
+def delta(store, entity, year, item, kind="YoY"):
+    # Eén voorberekende cel; None als er geen vergelijking mogelijk is
+    value = year_deltas(store)[kind][store.entity_index(entity), store.year_index(year), store.item_index(item)]
+    return None if np.isnan(value) else float(value)
+
+
+def build_period_deltas(daily, granularity):
+    """Periodewaarden en groei t.o.v. de vorige periode voor alle
+    administraties tegelijk, in lange vorm (één rij per administratie en
+    periode met boekingen)."""
+    per_year = PERIODS_PER_YEAR[granularity]
+    dates = daily["date"]
+    months_per_period = 12 // per_year
+    period = dates.dt.year.to_numpy() * per_year + (dates.dt.month.to_numpy() - 1) // months_per_period
+
+    signs = np.array([-1 if r in CREDIT_RUBRICS else 1 for r in LEDGER_RUBRICS])
+    rubric = pd.Categorical(daily["rubric"], categories=LEDGER_RUBRICS)
+    amounts = daily["cents"].to_numpy() * signs[rubric.codes] / 100
+
+    wide = (
+        pd.DataFrame({"entity": daily["entity"].to_numpy(), "period": period, "rubric": rubric, "amount": amounts})
+        .groupby(["entity", "period", "rubric"], observed=False, sort=True)["amount"].sum()
+        .unstack("rubric")
+        .fillna(0)
+    )
+    wide = wide[wide.abs().sum(axis=1) != 0]
+
+    frame = pd.DataFrame(index=wide.index)
+    frame["Netto-omzet"] = wide["Netto-omzet"]
+    frame["Brutomarge"] = wide["Netto-omzet"] - wide["Kostprijs van de omzet"]
+    frame["Bedrijfskosten"] = wide["Bedrijfskosten"]
+    frame["Bedrijfsresultaat"] = frame["Brutomarge"] - frame["Bedrijfskosten"]
+    frame["Nettowinst"] = frame["Bedrijfsresultaat"] + wide["Financiële baten en lasten"]
+
+    by_entity = wide.groupby(level="entity", sort=False)
+    balances = by_entity[list(BALANCE_RUBRICS)].cumsum()
+    balances["Eigen vermogen"] += frame.groupby(level="entity", sort=False)["Nettowinst"].cumsum()
+    for metric in BALANCE_METRICS:
+        frame[metric] = balances[metric]
+
+    # Vorige periode: stromen alleen als die periode direct voorafgaat (anders
+    # 0 en dus geen groei); balansstanden lopen door over lege perioden
+    periods = frame.index.get_level_values("period").to_numpy()
+    previous = frame.groupby(level="entity", sort=False).shift(1)
+    prev_period = pd.Series(periods, index=frame.index).groupby(level="entity", sort=False).shift(1).to_numpy()
+    adjacent = prev_period == periods - 1
+    for metric in FLOW_METRICS:
+        previous.loc[~adjacent, metric] = 0
+    for metric in PERIOD_METRICS:
+        frame[f"{metric} groei"] = growth(frame[metric].to_numpy(), previous[metric].to_numpy())
+    return frame.reset_index()
+
+
+def period_deltas(store, daily, granularity):
+    # (frame, entity-kolom); het frame is gesorteerd op administratie en periode
+    def build():
+        frame = build_period_deltas(daily, granularity)
+        return frame, frame["entity"].to_numpy(dtype=object)
+
+    return delta_cache.get_or_create(("periode", store.version, granularity), build)
+
+
+def latest_period_delta(store, daily, entity, granularity):
+    # Laatste periode van een administratie: (label, {metric: (waarde, groei of None)})
+    frame, entities = period_deltas(store, daily, granularity)
+    end = np.searchsorted(entities, entity, side="right")
+    if end == 0 or entities[end - 1] != entity:
+        return None, {}
+    row = frame.iloc[end - 1]
+    per_year = PERIODS_PER_YEAR[granularity]
+    year, index = divmod(int(row["period"]), per_year)
+    label = f"{year}-Q{index + 1}" if per_year == 4 else f"{year}-{index + 1:02d}"
+    return label, {
+        metric: (float(row[metric]), None if np.isnan(row[f"{metric} groei"]) else float(row[f"{metric} groei"]))
+        for metric in PERIOD_METRICS
+    }
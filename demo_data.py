@@ -0,0 +1,88 @@
+from financial_store import FinancialStore
+
+
+# Data storage - alle financiële data van SnelStart
+def demo_statements():
+    # Balansgegevens
+    balance_sheet = {
+        "2022": {
+            "Immateriële vaste activa": 0,
+            "Materiële vaste activa": 681029,
+            "Financiële vaste activa": 2964989,
+            "Vorderingen en overlopende activa": 3567616,
+            "Liquide middelen": 1921392,
+            "Eigen vermogen": 3152060,
+            "Kortlopende schulden": 5982966,
+        },
+        "2023": {
+            "Immateriële vaste activa": 616792,
+            "Materiële vaste activa": 480038,
+            "Financiële vaste activa": 2879700,
+            "Vorderingen en overlopende activa": 2050960,
+            "Liquide middelen": 5876484,
+            "Eigen vermogen": 4912207,
+            "Kortlopende schulden": 6991767,
+        },
+        "2024": {
+            "Immateriële vaste activa": 118414,
+            "Materiële vaste activa": 435242,
+            "Financiële vaste activa": 3710145,
+            "Vorderingen en overlopende activa": 3642300,
+            "Liquide middelen": 9078755,
+            "Eigen vermogen": 10085950,
+            "Kortlopende schulden": 6898906,
+        }
+    }
+    
+    # Winst & verliesrekening
+    profit_loss = {
+        "2022": {
+            "Netto-omzet": 28632557,
+            "Kostprijs van de omzet": 4030779,
+            "Brutomarge": 24601778,
+            "Bedrijfskosten": 20993636,
+            "Bedrijfsresultaat": 3608142,
+            "Nettowinst": 2801050,
+        },
+        "2023": {
+            "Netto-omzet": 36031549,
+            "Kostprijs van de omzet": 3828888,
+            "Brutomarge": 32202661,
+            "Bedrijfskosten": 21066838,
+            "Bedrijfsresultaat": 11135823,
+            "Nettowinst": 8160147,
+        },
+        "2024": {
+            "Netto-omzet": 44788100,
+            "Kostprijs van de omzet": 5354998,
+            "Brutomarge": 39433102,
+            "Bedrijfskosten": 24441359,
+            "Bedrijfsresultaat": 14991743,
+            "Nettowinst": 11067411,
+        }
+    }
+    
+    # Kasstroomgegevens
+    cash_flow = {
+        "2023": {
+            "Operationele kasstroom": 10444979,
+            "Investeringskasstroom": -88963,
+            "Financieringskasstroom": -6400924,
+            "Netto kasstroom": 3955092,
+        },
+        "2024": {
+            "Operationele kasstroom": 10159729,
+            "Investeringskasstroom": -1063790,
+            "Financieringskasstroom": -5893668,
+            "Netto kasstroom": 3202271,
+        }
+    }
+    
+    return balance_sheet, profit_loss, cash_flow
+
+
+def demo_store():
+    return FinancialStore.from_statements(
+        {"snelstart": demo_statements()},
+        entity_names={"snelstart": "SnelStart Software B.V."},
+    )
@@ -0,0 +1,228 @@
+import hashlib
+import json
+import os
+import shutil
+import tempfile
+from pathlib import Path
+
+import numpy as np
+
+from financial_store import FinancialStore
+from account_mapping import DEFAULT_MAPPING, as_mapping
+from ingest import LedgerAggregate, find_export_files, ingest_exports
+
+# Verhogen wanneer de opbouw van de gecachte bestanden verandert
+CACHE_FORMAT = 4
+
+DEFAULT_CACHE_DIR = Path(__file__).resolve().parent / ".snelstart_cache"
+
+
+def cache_dir():
+    return Path(os.environ.get("SNELSTART_CACHE_DIR", DEFAULT_CACHE_DIR))
+
+
+def _config_key(mapping):
+    return hashlib.blake2b(repr((CACHE_FORMAT, as_mapping(mapping).key)).encode(), digest_size=8).hexdigest()
+
+
+def file_manifest(paths):
+    return {
+        str(path): [path.stat().st_size, path.stat().st_mtime_ns]
+        for path in sorted(Path(p).resolve() for p in find_export_files(paths))
+    }
+
+
+def fingerprint(paths, mapping=DEFAULT_MAPPING, content=False):
+    # mtime-vingerafdruk (pad, grootte, mtime); content=True hasht de bytes
+    digest = hashlib.blake2b(digest_size=16)
+    digest.update(_config_key(mapping).encode())
+    for path in sorted(Path(p).resolve() for p in find_export_files(paths)):
+        stat = path.stat()
+        digest.update(repr((str(path), stat.st_size)).encode())
+        if content:
+            with open(path, "rb") as handle:
+                for block in iter(lambda: handle.read(1 << 20), b""):
+                    digest.update(block)
+        else:
+            digest.update(str(stat.st_mtime_ns).encode())
+    return digest.hexdigest()
+
+
+def _write_table(table, path):
+    import pyarrow as pa
+
+    # Ongecomprimeerd Arrow IPC, zodat het bestand zero-copy te mappen is
+    with pa.OSFile(str(path), "wb") as sink:
+        with pa.ipc.new_file(sink, table.schema) as writer:
+            writer.write_table(table)
+
+
+def _read_table(path):
+    import pyarrow as pa
+
+    return pa.ipc.open_file(pa.memory_map(str(path), "r")).read_all()
+
+
+def save_store(store, directory):
+    import pyarrow as pa
+
+    metadata = {
+        "entities": store.entities,
+        "years": store.years,
+        "items": store.items,
+        "entity_names": store.entity_names,
+        "entity_kvk": store.entity_kvk,
+        "entity_sectors": store.entity_sectors,
+    }
+    table = pa.table(
+        {
+            "values": pa.array(store.values.reshape(-1)),
+            "present": pa.array(store.present.reshape(-1).view(np.uint8)),
+        },
+        metadata={"snelstart": json.dumps(metadata)},
+    )
+    _write_table(table, Path(directory) / "store.arrow")
+
+
+def load_store(directory):
+    table = _read_table(Path(directory) / "store.arrow")
+    metadata = json.loads(table.schema.metadata[b"snelstart"])
+    shape = (len(metadata["entities"]), len(metadata["years"]), len(metadata["items"]))
+
+    # Views op de gemapte pagina's; meerdere workers delen dezelfde pagina's
+    values = table.column("values").chunk(0).to_numpy(zero_copy_only=True).reshape(shape)
+    present = table.column("present").chunk(0).to_numpy(zero_copy_only=True).view(bool).reshape(shape)
+    return FinancialStore(
+        metadata["entities"],
+        metadata["years"],
+        values,
+        present,
+        entity_names=dict(zip(metadata["entities"], metadata["entity_names"])),
+        entity_kvk=dict(zip(metadata["entities"], metadata["entity_kvk"])),
+        items=metadata["items"],
+        entity_sectors=dict(zip(metadata["entities"], metadata.get("entity_sectors", ()))),
+    )
+
+
+def save_daily(aggregate, directory):
+    import pyarrow as pa
+
+    daily = aggregate.daily
+    table = pa.table(
+        {
+            "entity": pa.array(daily["entity"].astype(str)).dictionary_encode(),
+            "date": pa.array(daily["date"].to_numpy().astype("datetime64[D]")),
+            "rubric": pa.array(daily["rubric"].astype(str)).dictionary_encode(),
+            "cents": pa.array(daily["cents"].to_numpy()),
+        },
+        metadata={"snelstart": json.dumps({"entity_meta": aggregate.entity_meta}, default=str)},
+    )
+    _write_table(table, Path(directory) / "daily.arrow")
+
+    unmapped = aggregate.unmapped
+    _write_table(pa.table({
+        "entity": pa.array(unmapped["entity"].astype(str), type=pa.string()),
+        "account": pa.array(unmapped["account"].astype(str), type=pa.string()),
+        "rows": pa.array(unmapped["rows"].to_numpy(), type=pa.int64()),
+        "cents": pa.array(unmapped["cents"].to_numpy(), type=pa.int64()),
+    }), Path(directory) / "unmapped.arrow")
+
+
+def load_daily(directory):
+    table = _read_table(Path(directory) / "daily.arrow")
+    daily = table.to_pandas()
+    daily["entity"] = daily["entity"].astype(str).astype("string")
+    daily["rubric"] = daily["rubric"].astype(str).astype("object")
+    daily["date"] = daily["date"].astype("datetime64[ns]")
+    return daily, json.loads(table.schema.metadata[b"snelstart"])["entity_meta"]
+
+
+def load_unmapped(directory):
+    # Rekeningen buiten het rekeningschema (zie LedgerAggregate.unmapped)
+    unmapped = _read_table(Path(directory) / "unmapped.arrow").to_pandas()
+    unmapped["entity"] = unmapped["entity"].astype("string")
+    unmapped["account"] = unmapped["account"].astype("string")
+    return unmapped
+
+
+def entry_dir(key):
+    return cache_dir() / key
+
+
+def has_entry(key):
+    return (entry_dir(key) / "store.arrow").exists()
+
+
+def write_entry(key, store, aggregate=None, manifest=None):
+    # Eerst naar een tijdelijke map, daarna atomair hernoemen
+    target = entry_dir(key)
+    target.parent.mkdir(parents=True, exist_ok=True)
+    staging = Path(tempfile.mkdtemp(prefix=f".{key}-", dir=target.parent))
+    os.chmod(staging, 0o755)
+    try:
+        save_store(store, staging)
+        if aggregate is not None:
+            save_daily(aggregate, staging)
+        if manifest is not None:
+            (staging / "manifest.json").write_text(json.dumps(manifest))
+        os.replace(staging, target)
+    except OSError:
+        # Een andere worker was ons voor; diens versie is even goed
+        shutil.rmtree(staging, ignore_errors=True)
+        if not has_entry(key):
+            raise
+
+
+def find_base_entry(manifest):
+    # Grootste eerdere entry met dezelfde configuratie waarvan alle bestanden
+    # nog ongewijzigd aanwezig zijn
+    best, best_files = None, 0
+    if not cache_dir().exists():
+        return None, {}
+    for candidate in cache_dir().iterdir():
+        manifest_path = candidate / "manifest.json"
+        if candidate.name.startswith(".") or not manifest_path.exists():
+            continue
+        previous = json.loads(manifest_path.read_text())
+        if previous["config"] != manifest["config"] or not (candidate / "daily.arrow").exists():
+            continue
+        files = previous["files"]
+        if all(manifest["files"].get(path) == stat for path, stat in files.items()) and len(files) > best_files:
+            best, best_files = candidate, len(files)
+    if best is None:
+        return None, {}
+    return best, json.loads((best / "manifest.json").read_text())["files"]
+
+
+def load_or_ingest(paths, mapping=DEFAULT_MAPPING):
+    key = fingerprint(paths, mapping)
+    if has_entry(key):
+        return load_store(entry_dir(key))
+
+    manifest = {"config": _config_key(mapping), "files": file_manifest(paths)}
+    base, base_files = find_base_entry(manifest)
+    if base is None:
+        aggregate = ingest_exports(paths, mapping=mapping)
+        store = aggregate.to_store()
+    else:
+        # Alleen de nieuwe exportbestanden verwerken bovenop de vorige stand
+        from incremental import apply_append
+
+        daily, entity_meta = load_daily(base)
+        aggregate = LedgerAggregate.from_daily(daily, entity_meta, load_unmapped(base))
+        new_files = [path for path in manifest["files"] if path not in base_files]
+        store, _ = apply_append(load_store(base), aggregate, new_files, mapping=mapping)
+
+    write_entry(key, store, aggregate, manifest)
+    return load_store(entry_dir(key))
+
+
+def load_or_ingest_daily(paths, mapping=DEFAULT_MAPPING):
+    # Dagtotalen voor tijdreeksen; zelfde cache-entry als de store
+    load_or_ingest(paths, mapping)
+    return load_daily(entry_dir(fingerprint(paths, mapping)))[0]
+
+
+def load_or_ingest_unmapped(paths, mapping=DEFAULT_MAPPING):
+    load_or_ingest(paths, mapping)
+    return load_unmapped(entry_dir(fingerprint(paths, mapping)))
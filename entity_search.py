@@ -0,0 +1,161 @@
+import numpy as np
+import pandas as pd
+
+from cache import DATA_TTL, LRUCache
+
+# Zoekindexen per dataset-versie
+search_cache = LRUCache("entity_search", maxsize=4, ttl=DATA_TTL)
+
+# Minimaal aandeel van de trigrammen uit de zoekvraag dat in de naam moet
+# voorkomen voor een fuzzy treffer
+FUZZY_THRESHOLD = 0.4
+
+# Genormaliseerde tekst bevat alleen deze tekens; een trigram is dan een
+# getal onder 37**3
+_ALPHABET = "abcdefghijklmnopqrstuvwxyz0123456789 "
+_LOOKUP = np.zeros(128, dtype=np.int64)
+_LOOKUP[np.frombuffer(_ALPHABET.encode(), dtype=np.uint8)] = np.arange(len(_ALPHABET))
+_N_GRAMS = len(_ALPHABET) ** 3
+
+
+def normalize_all(texts):
+    # Kleine letters, zonder accenten en leestekens: "Café B.V." -> "cafe b v"
+    normalized = (
+        pd.Series(list(texts), dtype="string")
+        .fillna("")
+        .str.normalize("NFKD")
+        .str.replace("[\u0300-\u036f]", "", regex=True)
+        .str.lower()
+        .str.replace(r"[^0-9a-z]+", " ", regex=True)
+        .str.strip()
+    )
+    return normalized.to_numpy(dtype=str)
+
+
+def normalize(text):
+    return str(normalize_all([text])[0])
+
+
+def _unique(values):
+    # Gesorteerd uniek via sort + diff; sneller dan np.unique op grote int-arrays
+    values = np.sort(values)
+    return values[np.concatenate([[True], values[1:] != values[:-1]])] if len(values) else values
+
+
+def trigram_codes(texts):
+    # (eigenaar, trigram) voor alle unieke trigrammen van genormaliseerde teksten
+    padded = [f"  {text} " for text in texts]
+    lengths = np.array([len(p) for p in padded], dtype=np.int64)
+    chars = _LOOKUP[np.frombuffer("".join(padded).encode("ascii"), dtype=np.uint8)]
+    owners = np.repeat(np.arange(len(padded)), lengths)
+
+    grams = chars[:-2] * len(_ALPHABET) ** 2 + chars[1:-1] * len(_ALPHABET) + chars[2:]
+    # Geen trigrammen over de grens tussen twee teksten heen
+    within = owners[:-2] == owners[2:]
+    keys = _unique(owners[:-2][within] * _N_GRAMS + grams[within])
+    return keys // _N_GRAMS, keys % _N_GRAMS
+
+
+class EntitySearchIndex:
+    """Prefix- en fuzzy-zoekindex over administratiecodes, namen en KvK-nummers.
+
+    Elk woord van de naam, de code en het KvK-nummer staat als token in één
+    gesorteerde array; een prefix is dan een bereik dat met ``searchsorted``
+    gevonden wordt. Zonder (genoeg) prefix-treffers vullen trigrammen van de
+    naam aan, zodat typfouten nog iets vinden.
+    """
+
+    def __init__(self, entities, names, kvk):
+        self.entities = tuple(entities)
+        self.names = tuple(names)
+        self.kvk = tuple(kvk)
+        self._pos = {e: i for i, e in enumerate(self.entities)}
+        self._names_norm = normalize_all(self.names)
+        self._codes_norm = np.char.replace(normalize_all(self.entities), " ", "")
+        self._kvk_norm = np.char.replace(normalize_all(self.kvk), " ", "")
+
+        tokens, owners = [], []
+        for i, (name, code, kvk_number) in enumerate(zip(self._names_norm, self._codes_norm, self._kvk_norm)):
+            words = set(name.split()) | {code, kvk_number}
+            words.discard("")
+            tokens.extend(words)
+            owners.extend([i] * len(words))
+        tokens = np.array(tokens, dtype=str)
+        order = np.argsort(tokens, kind="stable")
+        self._tokens = tokens[order]
+        self._owners = np.array(owners, dtype=np.int64)[order]
+
+        # Alfabetische volgorde op naam, voor een lege zoekvraag en als tiebreak
+        self._alpha = np.argsort(self._names_norm, kind="stable")
+        self._alpha_rank = np.empty(len(self.entities), dtype=np.int64)
+        self._alpha_rank[self._alpha] = np.arange(len(self.entities))
+
+        self._build_trigrams()
+
+    def __len__(self):
+        return len(self.entities)
+
+    def label(self, entity):
+        i = self._pos[entity]
+        kvk = f" · KvK {self.kvk[i]}" if self.kvk[i] else ""
+        code = f" ({self.entities[i]})" if self.names[i] != self.entities[i] else ""
+        return f"{self.names[i]}{code}{kvk}"
+
+    def _prefix_matches(self, term):
+        lo = np.searchsorted(self._tokens, term, side="left")
+        hi = np.searchsorted(self._tokens, term + "\uffff", side="left")
+        return _unique(self._owners[lo:hi])
+
+    def _build_trigrams(self):
+        # Postings per trigram als CSR: eigenaars gesorteerd op trigram
+        owners, grams = trigram_codes(self._names_norm)
+        order = np.argsort(grams, kind="stable")
+        self._gram_owners = owners[order]
+        self._gram_offsets = np.concatenate([[0], np.cumsum(np.bincount(grams, minlength=_N_GRAMS))])
+
+    def _fuzzy_matches(self, query, exclude, limit):
+        _, grams = trigram_codes([query])
+        hits = [self._gram_owners[self._gram_offsets[g]:self._gram_offsets[g + 1]] for g in grams]
+
+        shared = np.bincount(np.concatenate(hits), minlength=len(self.entities))
+        score = shared / len(grams)
+        score[exclude] = 0
+        candidates = np.flatnonzero(score >= FUZZY_THRESHOLD)
+        if len(candidates) > limit:
+            candidates = candidates[np.argpartition(-score[candidates], limit - 1)[:limit]]
+        return candidates[np.lexsort((self._alpha_rank[candidates], -score[candidates]))]
+
+    def search_positions(self, query, limit=20):
+        query = normalize(query)
+        if not query:
+            return self._alpha[:limit]
+
+        # Alle woorden van de zoekvraag moeten als prefix voorkomen
+        matches = None
+        for term in query.split():
+            found = self._prefix_matches(term)
+            matches = found if matches is None else np.intersect1d(matches, found, assume_unique=True)
+            if not len(matches):
+                break
+
+        # Exacte code/KvK eerst, dan namen die met de zoekvraag beginnen, dan de rest
+        compact = query.replace(" ", "")
+        exact = (self._codes_norm[matches] == compact) | (self._kvk_norm[matches] == compact)
+        starts = np.char.startswith(self._names_norm[matches], query)
+        tier = np.where(exact, 0, np.where(starts, 1, 2))
+        ranked = matches[np.lexsort((self._alpha_rank[matches], tier))][:limit]
+
+        if len(ranked) < limit:
+            exclude = np.zeros(len(self.entities), dtype=bool)
+            exclude[ranked] = True
+            ranked = np.concatenate([ranked, self._fuzzy_matches(query, exclude, limit - len(ranked))])
+        return ranked
+
+    def search(self, query, limit=20):
+        return [self.entities[i] for i in self.search_positions(query, limit)]
+
+
+def search_index(store):
+    return search_cache.get_or_create(
+        store.version, lambda: EntitySearchIndex(store.entities, store.entity_names, store.entity_kvk)
+    )
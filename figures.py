@@ -0,0 +1,412 @@
+from collections import namedtuple
+
+from cache import LRUCache
+from formatting import format_currency
+from peer_benchmarks import BENCHMARK_RATIOS, group_label, peer_comparison
+from ratios import ratio_series
+from scenarios import SCENARIO_METRICS, band, scenario
+from timeseries import DEFAULT_MAX_POINTS, downsample, period_series
+
+# plotly wordt pas geïmporteerd wanneer de eerste figuur gebouwd wordt, zodat
+# de pagina al kan renderen voordat de grafiekbibliotheek geladen is
+
+# Een gebouwde figuur plus de grootte van zijn JSON-spec. De spec zelf wordt
+# niet bewaard: st.plotly_chart serialiseert de figuur toch bij elke weergave
+CachedFigure = namedtuple("CachedFigure", ["figure", "spec_bytes"])
+
+# Een plotly-figuur bevat ongeveer dezelfde data als zijn JSON-spec; recursief
+# door de figuurobjecten lopen is duurder dan de figuur zelf bouwen
+figure_cache = LRUCache("figures", maxsize=256, ttl=3600, sizeof=lambda cached: 2 * cached.spec_bytes)
+
+
+def revenue_profit_figure(store, entity, year=None):
+    import plotly.graph_objects as go
+
+    # Revenue & Profit chart
+    fig = go.Figure()
+    years = list(store.entity_years(entity))
+
+    revenues = store.series(entity, "Netto-omzet", years)
+    profits = store.series(entity, "Nettowinst", years)
+
+    fig.add_trace(go.Bar(
+        x=years,
+        y=revenues,
+        name='Omzet',
+        marker_color='#667eea',
+        text=[format_currency(v) for v in revenues],
+        textposition='outside'
+    ))
+
+    fig.add_trace(go.Bar(
+        x=years,
+        y=profits,
+        name='Nettowinst',
+        marker_color='#764ba2',
+        text=[format_currency(v) for v in profits],
+        textposition='outside'
+    ))
+
+    fig.update_layout(
+        title="Omzet vs Nettowinst",
+        xaxis_title="Jaar",
+        yaxis_title="Bedrag (€)",
+        height=400,
+        showlegend=True,
+        hovermode='x unified',
+        plot_bgcolor='white',
+        paper_bgcolor='white'
+    )
+    return fig
+
+
+def profitability_figure(store, entity, year=None):
+    import plotly.graph_objects as go
+
+    # Profitability ratios
+    fig = go.Figure()
+    years = list(store.entity_years(entity))
+
+    fig.add_trace(go.Scatter(
+        x=years,
+        y=ratio_series(store, entity, "winstmarge", years),
+        mode='lines+markers',
+        name='Winstmarge',
+        line=dict(color='#10b981', width=3),
+        marker=dict(size=10)
+    ))
+
+    fig.add_trace(go.Scatter(
+        x=years,
+        y=ratio_series(store, entity, "roe", years),
+        mode='lines+markers',
+        name='ROE',
+        line=dict(color='#f59e0b', width=3),
+        marker=dict(size=10),
+        yaxis='y2'
+    ))
+
+    fig.update_layout(
+        title="Winstgevendheid Trends",
+        xaxis_title="Jaar",
+        yaxis=dict(title="Winstmarge (%)", side="left"),
+        yaxis2=dict(title="ROE (%)", overlaying="y", side="right"),
+        height=400,
+        hovermode='x unified',
+        plot_bgcolor='white',
+        paper_bgcolor='white'
+    )
+    return fig
+
+
+def assets_figure(store, entity, year):
+    import plotly.graph_objects as go
+
+    bs = store.statement(entity, year, "balance")
+
+    # Calculate totals
+    vaste_activa = (bs.get("Immateriële vaste activa", 0) +
+                    bs.get("Materiële vaste activa", 0) +
+                    bs.get("Financiële vaste activa", 0))
+
+    fig = go.Figure(data=[go.Pie(
+        labels=['Vaste Activa', 'Vorderingen', 'Liquide Middelen'],
+        values=[vaste_activa,
+                bs.get("Vorderingen en overlopende activa", 0),
+                bs.get("Liquide middelen", 0)],
+        hole=.3,
+        marker_colors=['#667eea', '#a78bfa', '#c4b5fd']
+    )])
+
+    fig.update_layout(
+        title=f"Activa Verdeling {year}",
+        height=350,
+        showlegend=True
+    )
+    return fig
+
+
+def liabilities_figure(store, entity, year):
+    import plotly.graph_objects as go
+
+    bs = store.statement(entity, year, "balance")
+
+    fig = go.Figure(data=[go.Pie(
+        labels=['Eigen Vermogen', 'Kortlopende Schulden'],
+        values=[bs.get("Eigen vermogen", 0),
+                bs.get("Kortlopende schulden", 0)],
+        hole=.3,
+        marker_colors=['#10b981', '#ef4444']
+    )])
+
+    fig.update_layout(
+        title=f"Passiva Verdeling {year}",
+        height=350,
+        showlegend=True
+    )
+    return fig
+
+
+def trend_grid_figure(store, entity, year=None):
+    import plotly.graph_objects as go
+    from plotly.subplots import make_subplots
+
+    years = list(store.entity_years(entity))
+
+    # Create subplots
+    fig = make_subplots(
+        rows=2, cols=2,
+        subplot_titles=('Omzet Groei', 'Winstgevendheid', 'Liquiditeit', 'Vermogenspositie'),
+        specs=[[{"secondary_y": False}, {"secondary_y": True}],
+               [{"secondary_y": False}, {"secondary_y": False}]]
+    )
+
+    # Omzet groei
+    omzet_values = store.series(entity, "Netto-omzet", years) / 1_000_000
+    fig.add_trace(
+        go.Scatter(x=years, y=omzet_values, mode='lines+markers+text',
+                   name='Omzet (€M)', line=dict(width=3, color='#667eea'),
+                   text=[f"€{v:.1f}M" for v in omzet_values],
+                   textposition="top center"),
+        row=1, col=1
+    )
+
+    # Winstgevendheid
+    winst_values = store.series(entity, "Nettowinst", years) / 1_000_000
+    marge_values = ratio_series(store, entity, "winstmarge", years)
+
+    fig.add_trace(
+        go.Bar(x=years, y=winst_values, name='Nettowinst (€M)',
+               marker_color='#10b981', text=[f"€{v:.1f}M" for v in winst_values]),
+        row=1, col=2
+    )
+
+    fig.add_trace(
+        go.Scatter(x=years, y=marge_values, mode='lines+markers',
+                   name='Winstmarge (%)', line=dict(width=3, color='#f59e0b')),
+        row=1, col=2, secondary_y=True
+    )
+
+    # Liquiditeit
+    fig.add_trace(
+        go.Scatter(x=years, y=ratio_series(store, entity, "current_ratio", years), mode='lines+markers',
+                   name='Current Ratio', line=dict(width=3, color='#3b82f6')),
+        row=2, col=1
+    )
+
+    fig.add_trace(
+        go.Scatter(x=years, y=ratio_series(store, entity, "quick_ratio", years), mode='lines+markers',
+                   name='Quick Ratio', line=dict(width=3, color='#8b5cf6')),
+        row=2, col=1
+    )
+
+    # Vermogenspositie
+    ev_values = store.series(entity, "Eigen vermogen", years) / 1_000_000
+
+    fig.add_trace(
+        go.Bar(x=years, y=ev_values, name='Eigen Vermogen (€M)',
+               marker_color='#059669', text=[f"€{v:.1f}M" for v in ev_values]),
+        row=2, col=2
+    )
+
+    # Update layout
+    fig.update_layout(height=800, showlegend=True, title_text=f"Financiële Trends {years[0]}-{years[-1]}")
+    fig.update_xaxes(title_text="Jaar")
+    return fig
+
+
+def cash_flow_figure(store, entity, year):
+    import plotly.graph_objects as go
+
+    cf_data = store.statement(entity, year, "cash_flow")
+
+    fig = go.Figure(go.Waterfall(
+        name="Kasstroom",
+        orientation="v",
+        measure=["relative", "relative", "relative", "total"],
+        x=["Operationeel", "Investeringen", "Financiering", "Netto"],
+        textposition="outside",
+        text=[format_currency(cf_data.get("Operationele kasstroom", 0)),
+              format_currency(cf_data.get("Investeringskasstroom", 0)),
+              format_currency(cf_data.get("Financieringskasstroom", 0)),
+              format_currency(cf_data.get("Netto kasstroom", 0))],
+        y=[cf_data.get("Operationele kasstroom", 0),
+           cf_data.get("Investeringskasstroom", 0),
+           cf_data.get("Financieringskasstroom", 0),
+           0],
+        connector={"line": {"color": "rgb(63, 63, 63)"}},
+        increasing={"marker": {"color": "#10b981"}},
+        decreasing={"marker": {"color": "#ef4444"}}
+    ))
+
+    fig.update_layout(
+        title=f"Kasstroomoverzicht {year}",
+        showlegend=False,
+        height=400
+    )
+    return fig
+
+
+def benchmark_figure(store, entity, year):
+    import plotly.graph_objects as go
+
+    group, count, rows = peer_comparison(store, entity, year)
+    metrics = [BENCHMARK_RATIOS[name] for name in rows]
+    entity_name = store.entity_names[store.entity_index(entity)]
+
+    fig = go.Figure()
+
+    fig.add_trace(go.Bar(
+        name=entity_name,
+        x=metrics,
+        y=[row["waarde"] for row in rows.values()],
+        text=[f"{row['waarde']:.1f}" + (f" (P{row['percentiel']})" if row["percentiel"] is not None else "")
+              for row in rows.values()],
+        textposition='outside'
+    ))
+
+    if group is not None:
+        for column, name in [("mediaan", "Mediaan peers"), ("top", "Top 25% peers")]:
+            fig.add_trace(go.Bar(
+                name=name,
+                x=metrics,
+                y=[row[column] for row in rows.values()],
+                text=[f"{row[column]:.1f}" if row[column] is not None else "" for row in rows.values()],
+                textposition='outside'
+            ))
+        title = f"Prestaties vs {group_label(*group)} ({count} administraties)"
+    else:
+        title = "Prestaties (te weinig vergelijkbare administraties voor een benchmark)"
+
+    fig.update_layout(
+        title=title,
+        xaxis_title="Metric",
+        yaxis_title="Waarde",
+        barmode='group',
+        height=400
+    )
+    return fig
+
+
+# figure id -> (builder, hangt af van het geselecteerde jaar)
+FIGURES = {
+    "omzet_winst": (revenue_profit_figure, False),
+    "winstgevendheid": (profitability_figure, False),
+    "activa": (assets_figure, True),
+    "passiva": (liabilities_figure, True),
+    "trends": (trend_grid_figure, False),
+    "kasstroom": (cash_flow_figure, True),
+    "benchmark": (benchmark_figure, True),
+}
+
+# Figuren die van de hele dataset afhangen (peergroepen), niet alleen van de
+# eigen cijfers van de administratie
+DATASET_FIGURES = {"benchmark"}
+
+
+def figure_key(figure_id, store, entity, year=None):
+    _, per_year = FIGURES[figure_id]
+    version = store.version if figure_id in DATASET_FIGURES else store.entity_version(entity)
+    return (figure_id, entity, str(year) if per_year else None, version)
+
+
+def cached_figure(key, builder):
+    def build():
+        fig = builder()
+        # Eén keer meten, voor het cachebudget en de payloadstatistiek
+        return CachedFigure(fig, len(fig.to_json()))
+
+    return figure_cache.get_or_create(key, build)
+
+
+def get_figure(figure_id, store, entity, year=None):
+    builder, _ = FIGURES[figure_id]
+    return cached_figure(figure_key(figure_id, store, entity, year), lambda: builder(store, entity, year))
+
+
+def timeseries_figure(daily, entity, granularity, max_points=DEFAULT_MAX_POINTS):
+    import plotly.graph_objects as go
+    from plotly.subplots import make_subplots
+
+    series = period_series(daily, entity, granularity)
+    # WebGL-traces voor lange reeksen houden de browser responsief
+    trace = go.Scattergl if len(series) > 2_000 else go.Scatter
+
+    fig = make_subplots(
+        rows=2, cols=1, shared_xaxes=True, vertical_spacing=0.08,
+        subplot_titles=(f"Resultaat per {granularity.lower()}", "Vermogenspositie"),
+    )
+    lines = [
+        ("Netto-omzet", "Omzet", '#667eea', 1),
+        ("Nettowinst", "Nettowinst", '#10b981', 1),
+        ("Liquide middelen", "Liquide middelen", '#3b82f6', 2),
+        ("Eigen vermogen", "Eigen vermogen", '#059669', 2),
+    ]
+    for column, name, color, row in lines:
+        x, y = downsample(series.index, series[column].to_numpy(), max_points)
+        fig.add_trace(
+            trace(x=x, y=y, mode='lines', name=name, line=dict(width=2, color=color)),
+            row=row, col=1
+        )
+
+    fig.update_layout(
+        height=700,
+        hovermode='x unified',
+        plot_bgcolor='white',
+        paper_bgcolor='white',
+        title_text=f"Financiële Trends per {granularity.lower()}"
+    )
+    fig.update_yaxes(title_text="Bedrag (€)")
+    return fig
+
+
+def get_timeseries_figure(store, daily, entity, granularity):
+    key = ("tijdreeks", entity, granularity, store.entity_version(entity))
+    return cached_figure(key, lambda: timeseries_figure(daily, entity, granularity))
+
+
+def scenario_figure(store, entity, year, assumptions):
+    import plotly.graph_objects as go
+    from plotly.subplots import make_subplots
+
+    result = scenario(store, entity, year, assumptions)
+    history_years, history = result.history
+    # De waaier begint bij het laatste werkelijke jaar
+    x = [result.start_year] + result.years
+
+    fig = make_subplots(rows=2, cols=2, subplot_titles=SCENARIO_METRICS, vertical_spacing=0.12)
+    for i, metric in enumerate(SCENARIO_METRICS):
+        row, col = divmod(i, 2)
+        last = history[metric][-1]
+        for low, high, opacity in [(5, 95, 0.15), (25, 75, 0.35)]:
+            fig.add_trace(go.Scatter(
+                x=x + x[::-1],
+                y=[last, *band(result, metric, high)] + [last, *band(result, metric, low)][::-1],
+                fill='toself', fillcolor=f'rgba(102, 126, 234, {opacity})', line=dict(width=0),
+                name=f"P{low}-P{high}", legendgroup=f"P{low}-P{high}", showlegend=i == 0, hoverinfo='skip'
+            ), row=row + 1, col=col + 1)
+        fig.add_trace(go.Scatter(
+            x=x, y=[last, *band(result, metric, 50)], mode='lines+markers',
+            line=dict(color='#667eea', width=2, dash='dash'),
+            name="Mediaan", legendgroup="Mediaan", showlegend=i == 0
+        ), row=row + 1, col=col + 1)
+        fig.add_trace(go.Scatter(
+            x=history_years, y=history[metric], mode='lines+markers',
+            line=dict(color='#764ba2', width=3),
+            name="Werkelijk", legendgroup="Werkelijk", showlegend=i == 0
+        ), row=row + 1, col=col + 1)
+
+    fig.update_layout(
+        height=650,
+        hovermode='x unified',
+        plot_bgcolor='white',
+        paper_bgcolor='white',
+        title_text=f"Scenario's {x[1]}-{x[-1]} ({assumptions.paths:,} paden)".replace(",", ".")
+    )
+    fig.update_yaxes(title_text="Bedrag (€)")
+    return fig
+
+
+def get_scenario_figure(store, entity, year, assumptions):
+    key = ("scenario", entity, str(year), store.entity_version(entity), assumptions)
+    return cached_figure(key, lambda: scenario_figure(store, entity, year, assumptions))
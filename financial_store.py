@@ -0,0 +1,210 @@
+import hashlib
+
+import numpy as np
+
+# Rubrieken per financieel overzicht, in vaste volgorde (categorische codes)
+BALANCE_ITEMS = (
+    "Immateriële vaste activa",
+    "Materiële vaste activa",
+    "Financiële vaste activa",
+    "Vorderingen en overlopende activa",
+    "Liquide middelen",
+    "Eigen vermogen",
+    "Kortlopende schulden",
+)
+
+PROFIT_LOSS_ITEMS = (
+    "Netto-omzet",
+    "Kostprijs van de omzet",
+    "Brutomarge",
+    "Bedrijfskosten",
+    "Bedrijfsresultaat",
+    "Nettowinst",
+)
+
+CASH_FLOW_ITEMS = (
+    "Operationele kasstroom",
+    "Investeringskasstroom",
+    "Financieringskasstroom",
+    "Netto kasstroom",
+)
+
+STATEMENTS = {
+    "balance": BALANCE_ITEMS,
+    "profit_loss": PROFIT_LOSS_ITEMS,
+    "cash_flow": CASH_FLOW_ITEMS,
+}
+
+LINE_ITEMS = BALANCE_ITEMS + PROFIT_LOSS_ITEMS + CASH_FLOW_ITEMS
+
+
+def to_cents(value):
+    return np.rint(np.asarray(value, dtype=np.float64) * 100).astype(np.int64)
+
+
+class FinancialStore:
+    """Columnar store: entity x year x line-item arrays in int64 cents.
+
+    ``values`` holds the amounts, ``present`` marks which cells were actually
+    reported (2022 has no kasstroom, for example). Entities, years and line
+    items are categorical labels mapped to integer positions once.
+    """
+
+    def __init__(self, entities, years, values, present, entity_names=None, entity_kvk=None, items=LINE_ITEMS,
+                 entity_sectors=None):
+        self.entities = tuple(str(e) for e in entities)
+        self.years = tuple(str(y) for y in years)
+        self.items = tuple(items)
+        self.values = np.asarray(values, dtype=np.int64)
+        self.present = np.asarray(present, dtype=bool)
+        # Eén store wordt door alle sessies en threads gedeeld: read-only,
+        # wijzigingen gaan altijd via een nieuwe store (zie incremental.py)
+        self.values.flags.writeable = False
+        self.present.flags.writeable = False
+
+        expected = (len(self.entities), len(self.years), len(self.items))
+        if self.values.shape != expected or self.present.shape != expected:
+            raise ValueError(f"Verwachtte arrays met vorm {expected}, kreeg {self.values.shape} en {self.present.shape}")
+
+        names = entity_names or {}
+        kvk = entity_kvk or {}
+        sectors = entity_sectors or {}
+        self.entity_names = tuple(names.get(e, e) for e in self.entities)
+        self.entity_kvk = tuple(kvk.get(e, "") for e in self.entities)
+        # Sector (bv. SBI-sectie) voor peer-benchmarks; "" als die onbekend is
+        self.entity_sectors = tuple(sectors.get(e, "") for e in self.entities)
+
+        self._entity_pos = {e: i for i, e in enumerate(self.entities)}
+        self._year_pos = {y: i for i, y in enumerate(self.years)}
+        self._item_pos = {item: i for i, item in enumerate(self.items)}
+        self._version = None
+        self._entity_versions = {}
+
+    @classmethod
+    def from_statements(cls, statements, entity_names=None, entity_kvk=None):
+        # statements: {entity: (balance_sheet, profit_loss, cash_flow)} in de
+        # oude geneste dict-vorm {jaar: {rubriek: bedrag}}
+        entities = list(statements)
+        years = sorted({
+            str(year)
+            for sheets in statements.values()
+            for sheet in sheets
+            for year in sheet
+        }, key=int)
+        store_shape = (len(entities), len(years), len(LINE_ITEMS))
+        values = np.zeros(store_shape, dtype=np.int64)
+        present = np.zeros(store_shape, dtype=bool)
+
+        year_pos = {y: i for i, y in enumerate(years)}
+        item_pos = {item: i for i, item in enumerate(LINE_ITEMS)}
+        for e, entity in enumerate(entities):
+            for sheet in statements[entity]:
+                for year, rows in sheet.items():
+                    y = year_pos[str(year)]
+                    for item, amount in rows.items():
+                        values[e, y, item_pos[item]] = to_cents(amount)
+                        present[e, y, item_pos[item]] = True
+
+        return cls(entities, years, values, present, entity_names, entity_kvk)
+
+    def subset(self, entities):
+        positions = [self.entity_index(e) for e in entities]
+        return FinancialStore(
+            [self.entities[p] for p in positions],
+            self.years,
+            self.values[positions],
+            self.present[positions],
+            entity_names={self.entities[p]: self.entity_names[p] for p in positions},
+            entity_kvk={self.entities[p]: self.entity_kvk[p] for p in positions},
+            items=self.items,
+            entity_sectors={self.entities[p]: self.entity_sectors[p] for p in positions},
+        )
+
+    def carry_entity_versions(self, previous, unchanged):
+        # Versiesleutels van ongewijzigde entities overnemen (zelfde jaren-as)
+        if self.years != previous.years or self.items != previous.items:
+            return
+        for entity in unchanged:
+            old = previous._entity_versions.get(previous.entity_index(entity))
+            if old is not None:
+                self._entity_versions[self.entity_index(entity)] = old
+
+    # Posities
+    def has_entity(self, entity):
+        return str(entity) in self._entity_pos
+
+    def entity_index(self, entity):
+        return self._entity_pos[str(entity)]
+
+    def year_index(self, year):
+        return self._year_pos[str(year)]
+
+    def item_index(self, item):
+        return self._item_pos[item]
+
+    # Queries (bedragen in euro's)
+    def has(self, entity, year, item):
+        year_pos = self._year_pos.get(str(year))
+        if year_pos is None:
+            return False
+        return bool(self.present[self.entity_index(entity), year_pos, self.item_index(item)])
+
+    def entity_years(self, entity):
+        # Jaren waarin de administratie cijfers heeft (latere start, gaten)
+        active = self.present[self.entity_index(entity)].any(axis=1)
+        return tuple(year for year, has_data in zip(self.years, active) if has_data)
+
+    def value(self, entity, year, item):
+        e, y, i = self.entity_index(entity), self.year_index(year), self.item_index(item)
+        if not self.present[e, y, i]:
+            return None
+        return self.values[e, y, i] / 100
+
+    def series(self, entity, item, years=None):
+        e, i = self.entity_index(entity), self.item_index(item)
+        if years is None:
+            cents = self.values[e, :, i]
+            mask = self.present[e, :, i]
+        else:
+            positions = [self.year_index(y) for y in years]
+            cents = self.values[e, positions, i]
+            mask = self.present[e, positions, i]
+        return np.where(mask, cents / 100, np.nan)
+
+    def statement(self, entity, year, statement):
+        e, y = self.entity_index(entity), self.year_index(year)
+        return {
+            item: self.values[e, y, self._item_pos[item]] / 100
+            for item in STATEMENTS[statement]
+            if self.present[e, y, self._item_pos[item]]
+        }
+
+    def column(self, item):
+        # Entity x jaar matrix van een rubriek, NaN waar niets gerapporteerd is
+        i = self.item_index(item)
+        return np.where(self.present[:, :, i], self.values[:, :, i] / 100, np.nan)
+
+    # Versiesleutels voor caches
+    @property
+    def version(self):
+        if self._version is None:
+            digest = hashlib.blake2b(digest_size=16)
+            digest.update(repr((self.entities, self.years, self.items, self.entity_sectors)).encode())
+            digest.update(self.values.tobytes())
+            digest.update(self.present.tobytes())
+            self._version = digest.hexdigest()
+        return self._version
+
+    def entity_version(self, entity):
+        e = self.entity_index(entity)
+        if e not in self._entity_versions:
+            digest = hashlib.blake2b(digest_size=16)
+            digest.update(repr((self.entities[e], self.years, self.items)).encode())
+            digest.update(self.values[e].tobytes())
+            digest.update(self.present[e].tobytes())
+            self._entity_versions[e] = digest.hexdigest()
+        return self._entity_versions[e]
+
+    @property
+    def nbytes(self):
+        return self.values.nbytes + self.present.nbytes
@@ -0,0 +1,31 @@
+import math
+
+
+# Format currency
+def format_currency(value):
+    if value >= 1_000_000:
+        return f"€{value/1_000_000:.1f}M"
+    elif value >= 1_000:
+        return f"€{value/1_000:.0f}K"
+    else:
+        return f"€{value:.0f}"
+
+
+# Format growth percentage (None als er niets te vergelijken is)
+def format_delta(value):
+    if value is None:
+        return None
+    return f"{value:+.1f}%"
+
+
+# Notaties voor format_value
+RATIO = "{:.2f}".format
+PERCENT = "{:.1f}%".format
+
+
+# Ratio of ander berekend getal met ``fmt``; "n.v.t." als het niet te
+# berekenen is (bv. bij een noemer van 0)
+def format_value(value, fmt="{:.1f}".format):
+    if value is None or math.isnan(value):
+        return "n.v.t."
+    return fmt(value)
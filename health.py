@@ -0,0 +1,147 @@
+from collections import namedtuple
+
+import numpy as np
+import pandas as pd
+
+from cache import DATA_TTL, LRUCache
+from formatting import format_currency, format_value
+from ratios import ratio_frame
+
+# Een regel: per ratio een reeks (operator, grens, niveau, oordeel), van
+# boven naar beneden getoetst; ``otherwise`` als geen grens gehaald wordt.
+# Niveaus volgen de Streamlit-meldingen: success < info < warning < error.
+HealthRule = namedtuple("HealthRule", ["metric", "label", "bands", "otherwise", "fmt"])
+
+HEALTH_RULES = (
+    HealthRule("current_ratio", "Current Ratio",
+               ((">=", 2.0, "success", "Uitstekend"), (">=", 1.5, "info", "Goed")),
+               ("warning", "Aandacht vereist"), "{:.2f}".format),
+    HealthRule("solvabiliteit", "Solvabiliteit",
+               ((">=", 50.0, "success", "Zeer gezond"), (">=", 30.0, "info", "Gezond")),
+               ("warning", "Risicovol"), "{:.1f}%".format),
+    HealthRule("roe", "ROE",
+               ((">=", 20.0, "success", "Uitstekend"), (">=", 15.0, "info", "Goed")),
+               ("warning", "Matig"), "{:.1f}%".format),
+    HealthRule("werkkapitaal", "Werkkapitaal",
+               ((">", 0.0, "success", "Positief"),),
+               ("error", "Negatief"), format_currency),
+)
+
+LEVELS = ("success", "info", "warning", "error")
+ALERT_LEVEL = LEVELS.index("warning")
+ALERT_LABELS = {"warning": "Aandacht vereist", "error": "Risicovol"}
+
+OPERATORS = {
+    ">=": np.greater_equal,
+    ">": np.greater,
+    "<=": np.less_equal,
+    "<": np.less,
+}
+
+# Uitkomstcode -1: geen gegevens (ratio niet te berekenen)
+NO_DATA = -1
+
+# Classificaties per dataset-versie
+health_cache = LRUCache("health", maxsize=4, ttl=DATA_TTL)
+
+
+def compile_rule(rule):
+    """Regel -> functie van een ratio-array naar uitkomstcodes (zelfde vorm).
+
+    Code ``i`` verwijst naar ``rule.bands[i]``, ``len(rule.bands)`` naar
+    ``otherwise`` en ``NO_DATA`` naar een ontbrekende waarde.
+    """
+    tests = [(OPERATORS[op], threshold) for op, threshold, _, _ in rule.bands]
+    outcomes = [(level, verdict) for _, _, level, verdict in rule.bands] + [rule.otherwise]
+    severity = np.array([LEVELS.index(level) for level, _ in outcomes], dtype=np.int8)
+
+    def classify(values):
+        codes = np.select([test(values, threshold) for test, threshold in tests],
+                          np.arange(len(tests)), default=len(tests))
+        return np.where(np.isnan(values), NO_DATA, codes).astype(np.int8)
+
+    return classify, outcomes, severity
+
+
+COMPILED_RULES = [(rule, *compile_rule(rule)) for rule in HEALTH_RULES]
+
+
+def build_health(store):
+    # Uitkomstcodes en ernst (entity x jaar x regel) voor alle cellen in één keer
+    # Ratio's uit het (gedeelde) ratio-frame, als entity x jaar
+    frame = ratio_frame(store)
+    shape = (len(store.entities), len(store.years))
+    arrays = {rule.metric: frame[rule.metric].to_numpy().reshape(shape) for rule in HEALTH_RULES}
+    codes = np.stack([classify(arrays[rule.metric]) for rule, classify, _, _ in COMPILED_RULES], axis=2)
+    severity = np.full(codes.shape, NO_DATA, dtype=np.int8)
+    for r, (_, _, _, rule_severity) in enumerate(COMPILED_RULES):
+        known = codes[:, :, r] != NO_DATA
+        severity[:, :, r][known] = rule_severity[codes[:, :, r][known]]
+    values = np.stack([arrays[rule.metric] for rule in HEALTH_RULES], axis=2)
+    return {"codes": codes, "severity": severity, "values": values}
+
+
+def health(store):
+    return health_cache.get_or_create(store.version, lambda: build_health(store))
+
+
+def health_for(store, entity, year):
+    # [(regel, waarde, niveau, oordeel)] voor één administratie en jaar
+    matrix = health(store)
+    e, y = store.entity_index(entity), store.year_index(year)
+    results = []
+    for r, (rule, _, outcomes, _) in enumerate(COMPILED_RULES):
+        code = matrix["codes"][e, y, r]
+        level, verdict = ("info", "Geen gegevens") if code == NO_DATA else outcomes[code]
+        results.append((rule, float(matrix["values"][e, y, r]), level, verdict))
+    return results
+
+
+def portfolio_alerts(store, year=None, limit=None):
+    """Administraties met minstens één waarschuwing, ernstigste eerst.
+
+    Eén rij per administratie en jaar (alle jaren als ``year`` None is),
+    gerangschikt op zwaarste niveau en dan het aantal signalen.
+    """
+    matrix = health(store)
+    codes, values, severity = matrix["codes"], matrix["values"], matrix["severity"]
+    years = np.array(store.years)
+    if year is not None:
+        selected = [store.year_index(year)]
+        codes, values, severity, years = codes[:, selected], values[:, selected], severity[:, selected], years[selected]
+
+    alerting = severity >= ALERT_LEVEL
+    worst = severity.max(axis=2)
+    count = alerting.sum(axis=2)
+    e, y = np.nonzero(worst >= ALERT_LEVEL)
+    order = np.lexsort((e, -count[e, y], -worst[e, y]))
+    if limit is not None:
+        order = order[:limit]
+    e, y = e[order], y[order]
+
+    # Toelichting alleen voor de rijen die teruggegeven worden
+    signals = []
+    for entity_pos, year_pos in zip(e, y):
+        parts = []
+        for r, (rule, _, outcomes, _) in enumerate(COMPILED_RULES):
+            if alerting[entity_pos, year_pos, r]:
+                verdict = outcomes[codes[entity_pos, year_pos, r]][1]
+                parts.append(f"{rule.label} {format_value(values[entity_pos, year_pos, r], rule.fmt)} ({verdict})")
+        signals.append(", ".join(parts))
+
+    names = np.array(store.entity_names, dtype=object)
+    entities = np.array(store.entities, dtype=object)
+    return pd.DataFrame({
+        "Administratie": entities[e],
+        "Naam": names[e],
+        "Jaar": years[y],
+        "Status": [ALERT_LABELS[LEVELS[level]] for level in worst[e, y]],
+        "Signalen": count[e, y],
+        "Toelichting": signals,
+    })
+
+
+def alert_counts(store, year):
+    # Aantal administraties per zwaarste niveau in een jaar
+    worst = health(store)["severity"][:, store.year_index(year)].max(axis=1)
+    return {level: int((worst == i).sum()) for i, level in enumerate(LEVELS)}
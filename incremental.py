@@ -0,0 +1,85 @@
+import numpy as np
+
+from figures import figure_cache
+from financial_store import BALANCE_ITEMS, FinancialStore
+from account_mapping import DEFAULT_MAPPING
+from ingest import store_from_flows
+from peer_benchmarks import update_peer_benchmarks
+from ratios import update_ratio_frame
+
+
+def _extend_axes(store, entities, years):
+    # Arrays op de (mogelijk) uitgebreide assen; nieuwe jaren nemen de
+    # balansstanden over, zonder resultaat of kasstroom. Ze tellen niet als
+    # gerapporteerd: alleen administraties met boekingen in dat jaar krijgen
+    # het jaar erbij, via store_from_flows in update_store
+    n_items = len(store.items)
+    values = np.zeros((len(entities), len(years), n_items), dtype=np.int64)
+    present = np.zeros((len(entities), len(years), n_items), dtype=bool)
+
+    n_old_entities, n_old_years = len(store.entities), len(store.years)
+    offset = years.index(store.years[0])
+    values[:n_old_entities, offset:offset + n_old_years] = store.values
+    present[:n_old_entities, offset:offset + n_old_years] = store.present
+
+    if offset + n_old_years < len(years):
+        tail = slice(offset + n_old_years, None)
+        balance = [store.item_index(item) for item in BALANCE_ITEMS]
+        values[:n_old_entities, tail][:, :, balance] = store.values[:, -1:, balance]
+    return values, present
+
+
+def update_store(store, aggregate, affected):
+    """Nieuwe store waarin alleen de administraties uit ``affected`` opnieuw zijn afgeleid.
+
+    ``affected`` is de set (administratie, jaar) uit ``LedgerAggregate.append``.
+    Andere administraties worden ongewijzigd overgenomen, inclusief hun
+    versiesleutels, zodat hun cache-entries geldig blijven.
+    """
+    changed = sorted({entity for entity, _ in affected})
+    if not changed:
+        return store
+
+    affected_years = [year for _, year in affected]
+    first = min(int(store.years[0]), *affected_years)
+    last = max(int(store.years[-1]), *affected_years)
+    years = [str(y) for y in range(first, last + 1)]
+    entities = list(store.entities) + [e for e in changed if e not in store._entity_pos]
+
+    values, present = _extend_axes(store, entities, years)
+    flows, first_year = aggregate.entity_flows(changed, np.array(years, dtype=np.int64))
+    derived = store_from_flows(changed, years, flows, first_year, aggregate.entity_meta)
+
+    positions = [entities.index(e) for e in changed]
+    values[positions] = derived.values
+    present[positions] = derived.present
+
+    names = dict(zip(store.entities, store.entity_names))
+    names.update(zip(derived.entities, derived.entity_names))
+    kvk = dict(zip(store.entities, store.entity_kvk))
+    kvk.update(zip(derived.entities, derived.entity_kvk))
+    sectors = dict(zip(store.entities, store.entity_sectors))
+    sectors.update(zip(derived.entities, derived.entity_sectors))
+
+    updated = FinancialStore(entities, years, values, present, entity_names=names, entity_kvk=kvk,
+                             items=store.items, entity_sectors=sectors)
+    updated.carry_entity_versions(store, [e for e in store.entities if e not in set(changed)])
+    return updated
+
+
+def invalidate_entities(entities):
+    # Alleen figuren van gewijzigde administraties weggooien
+    entities = set(entities)
+    return figure_cache.invalidate(lambda key: key[1] in entities)
+
+
+def apply_append(store, aggregate, paths, mapping=DEFAULT_MAPPING):
+    """Nieuwe exportbestanden toevoegen en de afgeleide caches bijwerken."""
+    affected = aggregate.append(paths, mapping=mapping)
+    updated = update_store(store, aggregate, affected)
+    changed = sorted({entity for entity, _ in affected})
+    if updated is not store:
+        update_ratio_frame(updated, store, changed)
+        update_peer_benchmarks(updated, store, changed)
+        invalidate_entities(changed)
+    return updated, affected
@@ -0,0 +1,376 @@
+import csv
+import os
+from pathlib import Path
+
+import numpy as np
+import pandas as pd
+
+from account_mapping import DEFAULT_MAPPING, LEDGER_RUBRICS, UNMAPPED, as_mapping
+from financial_store import LINE_ITEMS, FinancialStore
+
+# Rubrieken met een creditsaldo als natuurlijke kant
+CREDIT_RUBRICS = {"Eigen vermogen", "Kortlopende schulden", "Netto-omzet", "Financiële baten en lasten"}
+
+BALANCE_RUBRICS = LEDGER_RUBRICS[:7]
+
+RUBRIC_LABELS = np.array(LEDGER_RUBRICS, dtype=object)
+
+# Kolomnamen in SnelStart-exports -> interne namen
+COLUMN_ALIASES = {
+    "administratie": "entity",
+    "administratiecode": "entity",
+    "administratienaam": "entity_name",
+    "kvk": "kvk",
+    "kvk-nummer": "kvk",
+    "kvknummer": "kvk",
+    "sector": "sector",
+    "sbi": "sector",
+    "sbi-code": "sector",
+    "branche": "sector",
+    "datum": "date",
+    "boekdatum": "date",
+    "grootboekrekening": "account",
+    "grootboeknummer": "account",
+    "grootboek": "account",
+    "rekening": "account",
+    "debet": "debit",
+    "credit": "credit",
+    "bedrag": "amount",
+    "rubriek": "rubric",
+}
+
+DEFAULT_CHUNKSIZE = 200_000
+
+
+def _parse_amount(column):
+    if pd.api.types.is_numeric_dtype(column):
+        return column.fillna(0).astype(np.float64)
+    text = column.astype("string").str.strip().fillna("")
+    # Nederlandse notatie: 1.234,56
+    has_comma = text.str.contains(",", regex=False)
+    text = text.where(~has_comma, text.str.replace(".", "", regex=False).str.replace(",", ".", regex=False))
+    return pd.to_numeric(text, errors="coerce").fillna(0).astype(np.float64)
+
+
+def _account_labels(column):
+    # Rekeningnummers als tekst voor het rapport: 1500 en niet 1500.0
+    if pd.api.types.is_float_dtype(column) and (column.dropna() % 1 == 0).all():
+        column = column.astype("Int64")
+    return column.astype("string").str.strip().fillna("")
+
+
+def normalize_chunk(raw, default_entity, mapping=DEFAULT_MAPPING):
+    mapping = as_mapping(mapping)
+    renamed = raw.rename(columns=lambda c: COLUMN_ALIASES.get(str(c).strip().lower(), str(c).strip().lower()))
+    n_rows = len(renamed)
+
+    entity = renamed["entity"].astype("string") if "entity" in renamed else pd.Series([default_entity] * n_rows, index=renamed.index, dtype="string")
+    date = pd.to_datetime(renamed["date"], dayfirst=True, errors="coerce").dt.normalize()
+
+    if "amount" in renamed:
+        amount = _parse_amount(renamed["amount"])
+    else:
+        amount = _parse_amount(renamed.get("debit", pd.Series(0, index=renamed.index))) - \
+            _parse_amount(renamed.get("credit", pd.Series(0, index=renamed.index)))
+    cents = np.rint(amount.to_numpy() * 100).astype(np.int64)
+
+    # Rubriekcodes (index in LEDGER_RUBRICS) uit het rekeningschema; een
+    # geldige rubriekkolom in de export gaat voor
+    rubric = mapping.classify(renamed["account"], entity)
+    if "rubric" in renamed:
+        given = pd.Categorical(renamed["rubric"], categories=LEDGER_RUBRICS).codes
+        rubric = np.where(given >= 0, given, rubric).astype(np.int8)
+
+    frame = pd.DataFrame({
+        "entity": entity,
+        "date": date,
+        "rubric": rubric,
+        "cents": cents,
+    })
+    usable = frame["date"].notna().to_numpy() & frame["entity"].notna().to_numpy()
+    mapped = rubric != UNMAPPED
+    valid = usable & mapped
+
+    # Rekeningen buiten het schema: per administratie en rekening geteld
+    lost = usable & ~mapped
+    unmapped = None
+    if lost.any():
+        unmapped = (
+            pd.DataFrame({"entity": entity[lost], "account": _account_labels(renamed["account"][lost]), "cents": cents[lost]})
+            .groupby(["entity", "account"], sort=False, observed=True)["cents"]
+            .agg(rows="size", cents="sum")
+            .reset_index()
+        )
+
+    meta = {}
+    cols = [c for c in ("entity_name", "kvk", "sector") if c in renamed]
+    if cols:
+        first = renamed.assign(entity=entity)[["entity", *cols]].drop_duplicates("entity")
+        # Lege cellen als "" (en niet als "nan") in de metadata
+        first[cols] = first[cols].astype("string").fillna("")
+        for row in first.itertuples(index=False):
+            meta[row.entity] = row._asdict()
+
+    return frame[valid], int((~valid).sum()), meta, unmapped
+
+
+def _csv_options(path):
+    with open(path, newline="", encoding="utf-8-sig") as handle:
+        sample = handle.read(64 * 1024)
+    try:
+        delimiter = csv.Sniffer().sniff(sample, delimiters=";,\t").delimiter
+    except csv.Error:
+        delimiter = ","
+    # Puntkomma-exports gebruiken de Nederlandse decimale komma
+    if delimiter == ";":
+        return {"sep": ";", "decimal": ",", "thousands": "."}
+    return {"sep": delimiter}
+
+
+def iter_csv_chunks(path, chunksize=DEFAULT_CHUNKSIZE):
+    options = _csv_options(path)
+    with pd.read_csv(path, chunksize=chunksize, encoding="utf-8-sig", **options) as reader:
+        yield from reader
+
+
+def iter_excel_chunks(path, chunksize=DEFAULT_CHUNKSIZE):
+    from openpyxl import load_workbook
+
+    workbook = load_workbook(path, read_only=True, data_only=True)
+    try:
+        rows = workbook.active.iter_rows(values_only=True)
+        header = next(rows, None)
+        if header is None:
+            return
+        columns = [str(c) if c is not None else f"kolom_{i}" for i, c in enumerate(header)]
+        batch = []
+        for row in rows:
+            if row is None or all(v is None for v in row):
+                continue
+            batch.append(row)
+            if len(batch) >= chunksize:
+                yield pd.DataFrame(batch, columns=columns)
+                batch = []
+        if batch:
+            yield pd.DataFrame(batch, columns=columns)
+    finally:
+        workbook.close()
+
+
+def iter_export_chunks(path, chunksize=DEFAULT_CHUNKSIZE):
+    suffix = Path(path).suffix.lower()
+    if suffix in (".xlsx", ".xlsm"):
+        return iter_excel_chunks(path, chunksize)
+    if suffix in (".csv", ".txt"):
+        return iter_csv_chunks(path, chunksize)
+    raise ValueError(f"Onbekend exportformaat: {path}")
+
+
+def find_export_files(paths):
+    files = []
+    for path in paths:
+        path = Path(path)
+        if path.is_dir():
+            files.extend(sorted(p for p in path.iterdir() if p.suffix.lower() in (".xlsx", ".xlsm", ".csv")))
+        else:
+            files.append(path)
+    return files
+
+
+class LedgerAggregate:
+    """Dagtotalen per (administratie, datum, rubriek) in centen.
+
+    Chunks worden direct samengevoegd, zodat het geheugengebruik begrensd is
+    door het aantal unieke groepen en niet door het aantal mutaties.
+    """
+
+    def __init__(self):
+        self.daily = pd.DataFrame({
+            "entity": pd.Series(dtype="string"),
+            "date": pd.Series(dtype="datetime64[ns]"),
+            "rubric": pd.Series(dtype="object"),
+            "cents": pd.Series(dtype=np.int64),
+        })
+        self.entity_meta = {}
+        # Mutaties op rekeningen buiten het schema, per administratie en rekening
+        self.unmapped = pd.DataFrame({
+            "entity": pd.Series(dtype="string"),
+            "account": pd.Series(dtype="string"),
+            "rows": pd.Series(dtype=np.int64),
+            "cents": pd.Series(dtype=np.int64),
+        })
+        self.rows_read = 0
+        self.rows_rejected = 0
+        self._pending = []
+        self._pending_rows = 0
+        self._pending_unmapped = []
+
+    def add_chunk(self, raw, default_entity="administratie", mapping=DEFAULT_MAPPING):
+        frame, rejected, meta, unmapped = normalize_chunk(raw, default_entity, mapping)
+        self.rows_read += len(raw)
+        self.rows_rejected += rejected
+        for key, values in meta.items():
+            self.entity_meta.setdefault(key, values)
+        if unmapped is not None:
+            self._pending_unmapped.append(unmapped)
+
+        # Groeperen op de int8-rubriekcode; pas daarna terug naar de naam
+        grouped = frame.groupby(["entity", "date", "rubric"], sort=False, observed=True)["cents"].sum().reset_index()
+        grouped["rubric"] = RUBRIC_LABELS[grouped["rubric"].to_numpy()]
+        self._pending.append(grouped)
+        self._pending_rows += len(grouped)
+        if self._pending_rows > DEFAULT_CHUNKSIZE:
+            self.compact()
+        return grouped
+
+    def compact(self):
+        if self._pending_unmapped:
+            combined = pd.concat([self.unmapped, *self._pending_unmapped], ignore_index=True)
+            self.unmapped = combined.groupby(["entity", "account"], sort=True, observed=True)[["rows", "cents"]].sum().reset_index()
+            self._pending_unmapped = []
+        if not self._pending:
+            return
+        parts = [self.daily, *self._pending] if len(self.daily) else self._pending
+        combined = pd.concat(parts, ignore_index=True)
+        self.daily = (
+            combined.groupby(["entity", "date", "rubric"], sort=True, observed=True)["cents"]
+            .sum()
+            .reset_index()
+        )
+        self._pending = []
+        self._pending_rows = 0
+
+    @classmethod
+    def from_daily(cls, daily, entity_meta=None, unmapped=None):
+        aggregate = cls()
+        aggregate.daily = daily
+        aggregate.entity_meta = dict(entity_meta or {})
+        if unmapped is not None:
+            aggregate.unmapped = unmapped
+        return aggregate
+
+    def add_file(self, path, chunksize=DEFAULT_CHUNKSIZE, mapping=DEFAULT_MAPPING):
+        affected = set()
+        for chunk in iter_export_chunks(path, chunksize):
+            grouped = self.add_chunk(chunk, default_entity=Path(path).stem, mapping=mapping)
+            affected.update(zip(grouped["entity"], grouped["date"].dt.year))
+        return affected
+
+    def append(self, paths, chunksize=DEFAULT_CHUNKSIZE, mapping=DEFAULT_MAPPING):
+        # Nieuwe mutaties toevoegen; geeft de geraakte (administratie, jaar)-paren terug
+        affected = set()
+        for path in find_export_files(paths):
+            affected |= self.add_file(path, chunksize=chunksize, mapping=mapping)
+        self.compact()
+        return {(str(entity), int(year)) for entity, year in affected}
+
+    def yearly_flows(self):
+        self.compact()
+        daily = self.daily
+        if daily.empty:
+            raise ValueError("Geen geldige grootboekmutaties gevonden")
+        entities = sorted(daily["entity"].unique())
+        years = np.arange(daily["date"].dt.year.min(), daily["date"].dt.year.max() + 1)
+        flows, first_year = self.entity_flows(entities, years)
+        return entities, years, flows, first_year
+
+    def entity_flows(self, entities, years):
+        # Jaarmutaties als (entity x jaar x rubriek) array in centen
+        self.compact()
+        daily = self.daily
+        if len(entities) < daily["entity"].nunique():
+            daily = daily[daily["entity"].isin(entities)]
+
+        e = pd.Categorical(daily["entity"], categories=entities).codes
+        y = daily["date"].dt.year.to_numpy() - int(years[0])
+        r = pd.Categorical(daily["rubric"], categories=LEDGER_RUBRICS).codes
+
+        flows = np.zeros((len(entities), len(years), len(LEDGER_RUBRICS)), dtype=np.int64)
+        np.add.at(flows, (e, y, r), daily["cents"].to_numpy())
+        first_year = np.full(len(entities), len(years))
+        np.minimum.at(first_year, e, y)
+        return flows, first_year
+
+    def to_store(self):
+        entities, years, flows, first_year = self.yearly_flows()
+        return store_from_flows(entities, years, flows, first_year, self.entity_meta)
+
+
+def store_from_flows(entities, years, flows, first_year, entity_meta=None):
+    n_entities, n_years = len(entities), len(years)
+    signs = np.array([-1 if r in CREDIT_RUBRICS else 1 for r in LEDGER_RUBRICS], dtype=np.int64)
+    flows = flows * signs
+
+    def flow(rubric):
+        return flows[:, :, LEDGER_RUBRICS.index(rubric)]
+
+    # Winst & verliesrekening per jaar
+    omzet = flow("Netto-omzet")
+    kostprijs = flow("Kostprijs van de omzet")
+    brutomarge = omzet - kostprijs
+    bedrijfskosten = flow("Bedrijfskosten")
+    bedrijfsresultaat = brutomarge - bedrijfskosten
+    nettowinst = bedrijfsresultaat + flow("Financiële baten en lasten")
+
+    # Balans: cumulatieve standen per jaareinde; het resultaat is niet
+    # afgesloten, dus het eigen vermogen telt de cumulatieve winst mee
+    balances = np.cumsum(flows[:, :, :len(BALANCE_RUBRICS)], axis=1)
+    eigen_vermogen = balances[:, :, BALANCE_RUBRICS.index("Eigen vermogen")] + np.cumsum(nettowinst, axis=1)
+    balances[:, :, BALANCE_RUBRICS.index("Eigen vermogen")] = eigen_vermogen
+
+    # Kasstroom (indirect) uit balansmutaties
+    vaste_activa = balances[:, :, :3].sum(axis=2)
+    liquide = balances[:, :, BALANCE_RUBRICS.index("Liquide middelen")]
+    netto_kasstroom = np.diff(liquide, axis=1, prepend=0)
+    investeringen = -np.diff(vaste_activa, axis=1, prepend=0)
+    financiering = np.diff(eigen_vermogen, axis=1, prepend=0) - nettowinst
+    operationeel = netto_kasstroom - investeringen - financiering
+
+    derived = {
+        "Netto-omzet": omzet,
+        "Kostprijs van de omzet": kostprijs,
+        "Brutomarge": brutomarge,
+        "Bedrijfskosten": bedrijfskosten,
+        "Bedrijfsresultaat": bedrijfsresultaat,
+        "Nettowinst": nettowinst,
+        "Operationele kasstroom": operationeel,
+        "Investeringskasstroom": investeringen,
+        "Financieringskasstroom": financiering,
+        "Netto kasstroom": netto_kasstroom,
+    }
+    for i, rubric in enumerate(BALANCE_RUBRICS):
+        derived[rubric] = balances[:, :, i]
+
+    values = np.stack([derived[item] for item in LINE_ITEMS], axis=2)
+
+    # Aanwezig van het eerste tot en met het laatste boekjaar van de
+    # administratie; kasstroom pas vanaf het jaar daarna. Een later jaar dat
+    # alleen door boekingen van andere administraties op de as staat, telt
+    # niet mee (anders een winst-en-verliesrekening van €0 in dat jaar)
+    year_pos = np.arange(n_years)[None, :]
+    last_year = n_years - 1 - np.argmax(flows.any(axis=2)[:, ::-1], axis=1)
+    active = (year_pos >= first_year[:, None]) & (year_pos <= last_year[:, None])
+    has_previous = active & (year_pos > first_year[:, None])
+    present = np.repeat(active[:, :, None], len(LINE_ITEMS), axis=2)
+    n_cash_flow = 4
+    present[:, :, -n_cash_flow:] = has_previous[:, :, None]
+
+    meta = entity_meta or {}
+    names = {e: meta[e].get("entity_name") or e for e in entities if e in meta}
+    kvk = {e: str(meta[e].get("kvk") or "") for e in entities if e in meta}
+    sectors = {e: str(meta[e].get("sector") or "") for e in entities if e in meta}
+    return FinancialStore(entities, years, values, present, entity_names=names, entity_kvk=kvk, entity_sectors=sectors)
+
+
+def ingest_exports(paths, chunksize=DEFAULT_CHUNKSIZE, mapping=DEFAULT_MAPPING):
+    aggregate = LedgerAggregate()
+    mapping = as_mapping(mapping)
+    for path in find_export_files(paths):
+        aggregate.add_file(path, chunksize=chunksize, mapping=mapping)
+    aggregate.compact()
+    return aggregate
+
+
+def export_paths_from_env():
+    value = os.environ.get("SNELSTART_EXPORTS", "")
+    return [p for p in value.split(os.pathsep) if p]
@@ -0,0 +1,272 @@
+import numpy as np
+import pandas as pd
+
+from cache import DATA_TTL, LRUCache
+from ratios import RATIO_COLUMNS, compute_ratio_arrays, ratios_for
+
+# Grootte van elk compactieniveau; rangfouten blijven rond 1-2% bij elke
+# omvang van de peergroep
+DEFAULT_K = 200
+
+# Grootteklassen op netto-omzet (omzetgrenzen jaarverslaggeving vanaf 2024)
+SIZE_CLASSES = ("micro", "klein", "middelgroot", "groot")
+SIZE_LIMITS = np.array([900_000, 15_000_000, 50_000_000])
+
+# Kleinere peergroepen zeggen te weinig; dan een bredere groep nemen
+MIN_PEERS = 10
+
+# Ratio's in de benchmarkgrafiek
+BENCHMARK_RATIOS = {
+    "winstmarge": "Winstmarge",
+    "roe": "ROE",
+    "current_ratio": "Current Ratio",
+    "solvabiliteit": "Solvabiliteit",
+}
+
+# Peer-benchmarks per dataset-versie
+peer_cache = LRUCache("peers", maxsize=4, ttl=DATA_TTL)
+
+
+class QuantileSketch:
+    """Samenvoegbare KLL-sketch voor kwantielen van een stroom waarden.
+
+    Niveau ``h`` bevat gesorteerde steekproefwaarden met gewicht ``2**h``.
+    Loopt een niveau over, dan gaat om de andere waarde (willekeurig de
+    even of oneven posities) met dubbel gewicht een niveau omhoog. Het
+    geheugen blijft zo O(k log(n/k)), ongeacht het aantal waarden.
+    """
+
+    def __init__(self, k=DEFAULT_K, seed=0):
+        self.k = k
+        self.n = 0
+        self.levels = [np.empty(0)]
+        self._rng = np.random.default_rng(seed)
+        self._cdf = None
+
+    def __len__(self):
+        return self.n
+
+    def _capacity(self, level):
+        # Hogere niveaus mogen groter zijn; de fout komt vooral van boven
+        depth = len(self.levels) - 1 - level
+        return max(2, int(np.ceil(self.k * (2 / 3) ** depth)))
+
+    def _compress(self):
+        h = 0
+        while h < len(self.levels):
+            items = self.levels[h]
+            if len(items) > self._capacity(h):
+                if h + 1 == len(self.levels):
+                    self.levels.append(np.empty(0))
+                items = np.sort(items)
+                # Bij een oneven aantal blijft de grootste waarde op dit niveau
+                even = len(items) - len(items) % 2
+                promoted = items[self._rng.integers(2):even:2]
+                self.levels[h] = items[even:]
+                self.levels[h + 1] = np.concatenate([self.levels[h + 1], promoted])
+            h += 1
+        self._cdf = None
+
+    def update(self, values):
+        values = np.asarray(values, dtype=np.float64).reshape(-1)
+        values = values[np.isfinite(values)]
+        if len(values):
+            self.levels[0] = np.concatenate([self.levels[0], values])
+            self.n += len(values)
+            self._compress()
+        return self
+
+    def merge(self, other):
+        while len(self.levels) < len(other.levels):
+            self.levels.append(np.empty(0))
+        for h, items in enumerate(other.levels):
+            self.levels[h] = np.concatenate([self.levels[h], items])
+        self.n += other.n
+        self._compress()
+        return self
+
+    def copy(self):
+        sketch = QuantileSketch(self.k)
+        sketch.n = self.n
+        sketch.levels = list(self.levels)
+        sketch._rng = np.random.default_rng(self.n)
+        return sketch
+
+    def _view(self):
+        # Gesorteerde waarden met cumulatieve gewichten; wordt na elke update
+        # eenmalig opgebouwd, daarna is een opvraging één searchsorted over
+        # hooguit een paar duizend waarden
+        if self._cdf is None:
+            values = np.concatenate(self.levels)
+            weights = np.concatenate([np.full(len(items), 2**h) for h, items in enumerate(self.levels)])
+            order = np.argsort(values, kind="stable")
+            self._cdf = (values[order], np.cumsum(weights[order]))
+        return self._cdf
+
+    def rank(self, value):
+        # Aandeel van de waarden <= value (0-1); None voor een lege sketch
+        if not self.n or value is None or np.isnan(value):
+            return None
+        values, cumulative = self._view()
+        i = np.searchsorted(values, value, side="right")
+        return float(cumulative[i - 1] / self.n) if i else 0.0
+
+    def quantile(self, q):
+        if not self.n:
+            return None
+        values, cumulative = self._view()
+        i = np.searchsorted(cumulative, q * self.n, side="left")
+        return float(values[min(i, len(values) - 1)])
+
+
+def size_classes(revenue):
+    # Grootteklasse-index per omzetbedrag (euro's)
+    return np.searchsorted(SIZE_LIMITS, np.nan_to_num(revenue), side="right")
+
+
+def group_label(sector, size):
+    if sector is None and size is None:
+        return "alle administraties"
+    if size is None:
+        return f"sector {sector}"
+    if sector is None:
+        return f"grootteklasse {SIZE_CLASSES[size]}"
+    return f"sector {sector}, grootteklasse {SIZE_CLASSES[size]}"
+
+
+def _groups(codes):
+    # Posities per groepscode, zonder per groep over alle entities te lopen
+    order = np.argsort(codes, kind="stable")
+    sorted_codes = codes[order]
+    starts = np.flatnonzero(np.concatenate([[True], sorted_codes[1:] != sorted_codes[:-1]]))
+    ends = np.append(starts[1:], len(order))
+    return [(sorted_codes[s], order[s:e]) for s, e in zip(starts, ends)]
+
+
+class PeerBenchmarks:
+    """Kwantielsketches per jaar, ratio en peergroep.
+
+    Een peergroep is een sector, een grootteklasse, de combinatie van beide
+    of alle administraties samen. Sketches worden alleen aangevuld, nooit
+    opnieuw gesorteerd over de hele peergroep: nieuwe administraties gaan
+    via ``add`` of ``merge`` erbij.
+    """
+
+    def __init__(self, k=DEFAULT_K):
+        self.k = k
+        # (jaar, ratio, sector, grootteklasse) -> QuantileSketch; None = alle
+        self.sketches = {}
+        # (jaar, sector, grootteklasse) -> aantal administraties
+        self.counts = {}
+
+    def _sketch(self, key):
+        sketch = self.sketches.get(key)
+        if sketch is None:
+            sketch = self.sketches[key] = QuantileSketch(self.k, seed=len(self.sketches))
+        return sketch
+
+    def add(self, store):
+        arrays = compute_ratio_arrays(store)
+        revenue = store.column("Netto-omzet")
+        sectors, sector_labels = pd.factorize(pd.Series([s or None for s in store.entity_sectors], dtype=object))
+
+        for y, year in enumerate(store.years):
+            active = np.flatnonzero(~np.isnan(revenue[:, y]))
+            if not len(active):
+                continue
+            sector = sectors[active]
+            size = size_classes(revenue[active, y])
+            known = sector >= 0
+            levels = (
+                (np.zeros(len(active), dtype=np.int64), lambda code: (None, None)),
+                (np.where(known, sector, -1), lambda code: (sector_labels[code], None)),
+                (size, lambda code: (None, int(code))),
+                (np.where(known, sector * len(SIZE_CLASSES) + size, -1),
+                 lambda code: (sector_labels[code // len(SIZE_CLASSES)], int(code % len(SIZE_CLASSES)))),
+            )
+            for codes, key_of in levels:
+                for code, positions in _groups(codes):
+                    if code < 0:
+                        continue
+                    group = key_of(code)
+                    rows = active[positions]
+                    self.counts[(year, *group)] = self.counts.get((year, *group), 0) + len(rows)
+                    for name in RATIO_COLUMNS:
+                        self._sketch((year, name, *group)).update(arrays[name][rows, y])
+        return self
+
+    def merge(self, other):
+        for key, sketch in other.sketches.items():
+            self._sketch(key).merge(sketch)
+        for key, count in other.counts.items():
+            self.counts[key] = self.counts.get(key, 0) + count
+        return self
+
+    def copy(self):
+        copied = PeerBenchmarks(self.k)
+        copied.sketches = {key: sketch.copy() for key, sketch in self.sketches.items()}
+        copied.counts = dict(self.counts)
+        return copied
+
+    def peer_group(self, year, sector, size):
+        # Meest specifieke groep met genoeg administraties
+        sector = sector or None
+        for group in ((sector, size), (sector, None), (None, size), (None, None)):
+            count = self.counts.get((str(year), *group), 0)
+            if count >= MIN_PEERS:
+                return group, count
+        return None, 0
+
+    def sketch(self, year, name, group):
+        return self.sketches.get((str(year), name, *group))
+
+
+def build_peer_benchmarks(store):
+    return PeerBenchmarks().add(store)
+
+
+def peer_benchmarks(store):
+    return peer_cache.get_or_create(store.version, lambda: build_peer_benchmarks(store))
+
+
+def update_peer_benchmarks(store, previous, entities):
+    # Nieuwe administraties in aparte sketches opbouwen en samenvoegen;
+    # gewijzigde bestaande administraties (of een andere jaren-as) kunnen
+    # niet uit een sketch, dan bouwt peer_benchmarks() later alles opnieuw op
+    benchmarks = peer_cache.peek(previous.version)
+    if benchmarks is None or store.years != previous.years or any(previous.has_entity(e) for e in entities):
+        return None
+    updated = benchmarks.copy().merge(build_peer_benchmarks(store.subset(entities)))
+    peer_cache.put(store.version, updated)
+    return updated
+
+
+def peer_comparison(store, entity, year, ratios=BENCHMARK_RATIOS):
+    """Waar staat een administratie in haar peergroep.
+
+    Geeft ``(groep, aantal, rijen)`` met per ratio de eigen waarde, de
+    mediaan, het bovenste kwartiel en het percentiel van de administratie;
+    groep is None als er nergens genoeg peers zijn.
+    """
+    benchmarks = peer_benchmarks(store)
+    e, y = store.entity_index(entity), store.year_index(year)
+    revenue = store.column("Netto-omzet")[e, y]
+    size = None if np.isnan(revenue) else int(size_classes(revenue))
+    group, count = benchmarks.peer_group(year, store.entity_sectors[e], size)
+
+    own_ratios = ratios_for(store, entity, year)
+    rows = {}
+    for name in ratios:
+        own = float(own_ratios[name])
+        sketch = None if group is None else benchmarks.sketch(year, name, group)
+        if sketch is None or not len(sketch):
+            rows[name] = {"waarde": own, "mediaan": None, "top": None, "percentiel": None}
+            continue
+        rank = sketch.rank(own)
+        rows[name] = {
+            "waarde": own,
+            "mediaan": sketch.quantile(0.5),
+            "top": sketch.quantile(0.75),
+            "percentiel": None if rank is None else round(rank * 100),
+        }
+    return group, count, rows
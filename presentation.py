@@ -0,0 +1,132 @@
+import html
+import re
+from concurrent.futures import ThreadPoolExecutor
+from datetime import date
+
+from cache import LRUCache
+from figures import FIGURES, get_figure
+from formatting import PERCENT, RATIO, format_currency, format_value
+from ratios import ratios_for
+from recommendations import recommendations_for
+
+presentation_cache = LRUCache("presentations", maxsize=16, ttl=1800)
+
+# Plaats van de datum in de gecachte HTML; pas bij het ophalen ingevuld
+DATE_MARKER = "<!--datum-->"
+
+_plotlyjs = None
+
+STYLE = """
+body { font-family: 'Inter', system-ui, -apple-system, 'Segoe UI', Roboto, sans-serif; margin: 0; background: #f8fafc; color: #334155; }
+header { background: linear-gradient(135deg, #667eea 0%, #764ba2 100%); color: white; padding: 40px; }
+h1 { margin: 0; font-size: 2.5rem; }
+section { background: white; margin: 24px 40px; padding: 24px; border-radius: 15px; box-shadow: 0 4px 6px rgba(0,0,0,0.05); }
+table { border-collapse: collapse; width: 100%; }
+th, td { text-align: right; padding: 6px 12px; border-bottom: 1px solid #e2e8f0; }
+th:first-child, td:first-child { text-align: left; }
+.card { border-left: 4px solid #667eea; padding: 4px 16px; margin-bottom: 12px; }
+"""
+
+
+def _plotly_js():
+    # plotly.js (~3.5MB) één keer inladen en voor elke export hergebruiken
+    global _plotlyjs
+    if _plotlyjs is None:
+        from plotly.offline import get_plotlyjs
+        _plotlyjs = get_plotlyjs()
+    return _plotlyjs
+
+
+def _markdown_to_html(text):
+    items = []
+    for line in text.strip().splitlines():
+        line = re.sub(r"^(-|\d+\.)\s+", "", line.strip())
+        line = html.escape(line)
+        items.append("<li>" + re.sub(r"\*\*(.+?)\*\*", r"<strong>\1</strong>", line) + "</li>")
+    return "<ul>" + "".join(items) + "</ul>"
+
+
+def presentation_figures(store, entity):
+    # Jaaronafhankelijke figuren één keer, per-jaar-figuren voor elk jaar met cijfers
+    jobs = [(figure_id, None) for figure_id, (_, per_year) in FIGURES.items() if not per_year]
+    for year in store.years:
+        if not store.has(entity, year, "Eigen vermogen"):
+            continue
+        for figure_id, (_, per_year) in FIGURES.items():
+            if not per_year:
+                continue
+            if figure_id == "kasstroom" and not store.has(entity, year, "Netto kasstroom"):
+                continue
+            jobs.append((figure_id, year))
+    return jobs
+
+
+def _key_figures_table(store, entity):
+    years = [y for y in store.years if store.has(entity, y, "Netto-omzet")]
+    rows = [
+        ("Omzet", lambda y: format_currency(store.value(entity, y, "Netto-omzet"))),
+        ("Nettowinst", lambda y: format_currency(store.value(entity, y, "Nettowinst"))),
+        ("Eigen Vermogen", lambda y: format_currency(store.value(entity, y, "Eigen vermogen"))),
+        ("Liquide Middelen", lambda y: format_currency(store.value(entity, y, "Liquide middelen"))),
+        ("Current Ratio", lambda y: format_value(ratios_for(store, entity, y)['current_ratio'], RATIO)),
+        ("Solvabiliteit", lambda y: format_value(ratios_for(store, entity, y)['solvabiliteit'], PERCENT)),
+        ("ROE", lambda y: format_value(ratios_for(store, entity, y)['roe'], PERCENT)),
+        ("Winstmarge", lambda y: format_value(ratios_for(store, entity, y)['winstmarge'], PERCENT)),
+    ]
+    head = "".join(f"<th>{y}</th>" for y in years)
+    body = "".join(
+        f"<tr><td>{label}</td>" + "".join(f"<td>{html.escape(cell(y))}</td>" for y in years) + "</tr>"
+        for label, cell in rows
+    )
+    return f"<table><tr><th></th>{head}</tr>{body}</table>"
+
+
+def build_presentation(store, entity, workers=4):
+    """Zelfstandig HTML-bestand met alle figuren, kerncijfers en aanbevelingen.
+
+    De datum staat er als ``DATE_MARKER`` in; ``get_presentation`` vult die in.
+    """
+    import plotly.io as pio
+
+    jobs = presentation_figures(store, entity)
+    # Figuren komen uit de figuurcache; ontbrekende worden parallel gebouwd
+    with ThreadPoolExecutor(max_workers=workers) as pool:
+        cached = list(pool.map(lambda job: get_figure(job[0], store, entity, job[1]), jobs))
+
+    name = html.escape(store.entity_names[store.entity_index(entity)])
+    years = store.entity_years(entity)
+    parts = [
+        "<!DOCTYPE html><html lang='nl'><head><meta charset='utf-8'>",
+        f"<title>{name} - Financiële presentatie</title><style>{STYLE}</style>",
+        f"<script>{_plotly_js()}</script></head><body>",
+        f"<header><h1>{name}</h1><p>Financiële presentatie {years[0]}-{years[-1]} "
+        f"· gegenereerd op {DATE_MARKER}</p></header>",
+        f"<section><h2>🎯 Kerncijfers</h2>{_key_figures_table(store, entity)}</section>",
+    ]
+
+    for i, ((figure_id, year), figure) in enumerate(zip(jobs, cached)):
+        # Zonder hervalidatie: de figuur is al geldig gebouwd
+        spec = pio.to_json(figure.figure, validate=False).replace("</", "<\\/")
+        parts.append(
+            f"<section><div id='fig-{i}'></div><script>"
+            f"(function(){{var spec={spec};"
+            f"Plotly.newPlot('fig-{i}',spec.data,spec.layout,{{responsive:true,displaylogo:false}});}})();"
+            f"</script></section>"
+        )
+
+    for year in reversed(store.years):
+        sections = recommendations_for(store, entity, year)
+        if not sections:
+            continue
+        cards = "".join(f"<div class='card'><h3>{html.escape(title)}</h3>{_markdown_to_html(text)}</div>" for title, text in sections)
+        parts.append(f"<section><h2>💡 Aanbevelingen {year}</h2>{cards}</section>")
+
+    parts.append("</body></html>")
+    return "".join(parts)
+
+
+def get_presentation(store, entity):
+    # De benchmarkfiguur hangt van de hele dataset af, dus de datasetversie in de sleutel
+    key = (entity, store.version)
+    deck = presentation_cache.get_or_create(key, lambda: build_presentation(store, entity))
+    return deck.replace(DATE_MARKER, f"{date.today():%d-%m-%Y}", 1)
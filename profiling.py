@@ -0,0 +1,157 @@
+import json
+import os
+import threading
+import time
+from collections import deque
+from contextlib import contextmanager
+from contextvars import ContextVar
+from pathlib import Path
+
+import numpy as np
+
+from cache import budget
+
+DEFAULT_METRICS_FILE = Path(__file__).resolve().parent / ".snelstart_metrics" / "reruns.jsonl"
+
+# Boven deze grootte wordt het metrics-bestand naar ``<naam>.1`` geroteerd
+# (één oud bestand), zodat een langlopende worker niet onbegrensd schrijft
+METRICS_MAX_BYTES = 10_000_000
+# latency_summary leest alleen het einde van het bestand
+_TAIL_BYTES = 2_000_000
+
+# Elke Streamlit-rerun draait in zijn eigen thread/context
+_current = ContextVar("rerun_profile", default=None)
+_write_lock = threading.Lock()
+
+
+def metrics_file():
+    return Path(os.environ.get("SNELSTART_METRICS_FILE", DEFAULT_METRICS_FILE))
+
+
+class RerunProfile:
+    def __init__(self, scope="app"):
+        # "app" voor een volledige rerun, anders de sleutel van het fragment
+        self.scope = scope
+        self.started = time.perf_counter()
+        self.timestamp = time.time()
+        self.spans = []
+        self.payloads = {}
+        self.marks = {}
+        self.total_ms = None
+
+    def as_record(self):
+        return {
+            "timestamp": self.timestamp,
+            "scope": self.scope,
+            "total_ms": self.total_ms,
+            "spans": [{"name": name, "ms": ms} for name, ms in self.spans],
+            "payload_bytes": self.payloads,
+            "marks_ms": self.marks,
+            # Geheugen in alle caches na deze rerun, om workers op te dimensioneren
+            "cache_bytes": budget.used,
+        }
+
+
+def start_rerun(scope="app"):
+    profile = RerunProfile(scope)
+    _current.set(profile)
+    return profile
+
+
+@contextmanager
+def span(name):
+    profile = _current.get()
+    if profile is None:
+        yield
+        return
+    started = time.perf_counter()
+    try:
+        yield
+    finally:
+        profile.spans.append((name, (time.perf_counter() - started) * 1000))
+
+
+@contextmanager
+def fragment_run(key):
+    # Binnen een volledige rerun is een fragment een gewone span; draait
+    # alleen het fragment opnieuw, dan krijgt het een eigen profiel
+    if _current.get() is not None:
+        with span(f"fragment: {key}"):
+            yield
+        return
+    start_rerun(scope=key)
+    try:
+        with span(f"fragment: {key}"):
+            yield
+    finally:
+        finish_rerun()
+
+
+def mark(name):
+    # Tijdstip (ms sinds het begin van de rerun), bv. de eerste weergave
+    profile = _current.get()
+    if profile is not None:
+        profile.marks.setdefault(name, (time.perf_counter() - profile.started) * 1000)
+
+
+def record_payload(name, nbytes):
+    profile = _current.get()
+    if profile is not None:
+        profile.payloads[name] = nbytes
+
+
+def finish_rerun(write=True):
+    profile = _current.get()
+    if profile is None:
+        return None
+    profile.total_ms = (time.perf_counter() - profile.started) * 1000
+    _current.set(None)
+    if write:
+        path = metrics_file()
+        try:
+            path.parent.mkdir(parents=True, exist_ok=True)
+            with _write_lock:
+                if path.exists() and path.stat().st_size > METRICS_MAX_BYTES:
+                    path.replace(path.with_name(path.name + ".1"))
+                with open(path, "a", encoding="utf-8") as handle:
+                    handle.write(json.dumps(profile.as_record()) + "\n")
+        except OSError:
+            # Metrics mogen een rerun nooit laten falen
+            pass
+    return profile
+
+
+def latency_summary(path=None, last=1000):
+    """p50/p95 van de rerun-tijd per scope over de laatste ``last`` reruns daarvan.
+
+    Volledige reruns ("app") en fragment-reruns apart: de korte
+    fragment-reruns zouden de percentielen van de hele pagina omlaag trekken.
+    Geeft {scope: samenvatting} met "app" eerst, of None zonder metingen.
+    """
+    path = Path(path or metrics_file())
+    if not path.exists():
+        return None
+    # Alleen het laatste stuk lezen; de eerste (mogelijk halve) regel vervalt
+    with open(path, "rb") as handle:
+        size = handle.seek(0, os.SEEK_END)
+        handle.seek(max(size - _TAIL_BYTES, 0))
+        tail = handle.read().splitlines()
+    if size > _TAIL_BYTES:
+        tail = tail[1:]
+    by_scope = {"app": deque(maxlen=last)}
+    for line in tail:
+        if line.strip():
+            record = json.loads(line)
+            by_scope.setdefault(record.get("scope", "app"), deque(maxlen=last)).append(record["total_ms"])
+
+    summary = {}
+    for scope, totals in by_scope.items():
+        if totals:
+            totals = np.array(totals)
+            summary[scope] = {
+                "reruns": len(totals),
+                "p50_ms": float(np.percentile(totals, 50)),
+                "p95_ms": float(np.percentile(totals, 95)),
+                "max_ms": float(totals.max()),
+            }
+    return summary or None
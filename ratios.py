@@ -0,0 +1,102 @@
+import numpy as np
+import pandas as pd
+
+from cache import DATA_TTL, LRUCache
+
+RATIO_COLUMNS = (
+    "current_ratio",
+    "quick_ratio",
+    "solvabiliteit",
+    "roe",
+    "roa",
+    "winstmarge",
+    "brutomarge",
+    "werkkapitaal",
+)
+
+# Laatst berekende ratio-frames, per dataset-versie
+ratio_cache = LRUCache("ratios", maxsize=4, ttl=DATA_TTL)
+
+
+def _divide(numerator, denominator):
+    # Deling zonder ZeroDivisionError: NaN waar de noemer 0 of onbekend is
+    out = np.full(np.broadcast(numerator, denominator).shape, np.nan)
+    np.divide(numerator, denominator, out=out, where=(denominator != 0) & ~np.isnan(denominator))
+    return out
+
+
+def compute_ratio_arrays(store):
+    col = store.column
+
+    # Totaal activa en passiva (entity x jaar)
+    vaste_activa = col("Immateriële vaste activa") + col("Materiële vaste activa") + col("Financiële vaste activa")
+    vlottende_activa = col("Vorderingen en overlopende activa") + col("Liquide middelen")
+    totaal_activa = vaste_activa + vlottende_activa
+    kortlopende_schulden = col("Kortlopende schulden")
+    eigen_vermogen = col("Eigen vermogen")
+    omzet = col("Netto-omzet")
+
+    return {
+        "current_ratio": _divide(vlottende_activa, kortlopende_schulden),
+        "quick_ratio": _divide(col("Liquide middelen") + col("Vorderingen en overlopende activa"), kortlopende_schulden),
+        "solvabiliteit": _divide(eigen_vermogen, totaal_activa) * 100,
+        "roe": _divide(col("Nettowinst"), eigen_vermogen) * 100,
+        "roa": _divide(col("Bedrijfsresultaat"), totaal_activa) * 100,
+        "winstmarge": _divide(col("Nettowinst"), omzet) * 100,
+        "brutomarge": _divide(col("Brutomarge"), omzet) * 100,
+        "werkkapitaal": vlottende_activa - kortlopende_schulden,
+    }
+
+
+def build_ratio_frame(store):
+    arrays = compute_ratio_arrays(store)
+    n_entities, n_years = len(store.entities), len(store.years)
+
+    # Eén rij per (entity, jaar), entity-major zodat rij = e * n_years + y
+    frame = pd.DataFrame({
+        "entity": pd.Categorical(np.repeat(store.entities, n_years), categories=store.entities),
+        "year": pd.Categorical(np.tile(store.years, n_entities), categories=store.years),
+    })
+    for name in RATIO_COLUMNS:
+        frame[name] = arrays[name].reshape(-1)
+    return frame
+
+
+def ratio_frame(store):
+    return ratio_cache.get_or_create(store.version, lambda: build_ratio_frame(store))
+
+
+def ratios_for(store, entity, year):
+    frame = ratio_frame(store)
+    row = store.entity_index(entity) * len(store.years) + store.year_index(year)
+    return {name: frame[name].iat[row] for name in RATIO_COLUMNS}
+
+
+def ratio_series(store, entity, name, years=None):
+    frame = ratio_frame(store)
+    start = store.entity_index(entity) * len(store.years)
+    values = frame[name].to_numpy()[start:start + len(store.years)]
+    if years is None:
+        return values
+    return values[[store.year_index(y) for y in years]]
+
+
+def update_ratio_frame(store, previous, entities):
+    # Alleen de rijen van gewijzigde entities opnieuw berekenen; bij een andere
+    # entity- of jaren-as bouwt ratio_frame() later alles in één pass opnieuw op
+    frame = ratio_cache.peek(previous.version)
+    if frame is None or store.entities != previous.entities or store.years != previous.years:
+        return None
+
+    n_years = len(store.years)
+    positions = np.array([store.entity_index(e) for e in entities], dtype=np.int64)
+    rows = (positions[:, None] * n_years + np.arange(n_years)).reshape(-1)
+    arrays = compute_ratio_arrays(store.subset(entities))
+
+    updated = frame.copy()
+    for name in RATIO_COLUMNS:
+        column = updated[name].to_numpy(copy=True)
+        column[rows] = arrays[name].reshape(-1)
+        updated[name] = column
+    ratio_cache.put(store.version, updated)
+    return updated
@@ -0,0 +1,87 @@
+from deltas import delta
+from formatting import format_currency
+from ratios import ratios_for
+from scenarios import band, scenario
+
+
+def _strengths_and_concerns(store, entity, year):
+    ratios = ratios_for(store, entity, year)
+    omzet = store.value(entity, year, "Netto-omzet")
+    winst = store.value(entity, year, "Nettowinst")
+    omzet_groei = delta(store, entity, year, "Netto-omzet")
+    winst_groei = delta(store, entity, year, "Nettowinst")
+
+    strengths, concerns = [], []
+    if omzet_groei is not None:
+        line = f"Omzet {'gestegen' if omzet_groei >= 0 else 'gedaald'} met {abs(omzet_groei):.1f}% naar {format_currency(omzet)}"
+        if omzet_groei >= 10:
+            strengths.append(f"- **Sterke groei**: {line}")
+        elif omzet_groei < 0:
+            concerns.append(f"- **Krimpende omzet**: {line}")
+    kosten_groei = delta(store, entity, year, "Bedrijfskosten")
+    if kosten_groei is not None and omzet_groei is not None and kosten_groei > max(omzet_groei, 0):
+        concerns.append(f"- **Kosten groeien sneller dan omzet**: Bedrijfskosten {kosten_groei:+.1f}% tegen omzet {omzet_groei:+.1f}%")
+    if winst > 0:
+        change = f" ({winst_groei:+.1f}%)" if winst_groei is not None else ""
+        strengths.append(f"- **Winstgevend**: Nettowinst van {format_currency(winst)}{change}")
+    else:
+        concerns.append(f"- **Verlieslatend**: Nettoresultaat van {format_currency(winst)}")
+    if ratios["solvabiliteit"] >= 30:
+        strengths.append(f"- **Solide financiële positie**: Solvabiliteit van {ratios['solvabiliteit']:.1f}%")
+    else:
+        concerns.append(f"- **Lage solvabiliteit**: {ratios['solvabiliteit']:.1f}% eigen vermogen")
+    if ratios["current_ratio"] >= 1.5:
+        strengths.append(f"- **Goede liquiditeit**: Current ratio van {ratios['current_ratio']:.2f}")
+    elif ratios["current_ratio"] < 1:
+        concerns.append(f"- **Krappe liquiditeit**: Current ratio van {ratios['current_ratio']:.2f}")
+    if ratios["roe"] >= 15:
+        strengths.append(f"- **Hoge ROE**: {ratios['roe']:.0f}% rendement op eigen vermogen")
+    return strengths, concerns
+
+
+def _action_plan(store, entity, year):
+    # Plan voor het jaar na ``year`` op basis van de scenario's met de
+    # historische aannames
+    result = scenario(store, entity, year)
+    next_year = result.years[0]
+    omzet = [band(result, "Netto-omzet", q)[0] for q in (5, 50, 95)]
+    kosten = band(result, "Bedrijfskosten", 50)[0]
+    kas_laag = band(result, "Liquide middelen", 5)[0]
+    return [
+        f"1. **Q1 {next_year}**: Begroot op een omzet van {format_currency(omzet[1])} "
+        f"(90% van de scenario's tussen {format_currency(omzet[0])} en {format_currency(omzet[2])})",
+        f"2. **Q2 {next_year}**: Houd bedrijfskosten binnen {format_currency(kosten)}",
+        f"3. **Q3 {next_year}**: Kaspositie blijft in 95% van de scenario's boven {format_currency(kas_laag)}"
+        + (f"; kans op verlies {result.loss_probability[0]:.0%}" if result.loss_probability[0] >= 0.05 else ""),
+        f"4. **Q4 {next_year}**: Evaluatie van de werkelijke cijfers tegen de scenario's en bijstellen",
+    ]
+
+
+def has_recommendations(store, entity, year):
+    # Zonder omzet of eigen vermogen valt er niets te adviseren
+    year = str(year)
+    return store.has(entity, year, "Netto-omzet") and store.has(entity, year, "Eigen vermogen")
+
+
+def recommendations_for(store, entity, year):
+    """Aanbevelingen als (titel, markdown) per kaart, berekend uit de cijfers."""
+    year = str(year)
+    if not has_recommendations(store, entity, year):
+        return ()
+
+    strengths, concerns = _strengths_and_concerns(store, entity, year)
+    liquide = store.value(entity, year, "Liquide middelen")
+    opportunities = [
+        f"- **Investeringsruimte**: {format_currency(liquide)} aan liquide middelen"
+        if liquide > 0 else "- **Kas versterken**: Eerst de liquide middelen weer positief krijgen",
+        "- **Productontwikkeling**: Investeer in nieuwe features en diensten",
+        "- **Strategische overnames**: Overweeg acquisities van complementaire bedrijven",
+    ]
+
+    sections = [
+        ("✅ Sterke Punten", "\n".join(strengths) or "- Geen uitgesproken sterke punten dit jaar"),
+        ("🎯 Groeikansen", "\n".join(opportunities)),
+        ("⚠️ Aandachtspunten", "\n".join(concerns) or "- Geen directe aandachtspunten"),
+        ("🚀 Actieplan", "\n".join(_action_plan(store, entity, year))),
+    ]
+    return tuple(sections)
@@ -0,0 +1,60 @@
+import math
+
+from formatting import PERCENT, RATIO, format_currency, format_value
+from health import ALERT_LEVEL, LEVELS, health_for
+from ratios import ratios_for
+
+
+def conclusion(store, entity, year):
+    # Oordeel uit de gezondheidsregels (zie health.py) in plaats van een vaste tekst
+    name = store.entity_names[store.entity_index(entity)]
+    results = [(rule, level, verdict) for rule, value, level, verdict in health_for(store, entity, year)
+               if not math.isnan(value)]
+    if not results:
+        return f"Onvoldoende gegevens voor een oordeel over {name} in {year}."
+
+    concerns = [f"{rule.label} ({verdict.lower()})" for rule, level, verdict in results
+                if LEVELS.index(level) >= ALERT_LEVEL]
+    if concerns:
+        text = f"{name} vraagt aandacht in {year}: " + ", ".join(concerns) + "."
+    else:
+        strengths = ", ".join(f"{rule.label} ({verdict.lower()})" for rule, _, verdict in results)
+        text = f"{name} is financieel gezond in {year}: {strengths}."
+
+    profit = store.value(entity, year, "Nettowinst")
+    if profit is not None and profit < 0:
+        text += f" Het jaar is afgesloten met een verlies van {format_currency(-profit)}."
+    return text
+
+
+def build_report(store, entity, year):
+    value = lambda item: store.value(entity, year, item)
+    ratios = ratios_for(store, entity, year)
+
+    return f"""
+SNELSTART FINANCIEEL RAPPORT {year}
+
+KERNCIJFERS
+-----------
+Omzet: {format_currency(value("Netto-omzet"))}
+Nettowinst: {format_currency(value("Nettowinst"))}
+Eigen Vermogen: {format_currency(value("Eigen vermogen"))}
+Liquide Middelen: {format_currency(value("Liquide middelen"))}
+
+RATIO'S
+-------
+Current Ratio: {format_value(ratios['current_ratio'], RATIO)}
+Quick Ratio: {format_value(ratios['quick_ratio'], RATIO)}
+Solvabiliteit: {format_value(ratios['solvabiliteit'], PERCENT)}
+ROE: {format_value(ratios['roe'], PERCENT)}
+ROA: {format_value(ratios['roa'], PERCENT)}
+Winstmarge: {format_value(ratios['winstmarge'], PERCENT)}
+
+CONCLUSIE
+---------
+{conclusion(store, entity, year)}
+        """
+
+
+def report_filename(entity, year):
+    return f"{entity}_rapport_{year}.txt"
@@ -0,0 +1,149 @@
+from collections import namedtuple
+
+import numpy as np
+
+from cache import LRUCache
+
+# Geprojecteerde reeksen in de scenario-analyse
+SCENARIO_METRICS = ("Netto-omzet", "Bedrijfskosten", "Nettowinst", "Liquide middelen")
+
+# Percentielen voor de waaiergrafiek: buitenste band, binnenste band, mediaan
+QUANTILES = (5, 25, 50, 75, 95)
+
+DEFAULT_PATHS = 20_000
+
+# Terugval als de historie te kort is om groei of spreiding te schatten
+DEFAULT_GROWTH = 0.03
+MIN_VOLATILITY = 0.05
+MIN_RATIO_SPREAD = 0.01
+
+# Aannames die de planner in de tab aanpast; fracties (0.06 = 6%).
+# Hashbaar, zodat een set aannames direct als cachesleutel dient
+Assumptions = namedtuple(
+    "Assumptions",
+    ["growth", "volatility", "cost_ratio", "cash_conversion", "horizon", "paths", "seed"],
+    defaults=(3, DEFAULT_PATHS, 0),
+)
+
+# Uitkomst: percentielbanden (len(QUANTILES) x horizon) per reeks plus kansen
+Scenario = namedtuple("Scenario", ["start_year", "years", "history", "bands", "loss_probability", "negative_cash_probability"])
+
+# Scenario's per administratie, startjaar en set aannames
+scenario_cache = LRUCache("scenarios", maxsize=256, ttl=1800)
+
+
+def _ratio(numerator, denominator):
+    out = np.full(len(numerator), np.nan)
+    np.divide(numerator, denominator, out=out, where=denominator != 0)
+    return out[~np.isnan(out)]
+
+
+def _spread(values, minimum):
+    return max(float(values.std(ddof=1)), minimum) if len(values) > 1 else minimum
+
+
+def history_years(store, entity, year):
+    return [y for y in store.entity_years(entity) if int(y) <= int(year)]
+
+
+def fit_model(store, entity, year):
+    """Modelparameters uit de historie tot en met ``year``.
+
+    Omzet volgt een lognormale groei; kosten, brutomarge en overig resultaat
+    bewegen als aandeel van de omzet rond het laatste niveau, met de
+    historische spreiding.
+    """
+    years = history_years(store, entity, year)
+    series = {item: store.series(entity, item, years) for item in (
+        "Netto-omzet", "Brutomarge", "Bedrijfskosten", "Bedrijfsresultaat", "Nettowinst", "Liquide middelen",
+    )}
+    omzet = series["Netto-omzet"]
+
+    log_growth = np.diff(np.log(np.where(omzet > 0, omzet, np.nan)))
+    log_growth = log_growth[~np.isnan(log_growth)]
+    cost_ratios = _ratio(series["Bedrijfskosten"], omzet)
+    gross_ratios = _ratio(series["Brutomarge"], omzet)
+    other_ratios = _ratio(series["Nettowinst"] - series["Bedrijfsresultaat"], omzet)
+
+    # Kasconversie: netto kasstroom per euro winst over de jaren met een kasstroomoverzicht
+    with_cash_flow = [y for y in years if store.has(entity, y, "Netto kasstroom")]
+    cash = store.series(entity, "Netto kasstroom", with_cash_flow).sum()
+    profit = store.series(entity, "Nettowinst", with_cash_flow).sum()
+    cash_conversion = float(np.clip(cash / profit, 0, 1.5)) if profit > 0 else 1.0
+
+    return {
+        "years": years,
+        "history": {metric: series[metric] for metric in SCENARIO_METRICS},
+        "growth": float(np.expm1(log_growth.mean())) if len(log_growth) else DEFAULT_GROWTH,
+        "volatility": _spread(log_growth, MIN_VOLATILITY),
+        "cost_ratio": float(cost_ratios[-1]) if len(cost_ratios) else 0.0,
+        "cost_spread": _spread(cost_ratios, MIN_RATIO_SPREAD),
+        "gross_ratio": float(gross_ratios[-1]) if len(gross_ratios) else 0.0,
+        "gross_spread": _spread(gross_ratios, MIN_RATIO_SPREAD),
+        "other_ratio": float(other_ratios.mean()) if len(other_ratios) else 0.0,
+        "cash_conversion": cash_conversion,
+    }
+
+
+def historical_assumptions(store, entity, year, horizon=3):
+    # Standaardaannames uit de historie, afgerond op de stapgrootte van de
+    # sliders (0,5%), zodat ongewijzigde sliders dezelfde cachesleutel geven
+    model = fit_model(store, entity, year)
+    step = 200
+    return Assumptions(
+        growth=round(model["growth"] * step) / step,
+        volatility=round(model["volatility"] * step) / step,
+        cost_ratio=round(model["cost_ratio"] * step) / step,
+        cash_conversion=round(model["cash_conversion"] * step) / step,
+        horizon=horizon,
+    )
+
+
+def simulate_paths(model, assumptions):
+    """Alle Monte Carlo-paden tegelijk: arrays van vorm (paden x horizon)."""
+    rng = np.random.default_rng(assumptions.seed)
+    shape = (assumptions.paths, assumptions.horizon)
+    history = model["history"]
+
+    log_growth = rng.normal(np.log1p(assumptions.growth), assumptions.volatility, shape)
+    omzet = history["Netto-omzet"][-1] * np.exp(np.cumsum(log_growth, axis=1))
+
+    cost_ratio = np.maximum(rng.normal(assumptions.cost_ratio, model["cost_spread"], shape), 0)
+    gross_ratio = rng.normal(model["gross_ratio"], model["gross_spread"], shape)
+    bedrijfskosten = omzet * cost_ratio
+    nettowinst = omzet * (gross_ratio + model["other_ratio"]) - bedrijfskosten
+    liquide = history["Liquide middelen"][-1] + np.cumsum(nettowinst * assumptions.cash_conversion, axis=1)
+
+    return {
+        "Netto-omzet": omzet,
+        "Bedrijfskosten": bedrijfskosten,
+        "Nettowinst": nettowinst,
+        "Liquide middelen": liquide,
+    }
+
+
+def build_scenario(store, entity, year, assumptions):
+    model = fit_model(store, entity, year)
+    paths = simulate_paths(model, assumptions)
+    last = int(model["years"][-1])
+    return Scenario(
+        start_year=str(last),
+        years=[str(last + h) for h in range(1, assumptions.horizon + 1)],
+        history=(model["years"], model["history"]),
+        # Alleen de banden bewaren; de paden zelf zijn na de samenvatting niet meer nodig
+        bands={metric: np.percentile(values, QUANTILES, axis=0) for metric, values in paths.items()},
+        loss_probability=(paths["Nettowinst"] < 0).mean(axis=0),
+        negative_cash_probability=(paths["Liquide middelen"] < 0).mean(axis=0),
+    )
+
+
+def scenario(store, entity, year, assumptions=None):
+    if assumptions is None:
+        assumptions = historical_assumptions(store, entity, year)
+    key = (entity, str(year), store.entity_version(entity), assumptions)
+    return scenario_cache.get_or_create(key, lambda: build_scenario(store, entity, year, assumptions))
+
+
+def band(result, metric, quantile):
+    # Eén percentiellijn over de horizon
+    return result.bands[metric][QUANTILES.index(quantile)]
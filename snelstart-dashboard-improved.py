@@ -1,9 +1,30 @@
+import os
+from pathlib import Path
+
 import streamlit as st
 import pandas as pd
-import plotly.express as px
-import plotly.graph_objects as go
-from plotly.subplots import make_subplots
-import numpy as np
+
+from account_mapping import mapping_from_env, unmapped_report
+from cache import BUDGET_ENV, budget, cache_stats
+from dataset import dataset_cache, dataset_version, shared_dataset
+from deltas import PERIOD_DELTAS, delta, latest_period_delta
+from entity_search import search_index
+from figures import get_figure, get_scenario_figure, get_timeseries_figure
+from formatting import PERCENT, RATIO, format_currency, format_delta, format_value
+from health import alert_counts, health_for, portfolio_alerts
+from ingest import export_paths_from_env
+from presentation import get_presentation
+from profiling import finish_rerun, fragment_run, latency_summary, mark, record_payload, span, start_rerun
+from ratios import ratios_for
+from recommendations import has_recommendations, recommendations_for
+from reports import build_report, report_filename
+from scenarios import historical_assumptions, scenario
+from timeseries import GRANULARITIES
+from warmup import start_warmup
+from workbook_export import XLSX_MIME, workbook_file, workbook_filename
+
+# Timing van deze rerun (zie diagnostiekpaneel en metrics-bestand)
+start_rerun()
 
 # Page configuration
 st.set_page_config(
@@ -13,437 +34,266 @@ st.set_page_config(
     initial_sidebar_state="expanded"
 )
 
-# Custom CSS for better styling
-st.markdown("""
-<style>
-    @import url('https://fonts.googleapis.com/css2?family=Inter:wght@400;500;600;700&display=swap');
-    
-    .main {
-        font-family: 'Inter', sans-serif;
-    }
-    
-    .stMetric {
-        background: linear-gradient(135deg, #667eea 0%, #764ba2 100%);
-        padding: 25px;
-        border-radius: 15px;
-        box-shadow: 0 10px 20px rgba(0,0,0,0.1);
-        color: white;
-    }
-    
-    .stMetric label {
-        color: rgba(255,255,255,0.9) !important;
-        font-weight: 500;
-        font-size: 1rem;
-    }
-    
-    .stMetric .metric-container {
-        color: white !important;
-    }
-    
-    [data-testid="metric-container"] {
-        background: linear-gradient(135deg, #667eea 0%, #764ba2 100%);
-        padding: 20px;
-        border-radius: 15px;
-        box-shadow: 0 10px 20px rgba(0,0,0,0.1);
-    }
-    
-    [data-testid="metric-container"] > div > div > div > div {
-        color: white !important;
-    }
-    
-    .metric-delta {
-        color: #10b981 !important;
-    }
-    
-    .css-1n76uvr {
-        background-color: #f8fafc;
-    }
-    
-    h1 {
-        background: linear-gradient(to right, #667eea, #764ba2);
-        -webkit-background-clip: text;
-        -webkit-text-fill-color: transparent;
-        font-weight: 700;
-        font-size: 3rem;
-        margin-bottom: 1rem;
-    }
-    
-    h2 {
-        color: #334155;
-        font-weight: 600;
-        margin-top: 2rem;
-        margin-bottom: 1rem;
-    }
-    
-    h3 {
-        color: #475569;
-        font-weight: 500;
-    }
-    
-    .sidebar .sidebar-content {
-        background-color: #f1f5f9;
-    }
-    
-    div[data-testid="stSidebar"] > div {
-        background-color: #f8fafc;
-        border-right: 1px solid #e2e8f0;
-    }
-    
-    .stTabs [data-baseweb="tab-list"] {
-        gap: 24px;
-        background-color: transparent;
-    }
-    
-    .stTabs [data-baseweb="tab"] {
-        height: 50px;
-        padding: 0 24px;
-        background-color: #f1f5f9;
-        border-radius: 10px;
-        color: #64748b;
-        font-weight: 500;
-        transition: all 0.3s ease;
-    }
-    
-    .stTabs [aria-selected="true"] {
-        background: linear-gradient(135deg, #667eea 0%, #764ba2 100%);
-        color: white;
-        box-shadow: 0 4px 12px rgba(102, 126, 234, 0.3);
-    }
-    
-    .info-card {
-        background: linear-gradient(135deg, #f8fafc 0%, #f1f5f9 100%);
-        border: 1px solid #e2e8f0;
-        border-radius: 15px;
-        padding: 20px;
-        margin-bottom: 20px;
-        box-shadow: 0 4px 6px rgba(0,0,0,0.05);
-    }
-    
-    .recommendation-card {
-        background: white;
-        border-left: 4px solid #667eea;
-        border-radius: 10px;
-        padding: 20px;
-        margin-bottom: 15px;
-        box-shadow: 0 2px 8px rgba(0,0,0,0.05);
-    }
-</style>
-""", unsafe_allow_html=True)
+# Custom CSS for better styling (lokaal gebundeld, geen externe requests)
+@st.cache_resource
+def load_css():
+    return (Path(__file__).resolve().parent / "static" / "dashboard.css").read_text(encoding="utf-8")
+
+with span("css"):
+    st.markdown(f"<style>{load_css()}</style>", unsafe_allow_html=True)
 
 # Data storage - alle financiële data van SnelStart
-@st.cache_data
-def load_financial_data():
-    # Balansgegevens
-    balance_sheet = {
-        "2022": {
-            "Immateriële vaste activa": 0,
-            "Materiële vaste activa": 681029,
-            "Financiële vaste activa": 2964989,
-            "Vorderingen en overlopende activa": 3567616,
-            "Liquide middelen": 1921392,
-            "Eigen vermogen": 3152060,
-            "Kortlopende schulden": 5982966,
-        },
-        "2023": {
-            "Immateriële vaste activa": 616792,
-            "Materiële vaste activa": 480038,
-            "Financiële vaste activa": 2879700,
-            "Vorderingen en overlopende activa": 2050960,
-            "Liquide middelen": 5876484,
-            "Eigen vermogen": 4912207,
-            "Kortlopende schulden": 6991767,
-        },
-        "2024": {
-            "Immateriële vaste activa": 118414,
-            "Materiële vaste activa": 435242,
-            "Financiële vaste activa": 3710145,
-            "Vorderingen en overlopende activa": 3642300,
-            "Liquide middelen": 9078755,
-            "Eigen vermogen": 10085950,
-            "Kortlopende schulden": 6898906,
-        }
-    }
-    
-    # Winst & verliesrekening
-    profit_loss = {
-        "2022": {
-            "Netto-omzet": 28632557,
-            "Kostprijs van de omzet": 4030779,
-            "Brutomarge": 24601778,
-            "Bedrijfskosten": 20993636,
-            "Bedrijfsresultaat": 3608142,
-            "Nettowinst": 2801050,
-        },
-        "2023": {
-            "Netto-omzet": 36031549,
-            "Kostprijs van de omzet": 3828888,
-            "Brutomarge": 32202661,
-            "Bedrijfskosten": 21066838,
-            "Bedrijfsresultaat": 11135823,
-            "Nettowinst": 8160147,
-        },
-        "2024": {
-            "Netto-omzet": 44788100,
-            "Kostprijs van de omzet": 5354998,
-            "Brutomarge": 39433102,
-            "Bedrijfskosten": 24441359,
-            "Bedrijfsresultaat": 14991743,
-            "Nettowinst": 11067411,
-        }
-    }
-    
-    # Kasstroomgegevens
-    cash_flow = {
-        "2023": {
-            "Operationele kasstroom": 10444979,
-            "Investeringskasstroom": -88963,
-            "Financieringskasstroom": -6400924,
-            "Netto kasstroom": 3955092,
-        },
-        "2024": {
-            "Operationele kasstroom": 10159729,
-            "Investeringskasstroom": -1063790,
-            "Financieringskasstroom": -5893668,
-            "Netto kasstroom": 3202271,
-        }
-    }
-    
-    return balance_sheet, profit_loss, cash_flow
-
-# Calculate financial ratios
-def calculate_ratios(balance_sheet, profit_loss, year):
-    bs = balance_sheet[year]
-    pl = profit_loss[year]
-    
-    # Totaal activa en passiva
-    vaste_activa = bs["Immateriële vaste activa"] + bs["Materiële vaste activa"] + bs["Financiële vaste activa"]
-    vlottende_activa = bs["Vorderingen en overlopende activa"] + bs["Liquide middelen"]
-    totaal_activa = vaste_activa + vlottende_activa
-    
-    # Ratio's
-    current_ratio = vlottende_activa / bs["Kortlopende schulden"]
-    quick_ratio = (bs["Liquide middelen"] + bs["Vorderingen en overlopende activa"]) / bs["Kortlopende schulden"]
-    solvabiliteit = (bs["Eigen vermogen"] / totaal_activa) * 100
-    roe = (pl["Nettowinst"] / bs["Eigen vermogen"]) * 100
-    roa = (pl["Bedrijfsresultaat"] / totaal_activa) * 100
-    winstmarge = (pl["Nettowinst"] / pl["Netto-omzet"]) * 100
-    brutomarge = (pl["Brutomarge"] / pl["Netto-omzet"]) * 100
-    
-    return {
-        "current_ratio": current_ratio,
-        "quick_ratio": quick_ratio,
-        "solvabiliteit": solvabiliteit,
-        "roe": roe,
-        "roa": roa,
-        "winstmarge": winstmarge,
-        "brutomarge": brutomarge,
-        "werkkapitaal": vlottende_activa - bs["Kortlopende schulden"]
-    }
-
-# Format currency
-def format_currency(value):
-    if value >= 1_000_000:
-        return f"€{value/1_000_000:.1f}M"
-    elif value >= 1_000:
-        return f"€{value/1_000:.0f}K"
-    else:
-        return f"€{value:.0f}"
+# Eén gedeelde, read-only dataset per proces en dataversie (geen kopie per
+# sessie zoals bij st.cache_data); binnen het cachebudget van het proces
+# (SNELSTART_CACHE_BUDGET_MB) en na DATA_TTL opnieuw van de cache op schijf
+def load_financial_data(export_paths, version):
+    return shared_dataset("store", export_paths, version)
+
+def load_ledger_daily(export_paths, version):
+    # Dagtotalen zijn er alleen bij ingelezen grootboekexports
+    return shared_dataset("daily", export_paths, version)
+
+def load_unmapped(export_paths, version):
+    # Rekeningen buiten het rekeningschema (SNELSTART_ACCOUNT_MAPPING)
+    return shared_dataset("unmapped", export_paths, version)
 
 # Load data
-balance_sheet, profit_loss, cash_flow = load_financial_data()
+export_paths = tuple(export_paths_from_env())
+with span("data laden"):
+    data_version = dataset_version(export_paths)
+    store = load_financial_data(export_paths, data_version)
+# Ratio's en figuren op de achtergrond voorbereiden (eenmalig per dataset)
+warmup = start_warmup(store)
+
+# Administratie kiezen; alleen de zoekresultaten gaan naar de browser
+MAX_ENTITY_OPTIONS = 50
+# Aantal rijen in de lijst met portefeuillesignalen
+MAX_ALERTS = 50
+
+if not store.has_entity(st.session_state.get("entity", "")):
+    # Directe link: ?administratie=<code>
+    linked = st.query_params.get("administratie", "")
+    st.session_state["entity"] = linked if store.has_entity(linked) else store.entities[0]
+
+if len(store.entities) > 1:
+    with st.sidebar, span("administratie zoeken"):
+        st.markdown("### 🏢 Administratie")
+        index = search_index(store)
+        query = st.text_input(
+            "Zoek administratie:",
+            key="entity_query",
+            placeholder="Naam, code of KvK-nummer"
+        )
+        hits = index.search(query, limit=MAX_ENTITY_OPTIONS)
+        # De huidige administratie blijft gekozen tot de gebruiker zelf een
+        # zoekresultaat kiest; tijdens het typen springt de selectie niet mee
+        current = st.session_state["entity"]
+        options = hits if current in hits else [current, *hits][:MAX_ENTITY_OPTIONS]
+        if query and not hits:
+            st.warning("Geen administraties gevonden")
+
+        st.session_state["entity"] = st.selectbox(
+            f"{len(index):,} administraties".replace(",", "."),
+            options,
+            index=options.index(current),
+            format_func=index.label
+        )
+
+entity = st.session_state["entity"]
+entity_name = store.entity_names[store.entity_index(entity)]
+# Alleen jaren waarin deze administratie cijfers heeft
+years = list(store.entity_years(entity))
+
+
+def value(year, item):
+    return store.value(entity, year, item)
+
+
+def current_year():
+    # In een fragment-rerun draait het script hierboven niet opnieuw;
+    # het gekozen jaar komt daarom altijd uit de widget-state
+    return st.session_state["year"]
+
+
+def yoy(item):
+    # Groei t.o.v. vorig jaar uit de voorberekende deltamatrix
+    return format_delta(delta(store, entity, current_year(), item))
+
+def show_figure(name, get):
+    # Figuur uit de cache halen/bouwen en tonen, met timing en payloadgrootte
+    with span(f"figuur: {name}"):
+        cached = get()
+    record_payload(name, cached.spec_bytes)
+    with span(f"st.plotly_chart: {name}"):
+        st.plotly_chart(cached.figure, use_container_width=True)
+
+# Partiële reruns: onderdelen die een widget lezen zijn fragmenten. Een
+# widget binnen een fragment herhaalt alleen dat fragment; voor widgets
+# daarbuiten staat hier welke fragmenten ze lezen. De rest van de pagina
+# (titel, meerjarengrafieken, ratiotabel, ...) blijft dan ongewijzigd staan.
+WIDGET_DEPENDENCIES = {
+    "year": (
+        "snelle_cijfers", "kerncijfers", "gezondheid", "signalen", "samenstelling",
+        "kasstroom", "aanbevelingen", "scenario", "benchmark", "rapport",
+    ),
+}
+
+# Fragmenten die in de laatste volledige run getoond zijn (alleen die
+# kunnen los opnieuw draaien)
+st.session_state["rendered_fragments"] = set()
+
+def section_fragment(key):
+    def decorate(render):
+        def run(*args):
+            st.session_state["rendered_fragments"].add(key)
+            with fragment_run(key):
+                render(*args)
+        return st.fragment(run, key=key)
+    return decorate
+
+def rerun_dependents(widget):
+    # Callback: alleen de fragmenten die de widget lezen opnieuw laten draaien;
+    # zonder getoonde afhankelijke fragmenten volgt een volledige rerun
+    rendered = st.session_state.get("rendered_fragments", set())
+    targets = [key for key in WIDGET_DEPENDENCIES[widget] if key in rendered]
+    if targets:
+        st.rerun(targets)
 
 # Title and description
 st.markdown("<h1 style='text-align: center;'>SnelStart Financieel Dashboard</h1>", unsafe_allow_html=True)
-st.markdown("<p style='text-align: center; color: #64748b; font-size: 1.2rem; margin-bottom: 2rem;'>Interactieve financiële analyse 2022-2024</p>", unsafe_allow_html=True)
+st.markdown(f"<p style='text-align: center; color: #64748b; font-size: 1.2rem; margin-bottom: 2rem;'>Interactieve financiële analyse {entity_name} {years[0]}-{years[-1]}</p>", unsafe_allow_html=True)
+mark("eerste weergave")
 
-# Sidebar
-with st.sidebar:
-    st.markdown("### 🎯 Dashboard Navigatie")
-    selected_year = st.selectbox("Selecteer jaar:", ["2024", "2023", "2022"], index=0)
+@section_fragment("snelle_cijfers")
+def render_quick_stats():
+    year = current_year()
     
     # Quick stats
-    ratios = calculate_ratios(balance_sheet, profit_loss, selected_year)
+    with span("ratio's"):
+        ratios = ratios_for(store, entity, year)
     
     st.markdown("### 📊 Quick Stats")
     st.info(f"""
-    **Omzet:** {format_currency(profit_loss[selected_year]["Netto-omzet"])}  
-    **Nettowinst:** {format_currency(profit_loss[selected_year]["Nettowinst"])}  
-    **Winstmarge:** {ratios['winstmarge']:.1f}%  
-    **ROE:** {ratios['roe']:.1f}%  
-    **Solvabiliteit:** {ratios['solvabiliteit']:.1f}%
+    **Omzet:** {format_currency(value(year, "Netto-omzet"))}  
+    **Nettowinst:** {format_currency(value(year, "Nettowinst"))}  
+    **Winstmarge:** {format_value(ratios['winstmarge'], PERCENT)}  
+    **ROE:** {format_value(ratios['roe'], PERCENT)}  
+    **Solvabiliteit:** {format_value(ratios['solvabiliteit'], PERCENT)}
     """)
     
     st.markdown("### 📈 Groeipercentages")
-    if selected_year != "2022":
-        prev_year = str(int(selected_year) - 1)
-        omzet_groei = ((profit_loss[selected_year]["Netto-omzet"] - profit_loss[prev_year]["Netto-omzet"]) / profit_loss[prev_year]["Netto-omzet"]) * 100
-        winst_groei = ((profit_loss[selected_year]["Nettowinst"] - profit_loss[prev_year]["Nettowinst"]) / profit_loss[prev_year]["Nettowinst"]) * 100
-        
-        st.success(f"""
-        **Omzetgroei:** +{omzet_groei:.1f}%  
-        **Winstgroei:** +{winst_groei:.1f}%
+    omzet_groei = delta(store, entity, year, "Netto-omzet")
+    if omzet_groei is not None:
+        omzet_cagr = delta(store, entity, year, "Netto-omzet", "CAGR 3j")
+        message = st.success if omzet_groei >= 0 else st.warning
+        message(f"""
+        **Omzetgroei:** {format_delta(omzet_groei)}  
+        **Winstgroei:** {yoy("Nettowinst") or "n.v.t."}  
+        **Omzet CAGR (3 jaar):** {format_delta(omzet_cagr) or "n.v.t."}
         """)
 
-# Main content - Tabs
-tab1, tab2, tab3, tab4, tab5 = st.tabs(["📊 Dashboard", "💰 Financiële Analyse", "📈 Trends", "💡 Aanbevelingen", "📑 Rapporten"])
+# Sidebar
+with st.sidebar, span("sidebar"):
+    st.markdown("### 🎯 Dashboard Navigatie")
+    # Ander jaar dan deze administratie heeft (na wisselen): terug naar het laatste
+    if st.session_state.get("year") not in years:
+        st.session_state.pop("year", None)
+    st.selectbox(
+        "Selecteer jaar:",
+        years[::-1],
+        index=0,
+        key="year",
+        on_change=rerun_dependents,
+        args=("year",)
+    )
+    
+    render_quick_stats()
+    
+    if warmup.running:
+        st.progress(warmup.fraction, text=f"Caches opwarmen: {warmup.done}/{warmup.total}")
+
+# Main content - secties; alleen de actieve sectie wordt berekend en getoond
 
-with tab1:
+@section_fragment("kerncijfers")
+def render_key_figures():
+    year = current_year()
+    
     # KPI Metrics
-    st.markdown("### 🎯 Kerncijfers " + selected_year)
+    st.markdown("### 🎯 Kerncijfers " + year)
     
     col1, col2, col3, col4 = st.columns(4)
     
     with col1:
         st.metric(
             "Omzet",
-            format_currency(profit_loss[selected_year]["Netto-omzet"]),
-            f"+{((profit_loss[selected_year]['Netto-omzet'] - profit_loss[str(int(selected_year)-1)]['Netto-omzet']) / profit_loss[str(int(selected_year)-1)]['Netto-omzet'] * 100):.1f}%" if selected_year != "2022" else None
+            format_currency(value(year, "Netto-omzet")),
+            yoy("Netto-omzet")
         )
     
     with col2:
         st.metric(
             "Nettowinst",
-            format_currency(profit_loss[selected_year]["Nettowinst"]),
-            f"+{((profit_loss[selected_year]['Nettowinst'] - profit_loss[str(int(selected_year)-1)]['Nettowinst']) / profit_loss[str(int(selected_year)-1)]['Nettowinst'] * 100):.1f}%" if selected_year != "2022" else None
+            format_currency(value(year, "Nettowinst")),
+            yoy("Nettowinst")
         )
     
     with col3:
         st.metric(
             "Eigen Vermogen",
-            format_currency(balance_sheet[selected_year]["Eigen vermogen"]),
-            f"+{((balance_sheet[selected_year]['Eigen vermogen'] - balance_sheet[str(int(selected_year)-1)]['Eigen vermogen']) / balance_sheet[str(int(selected_year)-1)]['Eigen vermogen'] * 100):.1f}%" if selected_year != "2022" else None
+            format_currency(value(year, "Eigen vermogen")),
+            yoy("Eigen vermogen")
         )
     
     with col4:
         st.metric(
             "Kaspositie",
-            format_currency(balance_sheet[selected_year]["Liquide middelen"]),
-            f"+{((balance_sheet[selected_year]['Liquide middelen'] - balance_sheet[str(int(selected_year)-1)]['Liquide middelen']) / balance_sheet[str(int(selected_year)-1)]['Liquide middelen'] * 100):.1f}%" if selected_year != "2022" else None
+            format_currency(value(year, "Liquide middelen")),
+            yoy("Liquide middelen")
         )
+
+@section_fragment("gezondheid")
+def render_health():
+    # Financial health indicators
+    st.markdown("### 💪 Financiële Gezondheid")
+    
+    for col, (rule, amount, level, verdict) in zip(st.columns(4), health_for(store, entity, current_year())):
+        with col:
+            st.metric(rule.label, format_value(amount, rule.fmt))
+            getattr(st, level)(verdict)
+
+@section_fragment("signalen")
+def render_alerts():
+    # Signalen over de hele portefeuille
+    year = current_year()
+    counts = alert_counts(store, year)
+    st.markdown(f"### 🚨 Portefeuillesignalen {year}")
+    st.caption(f"{counts['error']} administraties risicovol, {counts['warning']} vragen aandacht "
+               f"(van {sum(counts.values())} met cijfers in {year})")
+    st.dataframe(portfolio_alerts(store, year, limit=MAX_ALERTS), hide_index=True, use_container_width=True)
+
+def render_dashboard():
+    render_key_figures()
     
     # Charts row 1
     col1, col2 = st.columns(2)
     
     with col1:
         # Revenue & Profit chart
-        fig = go.Figure()
-        
-        years = ["2022", "2023", "2024"]
-        revenues = [profit_loss[y]["Netto-omzet"] for y in years]
-        profits = [profit_loss[y]["Nettowinst"] for y in years]
-        
-        fig.add_trace(go.Bar(
-            x=years,
-            y=revenues,
-            name='Omzet',
-            marker_color='#667eea',
-            text=[format_currency(v) for v in revenues],
-            textposition='outside'
-        ))
-        
-        fig.add_trace(go.Bar(
-            x=years,
-            y=profits,
-            name='Nettowinst',
-            marker_color='#764ba2',
-            text=[format_currency(v) for v in profits],
-            textposition='outside'
-        ))
-        
-        fig.update_layout(
-            title="Omzet vs Nettowinst",
-            xaxis_title="Jaar",
-            yaxis_title="Bedrag (€)",
-            height=400,
-            showlegend=True,
-            hovermode='x unified',
-            plot_bgcolor='white',
-            paper_bgcolor='white'
-        )
-        
-        st.plotly_chart(fig, use_container_width=True)
+        show_figure("omzet_winst", lambda: get_figure("omzet_winst", store, entity))
     
     with col2:
         # Profitability ratios
-        fig = go.Figure()
-        
-        fig.add_trace(go.Scatter(
-            x=years,
-            y=[calculate_ratios(balance_sheet, profit_loss, y)["winstmarge"] for y in years],
-            mode='lines+markers',
-            name='Winstmarge',
-            line=dict(color='#10b981', width=3),
-            marker=dict(size=10)
-        ))
-        
-        fig.add_trace(go.Scatter(
-            x=years,
-            y=[calculate_ratios(balance_sheet, profit_loss, y)["roe"] for y in years],
-            mode='lines+markers',
-            name='ROE',
-            line=dict(color='#f59e0b', width=3),
-            marker=dict(size=10),
-            yaxis='y2'
-        ))
-        
-        fig.update_layout(
-            title="Winstgevendheid Trends",
-            xaxis_title="Jaar",
-            yaxis=dict(title="Winstmarge (%)", side="left"),
-            yaxis2=dict(title="ROE (%)", overlaying="y", side="right"),
-            height=400,
-            hovermode='x unified',
-            plot_bgcolor='white',
-            paper_bgcolor='white'
-        )
-        
-        st.plotly_chart(fig, use_container_width=True)
-    
-    # Financial health indicators
-    st.markdown("### 💪 Financiële Gezondheid")
+        show_figure("winstgevendheid", lambda: get_figure("winstgevendheid", store, entity))
     
-    col1, col2, col3, col4 = st.columns(4)
+    render_health()
     
-    with col1:
-        current_ratio = ratios["current_ratio"]
-        st.metric("Current Ratio", f"{current_ratio:.2f}")
-        if current_ratio >= 2:
-            st.success("Uitstekend")
-        elif current_ratio >= 1.5:
-            st.info("Goed")
-        else:
-            st.warning("Aandacht vereist")
-    
-    with col2:
-        solvabiliteit = ratios["solvabiliteit"]
-        st.metric("Solvabiliteit", f"{solvabiliteit:.1f}%")
-        if solvabiliteit >= 50:
-            st.success("Zeer gezond")
-        elif solvabiliteit >= 30:
-            st.info("Gezond")
-        else:
-            st.warning("Risicovol")
-    
-    with col3:
-        roe = ratios["roe"]
-        st.metric("ROE", f"{roe:.1f}%")
-        if roe >= 20:
-            st.success("Uitstekend")
-        elif roe >= 15:
-            st.info("Goed")
-        else:
-            st.warning("Matig")
-    
-    with col4:
-        werkkapitaal = ratios["werkkapitaal"]
-        st.metric("Werkkapitaal", format_currency(werkkapitaal))
-        if werkkapitaal > 0:
-            st.success("Positief")
-        else:
-            st.error("Negatief")
-
-with tab2:
-    st.markdown("### 📊 Gedetailleerde Financiële Analyse")
+    # Alleen bij meerdere administraties
+    if len(store.entities) > 1:
+        render_alerts()
+
+@section_fragment("samenstelling")
+def render_composition():
+    year = current_year()
     
     # Balance sheet analysis
     col1, col2 = st.columns(2)
@@ -451,258 +301,210 @@ with tab2:
     with col1:
         st.markdown("#### Activa Samenstelling")
         
-        # Calculate totals
-        vaste_activa = (balance_sheet[selected_year]["Immateriële vaste activa"] + 
-                       balance_sheet[selected_year]["Materiële vaste activa"] + 
-                       balance_sheet[selected_year]["Financiële vaste activa"])
-        vlottende_activa = (balance_sheet[selected_year]["Vorderingen en overlopende activa"] + 
-                           balance_sheet[selected_year]["Liquide middelen"])
-        
-        fig = go.Figure(data=[go.Pie(
-            labels=['Vaste Activa', 'Vorderingen', 'Liquide Middelen'],
-            values=[vaste_activa, 
-                   balance_sheet[selected_year]["Vorderingen en overlopende activa"],
-                   balance_sheet[selected_year]["Liquide middelen"]],
-            hole=.3,
-            marker_colors=['#667eea', '#a78bfa', '#c4b5fd']
-        )])
-        
-        fig.update_layout(
-            title=f"Activa Verdeling {selected_year}",
-            height=350,
-            showlegend=True
-        )
-        
-        st.plotly_chart(fig, use_container_width=True)
+        show_figure("activa", lambda: get_figure("activa", store, entity, year))
     
     with col2:
         st.markdown("#### Passiva Samenstelling")
         
-        totaal_passiva = balance_sheet[selected_year]["Eigen vermogen"] + balance_sheet[selected_year]["Kortlopende schulden"]
-        
-        fig = go.Figure(data=[go.Pie(
-            labels=['Eigen Vermogen', 'Kortlopende Schulden'],
-            values=[balance_sheet[selected_year]["Eigen vermogen"], 
-                   balance_sheet[selected_year]["Kortlopende schulden"]],
-            hole=.3,
-            marker_colors=['#10b981', '#ef4444']
-        )])
-        
-        fig.update_layout(
-            title=f"Passiva Verdeling {selected_year}",
-            height=350,
-            showlegend=True
-        )
-        
-        st.plotly_chart(fig, use_container_width=True)
+        show_figure("passiva", lambda: get_figure("passiva", store, entity, year))
+
+def render_analysis():
+    st.markdown("### 📊 Gedetailleerde Financiële Analyse")
+    
+    render_composition()
     
     # Ratio analysis table
     st.markdown("#### 📈 Financiële Ratio's Overzicht")
     
     ratio_data = []
-    for year in ["2022", "2023", "2024"]:
-        year_ratios = calculate_ratios(balance_sheet, profit_loss, year)
+    for year in years:
+        year_ratios = ratios_for(store, entity, year)
         ratio_data.append({
             "Jaar": year,
-            "Current Ratio": f"{year_ratios['current_ratio']:.2f}",
-            "Quick Ratio": f"{year_ratios['quick_ratio']:.2f}",
-            "Solvabiliteit (%)": f"{year_ratios['solvabiliteit']:.1f}",
-            "ROE (%)": f"{year_ratios['roe']:.1f}",
-            "ROA (%)": f"{year_ratios['roa']:.1f}",
-            "Winstmarge (%)": f"{year_ratios['winstmarge']:.1f}"
+            "Current Ratio": format_value(year_ratios['current_ratio'], RATIO),
+            "Quick Ratio": format_value(year_ratios['quick_ratio'], RATIO),
+            "Solvabiliteit (%)": format_value(year_ratios['solvabiliteit']),
+            "ROE (%)": format_value(year_ratios['roe']),
+            "ROA (%)": format_value(year_ratios['roa']),
+            "Winstmarge (%)": format_value(year_ratios['winstmarge'])
         })
     
     ratio_df = pd.DataFrame(ratio_data)
     st.dataframe(ratio_df, use_container_width=True, hide_index=True)
-
-with tab3:
-    st.markdown("### 📈 Trend Analyse")
-    
-    # Multi-year comparison
-    years = ["2022", "2023", "2024"]
-    
-    # Create subplots
-    fig = make_subplots(
-        rows=2, cols=2,
-        subplot_titles=('Omzet Groei', 'Winstgevendheid', 'Liquiditeit', 'Vermogenspositie'),
-        specs=[[{"secondary_y": False}, {"secondary_y": True}],
-               [{"secondary_y": False}, {"secondary_y": False}]]
-    )
-    
-    # Omzet groei
-    omzet_values = [profit_loss[y]["Netto-omzet"]/1_000_000 for y in years]
-    fig.add_trace(
-        go.Scatter(x=years, y=omzet_values, mode='lines+markers+text',
-                  name='Omzet (€M)', line=dict(width=3, color='#667eea'),
-                  text=[f"€{v:.1f}M" for v in omzet_values],
-                  textposition="top center"),
-        row=1, col=1
-    )
-    
-    # Winstgevendheid
-    winst_values = [profit_loss[y]["Nettowinst"]/1_000_000 for y in years]
-    marge_values = [calculate_ratios(balance_sheet, profit_loss, y)["winstmarge"] for y in years]
-    
-    fig.add_trace(
-        go.Bar(x=years, y=winst_values, name='Nettowinst (€M)',
-               marker_color='#10b981', text=[f"€{v:.1f}M" for v in winst_values]),
-        row=1, col=2
-    )
-    
-    fig.add_trace(
-        go.Scatter(x=years, y=marge_values, mode='lines+markers',
-                  name='Winstmarge (%)', line=dict(width=3, color='#f59e0b')),
-        row=1, col=2, secondary_y=True
-    )
-    
-    # Liquiditeit
-    current_ratios = [calculate_ratios(balance_sheet, profit_loss, y)["current_ratio"] for y in years]
-    quick_ratios = [calculate_ratios(balance_sheet, profit_loss, y)["quick_ratio"] for y in years]
-    
-    fig.add_trace(
-        go.Scatter(x=years, y=current_ratios, mode='lines+markers',
-                  name='Current Ratio', line=dict(width=3, color='#3b82f6')),
-        row=2, col=1
-    )
-    
-    fig.add_trace(
-        go.Scatter(x=years, y=quick_ratios, mode='lines+markers',
-                  name='Quick Ratio', line=dict(width=3, color='#8b5cf6')),
-        row=2, col=1
-    )
     
-    # Vermogenspositie
-    ev_values = [balance_sheet[y]["Eigen vermogen"]/1_000_000 for y in years]
-    solvabiliteit_values = [calculate_ratios(balance_sheet, profit_loss, y)["solvabiliteit"] for y in years]
-    
-    fig.add_trace(
-        go.Bar(x=years, y=ev_values, name='Eigen Vermogen (€M)',
-               marker_color='#059669', text=[f"€{v:.1f}M" for v in ev_values]),
-        row=2, col=2
+    # Mutaties op rekeningen buiten het rekeningschema tellen niet mee
+    unmapped = load_unmapped(export_paths, data_version)
+    if unmapped is not None:
+        report = unmapped_report(unmapped, [entity])
+        if len(report):
+            st.warning(
+                f"{len(report)} grootboekrekeningen ({report['Mutaties'].sum()} mutaties, saldo "
+                f"{format_currency(report['Saldo'].sum())}) vallen buiten het rekeningschema en tellen niet mee."
+            )
+            with st.expander("Niet-gemapte grootboekrekeningen"):
+                st.dataframe(report, use_container_width=True, hide_index=True)
+
+@section_fragment("tijdreeks")
+def render_timeseries():
+    daily = load_ledger_daily(export_paths, data_version)
+    granularity = st.selectbox(
+        "Granulariteit:",
+        list(GRANULARITIES),
+        key="granularity",
+        disabled=daily is None,
+        help=None if daily is not None else "Maand- en dagcijfers zijn beschikbaar zodra grootboekexports zijn ingelezen (SNELSTART_EXPORTS).",
     )
     
-    # Update layout
-    fig.update_layout(height=800, showlegend=True, title_text="Financiële Trends 2022-2024")
-    fig.update_xaxes(title_text="Jaar")
-    
-    st.plotly_chart(fig, use_container_width=True)
-    
-    # Cash flow waterfall
-    if selected_year in ["2023", "2024"]:
-        st.markdown("### 💸 Kasstroomanalyse " + selected_year)
-        
-        cf_data = cash_flow[selected_year]
-        
-        fig = go.Figure(go.Waterfall(
-            name="Kasstroom",
-            orientation="v",
-            measure=["relative", "relative", "relative", "total"],
-            x=["Operationeel", "Investeringen", "Financiering", "Netto"],
-            textposition="outside",
-            text=[format_currency(cf_data["Operationele kasstroom"]),
-                  format_currency(cf_data["Investeringskasstroom"]),
-                  format_currency(cf_data["Financieringskasstroom"]),
-                  format_currency(cf_data["Netto kasstroom"])],
-            y=[cf_data["Operationele kasstroom"],
-               cf_data["Investeringskasstroom"],
-               cf_data["Financieringskasstroom"],
-               0],
-            connector={"line": {"color": "rgb(63, 63, 63)"}},
-            increasing={"marker": {"color": "#10b981"}},
-            decreasing={"marker": {"color": "#ef4444"}}
-        ))
+    if granularity == "Jaar" or daily is None:
+        # Multi-year comparison
+        show_figure("trends", lambda: get_figure("trends", store, entity))
+    else:
+        kind = next((k for k, g in PERIOD_DELTAS.items() if g == granularity), None)
+        period, latest = latest_period_delta(store, daily, entity, granularity) if kind else (None, {})
+        if latest:
+            st.markdown(f"#### Laatste {granularity.lower()} ({period}, {kind})")
+            for col, (label, item) in zip(st.columns(4), [
+                ("Omzet", "Netto-omzet"),
+                ("Nettowinst", "Nettowinst"),
+                ("Eigen Vermogen", "Eigen vermogen"),
+                ("Kaspositie", "Liquide middelen"),
+            ]):
+                amount, change = latest[item]
+                col.metric(label, format_currency(amount), format_delta(change))
         
-        fig.update_layout(
-            title=f"Kasstroomoverzicht {selected_year}",
-            showlegend=False,
-            height=400
-        )
+        show_figure("tijdreeks", lambda: get_timeseries_figure(store, daily, entity, granularity))
+
+@section_fragment("kasstroom")
+def render_cash_flow():
+    # Cash flow waterfall
+    year = current_year()
+    if store.has(entity, year, "Netto kasstroom"):
+        st.markdown("### 💸 Kasstroomanalyse " + year)
         
-        st.plotly_chart(fig, use_container_width=True)
+        show_figure("kasstroom", lambda: get_figure("kasstroom", store, entity, year))
 
-with tab4:
-    st.markdown("### 💡 Strategische Aanbevelingen")
+def render_trends():
+    st.markdown("### 📈 Trend Analyse")
     
+    render_timeseries()
+    render_cash_flow()
+
+@section_fragment("aanbevelingen")
+def render_recommendation_cards():
     # Analyse van de huidige situatie
-    if selected_year == "2024":
+    sections = recommendations_for(store, entity, current_year())
+    if sections:
         col1, col2 = st.columns([2, 1])
         
-        with col1:
-            st.markdown('<div class="recommendation-card">', unsafe_allow_html=True)
-            st.markdown("#### ✅ Sterke Punten")
-            st.markdown("""
-            - **Uitzonderlijke groei**: Omzet gestegen met 24.1% naar €44.8M
-            - **Sterke winstgevendheid**: Nettowinst van €11.1M (+36.2%)
-            - **Solide financiële positie**: Solvabiliteit van 60.1%
-            - **Uitstekende liquiditeit**: Current ratio van 1.85
-            - **Hoge ROE**: 157% rendement op eigen vermogen
-            """)
-            st.markdown('</div>', unsafe_allow_html=True)
-            
-            st.markdown('<div class="recommendation-card">', unsafe_allow_html=True)
-            st.markdown("#### 🎯 Groeikansen")
-            st.markdown("""
-            - **Marktuitbreiding**: Met €9.1M aan liquide middelen zijn er ruime mogelijkheden voor expansie
-            - **Productontwikkeling**: Investeer in nieuwe features en diensten
-            - **Strategische overnames**: Overweeg acquisities van complementaire bedrijven
-            - **Internationale groei**: Verken mogelijkheden buiten Nederland
-            """)
-            st.markdown('</div>', unsafe_allow_html=True)
-        
-        with col2:
-            st.markdown('<div class="recommendation-card">', unsafe_allow_html=True)
-            st.markdown("#### ⚠️ Aandachtspunten")
-            st.markdown("""
-            - Personeelskosten stijgen sneller dan omzet
-            - Relatief lage investeringen in vaste activa
-            - Afhankelijkheid van Nederlandse markt
-            """)
-            st.markdown('</div>', unsafe_allow_html=True)
-            
-            st.markdown('<div class="recommendation-card">', unsafe_allow_html=True)
-            st.markdown("#### 🚀 Actieplan")
-            st.markdown("""
-            1. **Q1 2025**: Strategisch plan voor internationale expansie
-            2. **Q2 2025**: Verhoog R&D budget met 25%
-            3. **Q3 2025**: Start pilot in België/Duitsland
-            4. **Q4 2025**: Evaluatie en opschaling
-            """)
-            st.markdown('</div>', unsafe_allow_html=True)
-    
+        for i, (title, text) in enumerate(sections):
+            with col1 if i < 2 else col2:
+                st.markdown('<div class="recommendation-card">', unsafe_allow_html=True)
+                st.markdown("#### " + title)
+                st.markdown(text)
+                st.markdown('</div>', unsafe_allow_html=True)
+
+@section_fragment("benchmark")
+def render_benchmark():
     # Benchmark analyse
     st.markdown("### 📊 Benchmark Analyse")
     
-    benchmark_data = {
-        "Metric": ["Winstmarge", "ROE", "Current Ratio", "Solvabiliteit"],
-        "SnelStart": [ratios["winstmarge"], ratios["roe"], ratios["current_ratio"], ratios["solvabiliteit"]],
-        "Industrie Gem.": [15.0, 25.0, 1.5, 40.0],
-        "Top Performers": [25.0, 35.0, 2.0, 50.0]
-    }
-    
-    benchmark_df = pd.DataFrame(benchmark_data)
-    
-    fig = go.Figure()
-    
-    for col in ["SnelStart", "Industrie Gem.", "Top Performers"]:
-        fig.add_trace(go.Bar(
-            name=col,
-            x=benchmark_df["Metric"],
-            y=benchmark_df[col],
-            text=[f"{v:.1f}" for v in benchmark_df[col]],
-            textposition='outside'
-        ))
-    
-    fig.update_layout(
-        title="Prestaties vs Industrie Benchmarks",
-        xaxis_title="Metric",
-        yaxis_title="Waarde",
-        barmode='group',
-        height=400
+    show_figure("benchmark", lambda: get_figure("benchmark", store, entity, current_year()))
+    st.caption("Vergeleken met administraties uit dezelfde sector en omzetklasse in de dataset "
+               "(of een bredere groep als die te klein is). P = percentiel binnen die groep.")
+
+def render_recommendations():
+    st.markdown("### 💡 Strategische Aanbevelingen")
+    
+    render_recommendation_cards()
+    render_scenarios()
+    render_benchmark()
+
+def scenario_slider(col, label, value, low, high, key, year):
+    # Slider in procenten; de standaardwaarde komt uit de historie
+    return col.slider(label, low, high, min(max(round(value * 100, 1), low), high), 0.5,
+                      key=f"scenario_{key}_{entity}_{year}") / 100
+
+@section_fragment("scenario")
+def render_scenarios():
+    # De sliders staan in dit fragment: schuiven herhaalt alleen de scenario's
+    year = current_year()
+    if not has_recommendations(store, entity, year):
+        return
+    
+    st.markdown("### 🔮 Scenario-analyse")
+    
+    defaults = historical_assumptions(store, entity, year)
+    col1, col2, col3, col4, col5 = st.columns(5)
+    assumptions = defaults._replace(
+        growth=scenario_slider(col1, "Omzetgroei (%/jaar)", defaults.growth, -30.0, 50.0, "groei", year),
+        volatility=scenario_slider(col2, "Spreiding groei (%)", defaults.volatility, 0.5, 50.0, "spreiding", year),
+        cost_ratio=scenario_slider(col3, "Bedrijfskosten (% omzet)", defaults.cost_ratio, 0.0, 150.0, "kosten", year),
+        cash_conversion=scenario_slider(col4, "Kasconversie (% winst)", defaults.cash_conversion, 0.0, 150.0, "kas", year),
+        horizon=col5.select_slider("Horizon (jaren)", [1, 2, 3, 4, 5], defaults.horizon,
+                                   key=f"scenario_horizon_{entity}_{year}"),
     )
     
-    st.plotly_chart(fig, use_container_width=True)
+    show_figure("scenario", lambda: get_scenario_figure(store, entity, year, assumptions))
+    
+    result = scenario(store, entity, year, assumptions)
+    st.caption(
+        f"{assumptions.paths:,} Monte Carlo-paden vanaf {result.start_year}; standaardaannames uit de eigen historie. ".replace(",", ".")
+        + f"Kans op verlies in {result.years[0]}: {result.loss_probability[0]:.0%} · "
+        f"kans op een negatieve kaspositie in {result.years[-1]}: {result.negative_cash_probability[-1]:.0%}"
+    )
+
+@section_fragment("rapport")
+def render_report_download():
+    year = current_year()
+    
+    # Create downloadable report
+    with span("rapport"):
+        report_data = build_report(store, entity, year)
+    
+    st.download_button(
+        label="📥 Download Rapport",
+        data=report_data,
+        file_name=report_filename(entity, year),
+        mime="text/plain"
+    )
+
+@section_fragment("presentatie")
+def render_presentation_export():
+    if st.button("🎯 Genereer Presentatie", type="primary"):
+        with st.spinner("Presentatie samenstellen..."):
+            presentation = get_presentation(store, entity)
+        st.download_button(
+            label="📥 Download Presentatie",
+            data=presentation,
+            file_name=f"{entity}_presentatie.html",
+            mime="text/html"
+        )
 
-with tab5:
+@section_fragment("excel")
+def render_workbook_export():
+    scope = st.radio(
+        "Omvang",
+        ["Deze administratie", "Hele portefeuille"],
+        horizontal=True,
+        key="excel_scope",
+        disabled=len(store.entities) == 1,
+    )
+    daily = load_ledger_daily(export_paths, data_version)
+    portfolio = scope == "Hele portefeuille"
+    entities = None if portfolio else [entity]
+    
+    # Werkmap pas opbouwen bij de klik (in een aparte thread, via een
+    # tijdelijk bestand), niet bij elke rerun van de Rapporten-tab
+    st.download_button(
+        label="📥 Download Excel",
+        data=lambda: workbook_file(store, entities, daily),
+        file_name=workbook_filename(None if portfolio else entity),
+        mime=XLSX_MIME,
+    )
+    if daily is None:
+        st.caption("Maandcijfers komen erbij zodra grootboekexports zijn ingelezen (SNELSTART_EXPORTS).")
+
+def render_reports():
     st.markdown("### 📑 Download Rapporten")
     
     col1, col2 = st.columns(2)
@@ -716,37 +518,7 @@ with tab5:
         st.markdown("- Kasstroomoverzicht")
         st.markdown("- Ratio analyse")
         
-        # Create downloadable report
-        report_data = f"""
-SNELSTART FINANCIEEL RAPPORT {selected_year}
-
-KERNCIJFERS
------------
-Omzet: {format_currency(profit_loss[selected_year]["Netto-omzet"])}
-Nettowinst: {format_currency(profit_loss[selected_year]["Nettowinst"])}
-Eigen Vermogen: {format_currency(balance_sheet[selected_year]["Eigen vermogen"])}
-Liquide Middelen: {format_currency(balance_sheet[selected_year]["Liquide middelen"])}
-
-RATIO'S
--------
-Current Ratio: {ratios['current_ratio']:.2f}
-Quick Ratio: {ratios['quick_ratio']:.2f}
-Solvabiliteit: {ratios['solvabiliteit']:.1f}%
-ROE: {ratios['roe']:.1f}%
-ROA: {ratios['roa']:.1f}%
-Winstmarge: {ratios['winstmarge']:.1f}%
-
-CONCLUSIE
----------
-SnelStart toont uitstekende financiële prestaties met sterke groei en gezonde ratio's.
-        """
-        
-        st.download_button(
-            label="📥 Download Rapport",
-            data=report_data,
-            file_name=f"snelstart_rapport_{selected_year}.txt",
-            mime="text/plain"
-        )
+        render_report_download()
         st.markdown('</div>', unsafe_allow_html=True)
     
     with col2:
@@ -757,12 +529,104 @@ SnelStart toont uitstekende financiële prestaties met sterke groei en gezonde r
         st.markdown("- Kerncijfers en trends")
         st.markdown("- Aanbevelingen en conclusies")
         
-        st.button("🎯 Genereer Presentatie", type="primary")
+        render_presentation_export()
         st.markdown('</div>', unsafe_allow_html=True)
+    
+    st.markdown('<div class="info-card">', unsafe_allow_html=True)
+    st.markdown("#### 📗 Excel Export")
+    st.markdown("Balans, winst & verlies, kasstroom, ratio's en maandcijfers als werkmap (.xlsx).")
+    render_workbook_export()
+    st.markdown('</div>', unsafe_allow_html=True)
+
+SECTIONS = {
+    "📊 Dashboard": render_dashboard,
+    "💰 Financiële Analyse": render_analysis,
+    "📈 Trends": render_trends,
+    "💡 Aanbevelingen": render_recommendations,
+    "📑 Rapporten": render_reports,
+}
+
+section = st.radio(
+    "Sectie",
+    list(SECTIONS),
+    horizontal=True,
+    label_visibility="collapsed",
+    key="section",
+)
+with span(f"sectie: {section}"):
+    SECTIONS[section]()
 
 # Footer
 st.markdown("---")
 st.markdown(
     "<p style='text-align: center; color: #94a3b8;'>Dashboard gemaakt voor Financieel Management | HvA Bedrijfskunde | SnelStart Software B.V.</p>",
     unsafe_allow_html=True
-)
\ No newline at end of file
+)
+
+profile = finish_rerun()
+
+# Verborgen diagnostiekpaneel: ?diagnostics=1 of SNELSTART_DIAGNOSTICS=1
+if st.query_params.get("diagnostics") == "1" or os.environ.get("SNELSTART_DIAGNOSTICS") == "1":
+    with st.expander("🔧 Diagnostiek", expanded=True):
+        col1, col2 = st.columns(2)
+        
+        with col1:
+            st.markdown(f"#### Deze rerun: {profile.total_ms:.0f} ms")
+            if "eerste weergave" in profile.marks:
+                st.caption(f"Eerste weergave na {profile.marks['eerste weergave']:.0f} ms")
+            st.dataframe(
+                pd.DataFrame(profile.spans, columns=["Onderdeel", "ms"]).round(1),
+                use_container_width=True,
+                hide_index=True
+            )
+            st.markdown("#### Payload per figuur")
+            st.dataframe(
+                pd.DataFrame(list(profile.payloads.items()), columns=["Figuur", "Bytes"]),
+                use_container_width=True,
+                hide_index=True
+            )
+        
+        with col2:
+            st.markdown("#### Dataset")
+            st.markdown(
+                f"Versie `{data_version[:12]}` · {len(store.entities):,} administraties x {len(years)} jaar · "
+                f"{store.nbytes / 1e6:.1f} MB gedeeld door alle sessies".replace(",", ".")
+            )
+            st.markdown(f"Opwarmen: {warmup.done}/{warmup.total} taken, {warmup.errors} mislukt")
+            if warmup.skipped:
+                # Past niet in de figuurcache; deze worden bij het eerste bezoek gebouwd
+                shown = ", ".join(warmup.skipped[:20]) + (" …" if len(warmup.skipped) > 20 else "")
+                st.caption(f"{len(warmup.skipped):,} administraties niet opgewarmd: ".replace(",", ".") + shown)
+            unmapped = load_unmapped(export_paths, data_version)
+            if unmapped is not None:
+                st.markdown(f"Rekeningschema `{mapping_from_env().key}` · {len(unmapped):,} niet-gemapte rekeningen".replace(",", "."))
+                if len(unmapped):
+                    st.download_button(
+                        "📥 Niet-gemapte rekeningen (alle administraties)",
+                        unmapped_report(unmapped).to_csv(index=False, sep=";", decimal=","),
+                        file_name="niet_gemapte_rekeningen.csv",
+                        mime="text/csv"
+                    )
+            if st.button("🔄 Dataset opnieuw laden"):
+                dataset_cache.invalidate()
+                st.rerun()
+            
+            st.markdown("#### Caches")
+            usage = budget.stats()
+            st.markdown(
+                f"{usage['used_bytes'] / 1e6:,.1f} MB van {usage['budget_bytes'] / 1e6:,.0f} MB budget "
+                f"({BUDGET_ENV}) · {usage['evictions']:,} verdrongen door het budget".replace(",", ".")
+            )
+            caches = pd.DataFrame(cache_stats())
+            caches["MB"] = caches.pop("bytes") / 1e6
+            st.dataframe(caches.round(3), use_container_width=True, hide_index=True)
+            summary = latency_summary()
+            if summary:
+                st.markdown("#### Rerun-latency")
+                # Volledige reruns en fragment-reruns apart
+                for scope, stats in summary.items():
+                    label = "Volledige pagina" if scope == "app" else f"Fragment {scope}"
+                    st.markdown(
+                        f"{label} · p50: **{stats['p50_ms']:.0f} ms** · p95: **{stats['p95_ms']:.0f} ms** "
+                        f"· max: {stats['max_ms']:.0f} ms ({stats['reruns']} reruns)"
+                    )
@@ -0,0 +1,141 @@
+"""Lokale stand-in voor de SnelStart B2B API, voor offline tests van de sync.
+
+Serveert synthetische administraties (zie synthetic_data.py) in dezelfde
+vorm als snelstart_sync.py verwacht, met instelbare latency en foutkans:
+
+    python snelstart_stub.py --entities 1000 --years 5 --latency 0.02
+    SNELSTART_API_URL=http://127.0.0.1:8765/v2 python snelstart_sync.py --out exports/
+"""
+import argparse
+import asyncio
+import random
+
+import numpy as np
+import pandas as pd
+from aiohttp import web
+
+from account_mapping import DEFAULT_ACCOUNT_RANGES, LEDGER_RUBRICS
+from synthetic_data import synthetic_entities, synthetic_flows, synthetic_ledger
+
+DEFAULT_PORT = 8765
+
+# Grootboeken zoals SnelStart ze teruggeeft; mutaties verwijzen naar het id
+LEDGER_ACCOUNTS = [
+    {"id": f"gb-{start}", "nummer": start, "omschrijving": rubric}
+    for start, _, rubric in DEFAULT_ACCOUNT_RANGES
+    if rubric in LEDGER_RUBRICS
+]
+
+
+class StubData:
+    # Alle mutaties worden één keer (gevectoriseerd) opgebouwd; per
+    # administratie pas bij de eerste opvraging omgezet naar API-records
+    def __init__(self, n_entities, n_years, last_year=2024, seed=0, bookings_per_year=12):
+        self.entities, self.meta = synthetic_entities(n_entities)
+        flows, _ = synthetic_flows(n_entities, n_years, seed)
+        ledger = synthetic_ledger(self.entities, self.meta, flows, last_year - n_years + 1, bookings_per_year)
+
+        # Rijen staan per administratie bij elkaar
+        codes = ledger["Administratie"].to_numpy(dtype=object)
+        starts = np.searchsorted(codes, self.entities, side="left")
+        ends = np.searchsorted(codes, self.entities, side="right")
+        self._ranges = {e: (int(a), int(b)) for e, a, b in zip(self.entities, starts, ends)}
+        self._dates = pd.to_datetime(ledger["Boekdatum"], format="%d-%m-%Y").dt.strftime("%Y-%m-%dT00:00:00").tolist()
+        self._accounts = [f"gb-{account}" for account in ledger["Grootboekrekening"]]
+        self._amounts = ledger["Bedrag"].tolist()
+        self._mutations = {}
+
+    def __contains__(self, entity):
+        return entity in self._ranges
+
+    def administrations(self):
+        return [
+            {"id": e, "naam": self.meta[e]["entity_name"], "kvk": self.meta[e]["kvk"], "sector": self.meta[e]["sector"]}
+            for e in self.entities
+        ]
+
+    def mutations(self, entity):
+        if entity not in self._mutations:
+            start, end = self._ranges[entity]
+            self._mutations[entity] = [
+                {"datum": date, "grootboek": {"id": account},
+                 "debet": round(max(amount, 0), 2), "credit": round(max(-amount, 0), 2)}
+                for date, account, amount in zip(self._dates[start:end], self._accounts[start:end], self._amounts[start:end])
+            ]
+        return self._mutations[entity]
+
+
+def create_app(data, latency=0.0, failure_rate=0.0, seed=0, retry_after="0"):
+    """aiohttp-app met de endpoints van de sync-client.
+
+    ``latency`` (seconden) vertraagt elk antwoord; ``failure_rate`` geeft die
+    fractie van de verzoeken een 429 of 503, zodat retries getest worden.
+    ``retry_after`` is de Retry-After-header bij een 429 (seconden of HTTP-datum).
+    """
+    rng = random.Random(seed)
+
+    @web.middleware
+    async def simulate_network(request, handler):
+        if latency:
+            await asyncio.sleep(latency)
+        if failure_rate and rng.random() < failure_rate:
+            if rng.random() < 0.5:
+                return web.json_response({"message": "Te veel verzoeken"}, status=429, headers={"Retry-After": retry_after})
+            return web.json_response({"message": "Tijdelijk niet beschikbaar"}, status=503)
+        return await handler(request)
+
+    def page(request, items):
+        skip = int(request.query.get("$skip", 0))
+        top = int(request.query.get("$top", 500))
+        return web.json_response(items[skip:skip + top])
+
+    async def administrations(request):
+        return page(request, data.administrations())
+
+    async def accounts(request):
+        if request.match_info["administratie"] not in data:
+            raise web.HTTPNotFound()
+        return page(request, LEDGER_ACCOUNTS)
+
+    async def mutations(request):
+        entity = request.match_info["administratie"]
+        if entity not in data:
+            raise web.HTTPNotFound()
+        return page(request, data.mutations(entity))
+
+    app = web.Application(middlewares=[simulate_network])
+    app.router.add_get("/v2/administraties", administrations)
+    app.router.add_get("/v2/{administratie}/grootboeken", accounts)
+    app.router.add_get("/v2/{administratie}/grootboekmutaties", mutations)
+    return app
+
+
+async def start_stub(data, host="127.0.0.1", port=0, **options):
+    # Start de stub in de huidige event loop; geeft (runner, basis-URL)
+    runner = web.AppRunner(create_app(data, **options), access_log=None)
+    await runner.setup()
+    site = web.TCPSite(runner, host, port)
+    await site.start()
+    port = runner.addresses[0][1]
+    return runner, f"http://{host}:{port}/v2"
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=DEFAULT_PORT)
+    parser.add_argument("--entities", type=int, default=100)
+    parser.add_argument("--years", type=int, default=5)
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--latency", type=float, default=0.0, help="vertraging per verzoek in seconden")
+    parser.add_argument("--failure-rate", type=float, default=0.0, help="fractie verzoeken met 429/503")
+    args = parser.parse_args(argv)
+
+    data = StubData(args.entities, args.years, seed=args.seed)
+    print(f"Stub met {args.entities} administraties op http://{args.host}:{args.port}/v2")
+    web.run_app(create_app(data, args.latency, args.failure_rate, args.seed),
+                host=args.host, port=args.port, access_log=None, print=None)
+
+
+if __name__ == "__main__":
+    main()
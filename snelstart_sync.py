@@ -0,0 +1,329 @@
+"""Grootboekmutaties van alle administraties ophalen via de SnelStart B2B API.
+
+Eén gedeelde HTTP-sessie (connection pool), pagina's parallel binnen een
+rate limit, en een retry-budget voor de hele run. De mutaties komen in een
+``LedgerAggregate`` (dezelfde structuur als bij ingelezen exports) of als
+CSV-exports die het dashboard via SNELSTART_EXPORTS inleest:
+
+    python snelstart_sync.py --out exports/api
+    python snelstart_sync.py --administraties A00001 A00002 --rate 20
+"""
+import argparse
+import asyncio
+import os
+import shutil
+import time
+from collections import namedtuple
+from datetime import datetime, timezone
+from email.utils import parsedate_to_datetime
+from pathlib import Path
+
+import aiohttp
+import pandas as pd
+
+from ingest import DEFAULT_CHUNKSIZE, LedgerAggregate
+
+DEFAULT_BASE_URL = "https://b2bapi.snelstart.nl/v2"
+
+SyncConfig = namedtuple(
+    "SyncConfig",
+    [
+        "base_url",
+        "subscription_key",
+        "concurrency",     # open verbindingen in de pool
+        "rate_limit",      # verzoeken per seconde over de hele run
+        "retries",         # totaal aantal herhaalpogingen over de hele run
+        "page_size",
+        "page_window",     # pagina's per administratie tegelijk onderweg
+        "timeout",         # seconden per verzoek
+    ],
+    defaults=(DEFAULT_BASE_URL, "", 32, 50.0, 200, 500, 4, 30.0),
+)
+
+# Tijdelijke fouten die een nieuwe poging waard zijn
+RETRY_STATUS = {429, 500, 502, 503, 504}
+
+
+class SyncError(Exception):
+    pass
+
+
+def retry_after_seconds(value):
+    # Retry-After is een aantal seconden of een HTTP-datum (RFC 9110); bij
+    # iets anders geldt gewoon de exponentiële backoff
+    if not value:
+        return 0.0
+    try:
+        return max(float(value), 0.0)
+    except ValueError:
+        pass
+    try:
+        moment = parsedate_to_datetime(value)
+    except (TypeError, ValueError):
+        return 0.0
+    if moment.tzinfo is None:
+        moment = moment.replace(tzinfo=timezone.utc)
+    return max((moment - datetime.now(timezone.utc)).total_seconds(), 0.0)
+
+
+class RateLimiter:
+    """Token bucket: gemiddeld ``rate`` verzoeken per seconde, met kleine pieken."""
+
+    def __init__(self, rate, burst=None):
+        self.rate = rate
+        self.capacity = burst or max(1.0, rate / 10)
+        self._tokens = self.capacity
+        self._updated = time.monotonic()
+        self._lock = asyncio.Lock()
+
+    async def acquire(self):
+        async with self._lock:
+            while True:
+                now = time.monotonic()
+                self._tokens = min(self.capacity, self._tokens + (now - self._updated) * self.rate)
+                self._updated = now
+                if self._tokens >= 1:
+                    self._tokens -= 1
+                    return
+                await asyncio.sleep((1 - self._tokens) / self.rate)
+
+
+class SyncStats:
+    def __init__(self):
+        self.started = time.perf_counter()
+        self.requests = 0
+        self.retries = 0
+        self.rows = 0
+        self.administrations = 0
+        self.failed = {}
+
+    @property
+    def seconds(self):
+        return time.perf_counter() - self.started
+
+    def summary(self):
+        rate = self.administrations / self.seconds if self.seconds else 0
+        return (f"{self.administrations} administraties, {self.rows} mutaties, {self.requests} verzoeken "
+                f"({self.retries} retries, {len(self.failed)} mislukt) in {self.seconds:.1f}s "
+                f"= {rate:.1f} administraties/s")
+
+
+class SnelStartClient:
+    def __init__(self, session, config, stats=None):
+        self.session = session
+        self.config = config
+        self.stats = stats or SyncStats()
+        self.limiter = RateLimiter(config.rate_limit)
+        self._retry_budget = config.retries
+
+    async def get(self, path, params=None):
+        attempt = 0
+        while True:
+            await self.limiter.acquire()
+            self.stats.requests += 1
+            try:
+                async with self.session.get(self.config.base_url + path, params=params) as response:
+                    if response.status not in RETRY_STATUS:
+                        response.raise_for_status()
+                        return await response.json()
+                    retry_after = retry_after_seconds(response.headers.get("Retry-After"))
+                    error = f"HTTP {response.status}"
+            except (aiohttp.ClientConnectionError, asyncio.TimeoutError) as exc:
+                retry_after, error = 0, repr(exc)
+
+            # Budget geldt voor de hele run: bij een storing niet eindeloos doorgaan
+            if self._retry_budget <= 0:
+                raise SyncError(f"{path}: retry-budget op ({error})")
+            self._retry_budget -= 1
+            self.stats.retries += 1
+            attempt += 1
+            await asyncio.sleep(max(retry_after, min(0.1 * 2 ** attempt, 10)))
+
+    async def paged(self, path):
+        # Eerst één pagina (de meeste lijsten passen erin), daarna 1, 2, 4, ...
+        # pagina's tegelijk (tot ``page_window``) tot de eerste niet-volle
+        # pagina; zonder totaal vooraf gaan er zo hooguit evenveel verzoeken
+        # verloren als er nodig waren
+        size = self.config.page_size
+        items = await self.get(path, {"$skip": 0, "$top": size})
+        if len(items) < size:
+            return items
+        first, window = 1, 1
+        while True:
+            pages = await asyncio.gather(*(
+                self.get(path, {"$skip": (first + i) * size, "$top": size}) for i in range(window)
+            ))
+            for page in pages:
+                items.extend(page)
+                if len(page) < size:
+                    return items
+            first += window
+            window = min(window * 2, self.config.page_window)
+
+    async def administrations(self):
+        return await self.paged("/administraties")
+
+    async def ledger_rows(self, administration):
+        # Mutaties van één administratie in het kolomformaat van de exports
+        code = administration["id"]
+        accounts, mutations = await asyncio.gather(
+            self.paged(f"/{code}/grootboeken"),
+            self.paged(f"/{code}/grootboekmutaties"),
+        )
+        numbers = {account["id"]: account["nummer"] for account in accounts}
+        frame = pd.DataFrame({
+            "Administratie": code,
+            "Administratienaam": administration.get("naam") or code,
+            "KvK": administration.get("kvk") or "",
+            "Sector": administration.get("sector") or "",
+            "Boekdatum": pd.to_datetime([m["datum"] for m in mutations], format="ISO8601"),
+            "Grootboekrekening": [numbers.get(m["grootboek"]["id"]) for m in mutations],
+            "Debet": [m.get("debet") or 0 for m in mutations],
+            "Credit": [m.get("credit") or 0 for m in mutations],
+        })
+        self.stats.rows += len(frame)
+        self.stats.administrations += 1
+        return frame
+
+
+async def sync(config, handle, administrations=None):
+    """Alle (of de gegeven) administraties ophalen; ``handle(frame)`` per administratie.
+
+    ``handle`` draait in de event loop zodra een administratie binnen is,
+    zodat niet alle mutaties tegelijk in het geheugen staan.
+    """
+    stats = SyncStats()
+    headers = {"Ocp-Apim-Subscription-Key": config.subscription_key} if config.subscription_key else {}
+    connector = aiohttp.TCPConnector(limit=config.concurrency)
+    timeout = aiohttp.ClientTimeout(total=config.timeout)
+    async with aiohttp.ClientSession(connector=connector, timeout=timeout, headers=headers) as session:
+        client = SnelStartClient(session, config, stats)
+        listed = await client.administrations()
+        if administrations is not None:
+            wanted = set(administrations)
+            listed = [a for a in listed if a["id"] in wanted]
+
+        # Niet meer administraties tegelijk dan de pool kan bedienen
+        slots = asyncio.Semaphore(max(1, config.concurrency // config.page_window))
+
+        async def one(administration):
+            async with slots:
+                try:
+                    handle(await client.ledger_rows(administration))
+                except (SyncError, aiohttp.ClientError) as exc:
+                    stats.failed[administration["id"]] = str(exc)
+
+        await asyncio.gather(*(one(a) for a in listed))
+    return stats
+
+
+class AggregateWriter:
+    # Mutaties in batches naar dagtotalen; add_chunk per administratie zou
+    # vooral vaste pandas-overhead in de event loop kosten
+    def __init__(self, aggregate=None, batch_rows=DEFAULT_CHUNKSIZE):
+        self.aggregate = aggregate or LedgerAggregate()
+        self.batch_rows = batch_rows
+        self._frames = []
+        self._rows = 0
+
+    def __call__(self, frame):
+        self._frames.append(frame)
+        self._rows += len(frame)
+        if self._rows >= self.batch_rows:
+            self.flush()
+
+    def flush(self):
+        if self._frames:
+            self.aggregate.add_chunk(pd.concat(self._frames, ignore_index=True))
+            self._frames = []
+            self._rows = 0
+
+
+def sync_aggregate(config, administrations=None):
+    # Mutaties direct in dagtotalen: LedgerAggregate.to_store() geeft de dashboarddata
+    writer = AggregateWriter()
+    stats = asyncio.run(sync(config, writer, administrations))
+    writer.flush()
+    writer.aggregate.compact()
+    return writer.aggregate, stats
+
+
+class ExportWriter:
+    # CSV-exports van ``per_file`` administraties, zoals handmatige SnelStart-exports
+    def __init__(self, directory, per_file=500, prefix="snelstart_api"):
+        self.directory = Path(directory)
+        self.directory.mkdir(parents=True, exist_ok=True)
+        self.per_file = per_file
+        self.prefix = prefix
+        self.paths = []
+        self._frames = []
+
+    def __call__(self, frame):
+        self._frames.append(frame)
+        if len(self._frames) >= self.per_file:
+            self.flush()
+
+    def flush(self):
+        if not self._frames:
+            return
+        path = self.directory / f"{self.prefix}_{len(self.paths):04d}.csv"
+        pd.concat(self._frames, ignore_index=True).to_csv(path, index=False, date_format="%d-%m-%Y")
+        self.paths.append(path)
+        self._frames = []
+
+
+def config_from_env(**overrides):
+    config = SyncConfig(
+        base_url=os.environ.get("SNELSTART_API_URL", DEFAULT_BASE_URL).rstrip("/"),
+        subscription_key=os.environ.get("SNELSTART_API_KEY", ""),
+    )
+    return config._replace(**{k: v for k, v in overrides.items() if v is not None})
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--out", type=Path, required=True, help="map voor de CSV-exports")
+    parser.add_argument("--administraties", nargs="*", help="alleen deze administratiecodes")
+    parser.add_argument("--concurrency", type=int)
+    parser.add_argument("--rate", type=float, dest="rate_limit", help="verzoeken per seconde")
+    parser.add_argument("--retries", type=int, help="retry-budget voor de hele run")
+    parser.add_argument("--page-size", type=int)
+    args = parser.parse_args(argv)
+
+    config = config_from_env(concurrency=args.concurrency, rate_limit=args.rate_limit,
+                             retries=args.retries, page_size=args.page_size)
+    # Eerst naar een tijdelijke map, zodat het dashboard nooit een halve sync
+    # inleest; resten van een afgebroken run eerst opruimen
+    staging = args.out.with_name(args.out.name + ".partial")
+    shutil.rmtree(staging, ignore_errors=True)
+    writer = ExportWriter(staging)
+    try:
+        stats = asyncio.run(sync(config, writer, args.administraties))
+    except (SyncError, aiohttp.ClientError) as exc:
+        # Lijst met administraties niet op te halen: niets gewijzigd
+        shutil.rmtree(staging, ignore_errors=True)
+        print(f"Sync mislukt: {exc}")
+        return 1
+    writer.flush()
+    print(stats.summary())
+    for code, error in list(stats.failed.items())[:10]:
+        print(f"  mislukt: {code}: {error}")
+
+    if stats.failed:
+        # Niet wisselen: de vorige exports bevatten de mislukte administraties nog
+        shutil.rmtree(staging, ignore_errors=True)
+        print(f"Vorige exports in {args.out} blijven staan ({len(stats.failed)} administraties mislukt)")
+        return 1
+
+    if args.out.exists():
+        for old in args.out.glob("snelstart_api_*.csv"):
+            old.unlink()
+    args.out.mkdir(parents=True, exist_ok=True)
+    for path in writer.paths:
+        path.replace(args.out / path.name)
+    staging.rmdir()
+    return 0
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
@@ -0,0 +1,153 @@
+from pathlib import Path
+
+import numpy as np
+import pandas as pd
+
+from account_mapping import DEFAULT_ACCOUNT_RANGES
+from ingest import CREDIT_RUBRICS, LEDGER_RUBRICS, store_from_flows
+
+
+# SBI-secties waarover de synthetische administraties verdeeld worden
+SYNTHETIC_SECTORS = (
+    "C Industrie",
+    "F Bouwnijverheid",
+    "G Handel",
+    "I Horeca",
+    "J Informatie en communicatie",
+    "M Specialistische zakelijke diensten",
+    "Q Gezondheids- en welzijnszorg",
+)
+
+
+def synthetic_entities(n_entities):
+    entities = [f"A{i:05d}" for i in range(1, n_entities + 1)]
+    meta = {
+        entity: {
+            "entity_name": f"Administratie {i} B.V.",
+            "kvk": f"{10_000_000 + i * 7919 % 90_000_000:08d}",
+            "sector": SYNTHETIC_SECTORS[i * 31 % len(SYNTHETIC_SECTORS)],
+        }
+        for i, entity in enumerate(entities, start=1)
+    }
+    return entities, meta
+
+
+def synthetic_flows(n_entities, n_years, seed=0, late_start=0.1):
+    """Jaarmutaties (entity x jaar x rubriek, centen) zoals ze uit een
+    grootboekexport komen: debet positief, credit negatief.
+
+    Een fractie ``late_start`` van de administraties begint later, zodat
+    niet elke administratie in elk jaar cijfers heeft.
+    """
+    rng = np.random.default_rng(seed)
+    shape = (n_entities, n_years)
+
+    first_year = np.zeros(n_entities, dtype=np.int64)
+    late = rng.random(n_entities) < late_start
+    first_year[late] = rng.integers(0, n_years, late.sum())
+    active = np.arange(n_years)[None, :] >= first_year[:, None]
+
+    # Winst & verlies (natuurlijke kant positief)
+    base = rng.lognormal(np.log(2_000_000), 1.2, n_entities)[:, None]
+    growth = np.cumprod(1 + rng.normal(0.06, 0.12, shape).clip(-0.5, 1.0), axis=1)
+    omzet = base * growth * active
+    kostprijs = omzet * rng.uniform(0.1, 0.45, shape)
+    bedrijfskosten = omzet * rng.uniform(0.4, 0.75, shape)
+    financieel = omzet * rng.uniform(-0.02, 0.005, shape)
+    nettowinst = omzet - kostprijs - bedrijfskosten + financieel
+
+    # Balansstanden per jaareinde; liquide middelen sluiten de balans
+    vaste = omzet[:, :, None] * rng.uniform(0.0, 0.2, (*shape, 3))
+    vorderingen = omzet * rng.uniform(0.05, 0.2, shape)
+    schulden = omzet * rng.uniform(0.1, 0.3, shape)
+    storting = np.where(np.arange(n_years)[None, :] == first_year[:, None], omzet * 0.2, 0)
+    # Helft van de winst van vorig jaar als dividend
+    dividend = -0.5 * np.pad(np.maximum(nettowinst, 0)[:, :-1], ((0, 0), (1, 0)))
+    kapitaal = np.cumsum(storting + dividend, axis=1)
+    eigen_vermogen = kapitaal + np.cumsum(nettowinst, axis=1)
+    liquide = eigen_vermogen + schulden - vaste.sum(axis=2) - vorderingen
+
+    levels = {
+        "Immateriële vaste activa": vaste[:, :, 0],
+        "Materiële vaste activa": vaste[:, :, 1],
+        "Financiële vaste activa": vaste[:, :, 2],
+        "Vorderingen en overlopende activa": vorderingen,
+        "Liquide middelen": liquide,
+        "Eigen vermogen": kapitaal,
+        "Kortlopende schulden": schulden,
+    }
+    natural = {rubric: np.diff(level * active, axis=1, prepend=0) for rubric, level in levels.items()}
+    natural.update({
+        "Netto-omzet": omzet,
+        "Kostprijs van de omzet": kostprijs,
+        "Bedrijfskosten": bedrijfskosten,
+        "Financiële baten en lasten": financieel,
+    })
+
+    signs = np.array([-1 if r in CREDIT_RUBRICS else 1 for r in LEDGER_RUBRICS], dtype=np.int64)
+    cents = np.stack([np.rint(natural[r] * 100).astype(np.int64) for r in LEDGER_RUBRICS], axis=2)
+    return cents * signs, first_year
+
+
+def synthetic_store(n_entities, n_years, last_year=2024, seed=0, late_start=0.1):
+    # Zelfde afleiding als bij ingelezen exports (store_from_flows)
+    entities, meta = synthetic_entities(n_entities)
+    years = np.arange(last_year - n_years + 1, last_year + 1)
+    flows, first_year = synthetic_flows(n_entities, n_years, seed, late_start)
+    return store_from_flows(entities, years, flows, first_year, meta)
+
+
+def ledger_rows(n_entities, n_years, bookings_per_year=12):
+    return n_entities * n_years * len(LEDGER_RUBRICS) * bookings_per_year
+
+
+def synthetic_ledger(entities, meta, flows, first_year, bookings_per_year=12):
+    """Grootboekmutaties (één rij per boeking) voor een blok administraties.
+
+    ``flows`` is het blok jaarmutaties (entity x jaar x rubriek, centen); elk
+    jaarbedrag wordt in ``bookings_per_year`` gelijke boekingen verdeeld.
+    """
+    accounts = {rubric: start for start, _, rubric in DEFAULT_ACCOUNT_RANGES}
+    account_codes = np.array([accounts[r] for r in LEDGER_RUBRICS])
+    # Boekdata verspreid over het jaar
+    offsets = (np.arange(bookings_per_year) * 365 // bookings_per_year).astype("timedelta64[D]")
+
+    e, y, r = np.nonzero(flows)
+    amounts = flows[e, y, r]
+    # Jaarbedrag in gelijke boekingen; de rest op de laatste
+    share = amounts // bookings_per_year
+    cents = np.repeat(share, bookings_per_year).reshape(-1, bookings_per_year)
+    cents[:, -1] += amounts - share * bookings_per_year
+
+    year_start = (np.datetime64(str(first_year), "Y") + y).astype("datetime64[D]")
+    dates = (year_start[:, None] + offsets[None, :]).reshape(-1)
+    codes = [entities[i] for i in np.repeat(e, bookings_per_year)]
+    return pd.DataFrame({
+        "Administratie": codes,
+        "Administratienaam": [meta[c]["entity_name"] for c in codes],
+        "KvK": [meta[c]["kvk"] for c in codes],
+        "Sector": [meta[c]["sector"] for c in codes],
+        "Boekdatum": pd.to_datetime(dates).strftime("%d-%m-%Y"),
+        "Grootboekrekening": np.repeat(account_codes[r], bookings_per_year),
+        "Bedrag": cents.reshape(-1) / 100,
+    })
+
+
+def write_synthetic_exports(directory, n_entities, n_years, last_year=2024, seed=0,
+                            late_start=0.1, bookings_per_year=12, entities_per_file=500):
+    """Schrijf SnelStart-achtige grootboekexports (CSV) waarvan het inlezen
+    precies ``synthetic_store`` met dezelfde parameters oplevert."""
+    directory = Path(directory)
+    directory.mkdir(parents=True, exist_ok=True)
+    entities, meta = synthetic_entities(n_entities)
+    flows, _ = synthetic_flows(n_entities, n_years, seed, late_start)
+    first_year = last_year - n_years + 1
+
+    paths = []
+    for start in range(0, n_entities, entities_per_file):
+        block = slice(start, start + entities_per_file)
+        frame = synthetic_ledger(entities[block], meta, flows[block], first_year, bookings_per_year)
+        path = directory / f"grootboek_{start // entities_per_file:04d}.csv"
+        frame.to_csv(path, index=False)
+        paths.append(path)
+    return paths
@@ -0,0 +1,76 @@
+import numpy as np
+import pandas as pd
+import pytest
+
+from account_mapping import DEFAULT_ACCOUNT_RANGES, LEDGER_RUBRICS, UNMAPPED, AccountMapping, mapping_from_frame
+
+OVERRIDES = {
+    "A00042": [(4500, 4599, "Kostprijs van de omzet"), (4550, 4550, "Financiële baten en lasten")],
+    "A00007": [(3000, 3099, "Kortlopende schulden")],
+}
+
+
+def brute_force(ranges, overrides, account, entity):
+    # Referentie: alle regels langs, de laatst passende wint
+    code = UNMAPPED
+    for start, end, rubric in list(ranges) + list(overrides.get(entity, [])):
+        if start <= account <= end:
+            code = LEDGER_RUBRICS.index(rubric)
+    return code
+
+
+def test_defaults():
+    mapping = AccountMapping()
+    codes = mapping.classify([0, 1000, 1099, 4500, 8000, 9999, 2500, 10000])
+    expected = ["Immateriële vaste activa", "Liquide middelen", "Liquide middelen", "Bedrijfskosten",
+                "Netto-omzet", "Financiële baten en lasten", None, None]
+    assert [LEDGER_RUBRICS[c] if c != UNMAPPED else None for c in codes] == expected
+
+
+def test_overrides_apply_per_entity():
+    mapping = AccountMapping(overrides=OVERRIDES)
+    accounts = [4500, 4550, 4600, 3050, 4500, 3050]
+    entities = ["A00042", "A00042", "A00042", "A00007", "A00001", "A00042"]
+    codes = mapping.classify(accounts, entities)
+    assert [LEDGER_RUBRICS[c] if c != UNMAPPED else None for c in codes] == [
+        "Kostprijs van de omzet",
+        "Financiële baten en lasten",  # latere regel wint
+        "Bedrijfskosten",  # buiten de afwijking: standaardschema
+        "Kortlopende schulden",
+        "Bedrijfskosten",  # andere administratie: standaardschema
+        None,  # afwijking van A00007 geldt niet voor A00042
+    ]
+
+
+def test_invalid_accounts_are_unmapped():
+    mapping = AccountMapping(overrides=OVERRIDES)
+    codes = mapping.classify(["abc", None, -5, "1000", 2.0 ** 41], ["A00042"] * 5)
+    assert codes.tolist() == [UNMAPPED, UNMAPPED, UNMAPPED, LEDGER_RUBRICS.index("Liquide middelen"), UNMAPPED]
+
+
+def test_classify_matches_brute_force():
+    mapping = AccountMapping(overrides=OVERRIDES)
+    rng = np.random.default_rng(0)
+    accounts = rng.integers(0, 12000, 5000)
+    entities = rng.choice(["A00042", "A00007", "A00001"], 5000)
+    expected = [brute_force(DEFAULT_ACCOUNT_RANGES, OVERRIDES, a, e) for a, e in zip(accounts, entities)]
+    assert mapping.classify(accounts, entities).tolist() == expected
+
+
+def test_mapping_from_frame():
+    frame = pd.DataFrame({
+        "Administratie": ["", "A00042"],
+        "Van": [2000, 4500],
+        "Tot": [2099, 4599],
+        "Rubriek": ["Kortlopende schulden", "Kostprijs van de omzet"],
+    })
+    mapping = mapping_from_frame(frame)
+    codes = mapping.classify([2050, 4500, 4500], ["A00001", "A00042", "A00001"])
+    assert [LEDGER_RUBRICS[c] for c in codes] == ["Kortlopende schulden", "Kostprijs van de omzet", "Bedrijfskosten"]
+    # Zelfde inhoud, zelfde sleutel
+    assert mapping.key == mapping_from_frame(frame).key != AccountMapping().key
+
+
+def test_unknown_rubric_is_rejected():
+    with pytest.raises(ValueError):
+        AccountMapping(overrides={"A00042": [(4500, 4599, "Onbekend")]})
@@ -0,0 +1,97 @@
+import types
+
+import pytest
+
+import cache
+from cache import CacheBudget, LRUCache
+
+
+class Clock:
+    def __init__(self):
+        self.now = 1000.0
+
+    def monotonic(self):
+        return self.now
+
+
+@pytest.fixture
+def clock(monkeypatch):
+    clock = Clock()
+    monkeypatch.setattr(cache, "time", types.SimpleNamespace(monotonic=clock.monotonic))
+    return clock
+
+
+def sized(budget, name, **options):
+    # Waarde = grootte in bytes
+    return LRUCache(name, sizeof=lambda value: value, budget=budget, **options)
+
+
+def test_ttl_expires_entries(clock):
+    entries = sized(CacheBudget(10_000), "ttl", ttl=60)
+    entries.put("a", 10)
+    clock.now += 30
+    entries.put("b", 20)
+    assert entries.get("a") == 10
+
+    clock.now += 40
+    assert entries.get("a") is None
+    assert entries.purge_expired() == 0  # "a" al verlopen bij het opvragen
+    clock.now += 30
+    assert entries.purge_expired() == 1
+    assert len(entries) == 0 and entries.bytes == 0
+    assert entries.stats()["expirations"] == 2
+
+
+def test_budget_keeps_total_bytes_under_limit(clock):
+    budget = CacheBudget(100)
+    first, second = sized(budget, "eerste"), sized(budget, "tweede")
+    for i in range(10):
+        clock.now += 1
+        (first if i % 2 else second).put(i, 30)
+        assert budget.used <= 100
+    assert budget.used == 90
+    assert budget.evictions == 7
+    # De drie meest recente blijven staan
+    assert {*first._entries, *second._entries} == {7, 8, 9}
+
+
+def test_evicts_largest_idle_times_size(clock):
+    budget = CacheBudget(100)
+    small, large = sized(budget, "klein"), sized(budget, "groot")
+    large.put("groot", 60)
+    clock.now += 10
+    small.put("klein", 5)
+    clock.now += 100
+    # Per cache is het LRU-item kandidaat: 60 B x 110 s weegt zwaarder dan
+    # 5 B x 100 s, ook al is het kleine item even oud
+    small.put("nieuw", 40)
+    assert "groot" not in large
+    assert {"klein", "nieuw"} <= set(small._entries)
+
+
+def test_protected_entry_does_not_shield_its_cache(clock):
+    budget = CacheBudget(1_000)
+    entries, other = sized(budget, "groot"), sized(budget, "ander")
+    entries.put("beschermd", 10)
+    clock.now += 1
+    entries.put("groot", 500)
+    clock.now += 1
+    other.put("klein", 10)
+    clock.now += 1
+
+    # Het beschermde item staat vooraan; daarachter is "groot" de beste
+    # kandidaat, niet "klein" uit de andere cache
+    budget.maxbytes = 100
+    budget.enforce(protect=(entries, "beschermd"))
+    assert list(entries._entries) == ["beschermd"]
+    assert "klein" in other
+    assert budget.used <= 100
+
+
+def test_entry_larger_than_budget_stays(clock):
+    budget = CacheBudget(100)
+    entries = sized(budget, "alles")
+    entries.put("a", 50)
+    entries.put("b", 500)
+    assert list(entries._entries) == ["b"]
+    assert budget.used == 500
@@ -0,0 +1,70 @@
+import numpy as np
+import pytest
+
+from deltas import build_year_deltas, delta, growth, lag_positions
+from financial_store import LINE_ITEMS, FinancialStore
+
+ITEM = "Netto-omzet"
+
+
+def make_store(years, amounts):
+    # Eén administratie; None = jaar niet gerapporteerd
+    values = np.zeros((1, len(years), len(LINE_ITEMS)), dtype=np.int64)
+    present = np.zeros(values.shape, dtype=bool)
+    column = LINE_ITEMS.index(ITEM)
+    for position, amount in enumerate(amounts):
+        if amount is not None:
+            values[0, position, column] = amount * 100
+            present[0, position, column] = True
+    return FinancialStore(["A00001"], years, values, present)
+
+
+def test_growth_uses_absolute_base():
+    assert growth(120, 100) == pytest.approx(20)
+    assert growth(-50, -100) == pytest.approx(50)
+    assert np.isnan(growth(10, 0))
+    assert np.isnan(growth(10, np.nan))
+
+
+def test_lag_positions_with_gaps():
+    assert lag_positions([2019, 2021, 2022], 1).tolist() == [-1, -1, 1]
+    assert lag_positions([2019, 2021, 2022], 2).tolist() == [-1, 0, -1]
+
+
+def test_yoy_missing_previous_year():
+    store = make_store(range(2019, 2025), [100, 110, None, 121, 133, 150])
+    yoy = build_year_deltas(store)["YoY"][0, :, LINE_ITEMS.index(ITEM)]
+    assert np.isnan(yoy[0])  # geen vorig jaar
+    assert yoy[1] == pytest.approx(10)
+    assert np.isnan(yoy[2])  # jaar zelf ontbreekt
+    assert np.isnan(yoy[3])  # vorig jaar ontbreekt
+    assert yoy[4] == pytest.approx(100 * (133 / 121 - 1))
+
+
+def test_yoy_gap_in_year_axis():
+    # 2020 staat niet eens op de as: 2021 heeft geen vergelijking
+    store = make_store([2019, 2021, 2022], [100, 120, 150])
+    yoy = build_year_deltas(store)["YoY"][0, :, LINE_ITEMS.index(ITEM)]
+    assert np.isnan(yoy[:2]).all()
+    assert yoy[2] == pytest.approx(25)
+
+
+def test_cagr_missing_and_non_positive_years():
+    store = make_store(range(2018, 2025), [-10, 100, 110, None, 121, 150, 200])
+    cagr = build_year_deltas(store)["CAGR 3j"][0, :, LINE_ITEMS.index(ITEM)]
+    assert np.isnan(cagr[:3]).all()  # te weinig jaren
+    assert np.isnan(cagr[3])  # jaar zelf ontbreekt
+    assert cagr[4] == pytest.approx(100 * ((121 / 100) ** (1 / 3) - 1))
+    assert cagr[5] == pytest.approx(100 * ((150 / 110) ** (1 / 3) - 1))
+    assert np.isnan(cagr[6])  # beginjaar ontbreekt
+
+    five = build_year_deltas(store)["CAGR 5j"][0, :, LINE_ITEMS.index(ITEM)]
+    assert np.isnan(five[5])  # negatieve beginstand
+    assert five[6] == pytest.approx(100 * ((200 / 100) ** (1 / 5) - 1))
+
+
+def test_delta_returns_none_without_comparison():
+    store = make_store(range(2019, 2023), [100, None, 120, 150])
+    assert delta(store, "A00001", "2021", ITEM) is None
+    assert delta(store, "A00001", "2022", ITEM) == pytest.approx(25)
+    assert delta(store, "A00001", "2022", ITEM, "CAGR 3j") == pytest.approx(100 * (1.5 ** (1 / 3) - 1))
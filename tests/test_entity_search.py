@@ -0,0 +1,54 @@
+import pytest
+
+from entity_search import EntitySearchIndex, normalize
+
+ENTITIES = {
+    "A00001": ("Bakkerij de Vries B.V.", "12345678"),
+    "A00002": ("Café Zuid", "23456789"),
+    "A00003": ("De Vries Installatietechniek", "34567890"),
+    "A00004": ("Vriesland Transport", "45678901"),
+    "A00005": ("Zuidas Advocaten", ""),
+}
+
+
+@pytest.fixture
+def index():
+    return EntitySearchIndex(ENTITIES, [name for name, _ in ENTITIES.values()], [kvk for _, kvk in ENTITIES.values()])
+
+
+def test_normalize():
+    assert normalize("Café  B.V.") == "cafe b v"
+
+
+def test_prefix_hits(index):
+    # Prefix-treffers eerst; fuzzy treffers vullen daarna aan tot de limiet
+    assert index.search("bakk")[0] == "A00001"
+    assert index.search("cafe")[0] == "A00002"  # zonder accent
+    assert index.search("vries inst")[0] == "A00003"  # elk woord als prefix
+    assert index.search("2345")[0] == "A00002"  # KvK-prefix
+    assert index.search("a00005")[0] == "A00005"
+    assert index.search("vries inst", limit=1) == ["A00003"]
+
+
+def test_ranking(index):
+    # Exacte code eerst, dan namen die met de zoekvraag beginnen, dan alfabetisch
+    assert index.search("vries")[:3] == ["A00004", "A00001", "A00003"]
+    assert index.search("zuid") == ["A00005", "A00002"]
+    assert index.search("23456789")[0] == "A00002"
+
+
+def test_typo_tolerance(index):
+    assert index.search("bakerij")[0] == "A00001"
+    assert index.search("instalatietechniek")[0] == "A00003"
+    assert index.search("xyzqwv") == []
+
+
+def test_empty_query_lists_alphabetically(index):
+    assert index.search("") == ["A00001", "A00002", "A00003", "A00004", "A00005"]
+    assert index.search("  .  ", limit=2) == ["A00001", "A00002"]
+
+
+def test_limit_and_label(index):
+    assert len(index.search("", limit=3)) == 3
+    assert index.label("A00002") == "Café Zuid (A00002) · KvK 23456789"
+    assert index.label("A00005") == "Zuidas Advocaten (A00005)"
@@ -0,0 +1,30 @@
+import numpy as np
+import pytest
+
+from figures import assets_figure, cash_flow_figure, liabilities_figure
+from financial_store import LINE_ITEMS, FinancialStore
+
+# Gedeeltelijke balans en kasstroom, zoals uit een API-administratie
+REPORTED = {"Liquide middelen": 50_000, "Eigen vermogen": 80_000, "Netto kasstroom": 12_000}
+
+
+@pytest.fixture
+def partial_store():
+    values = np.zeros((1, 1, len(LINE_ITEMS)), dtype=np.int64)
+    present = np.zeros(values.shape, dtype=bool)
+    for item, amount in REPORTED.items():
+        values[0, 0, LINE_ITEMS.index(item)] = amount * 100
+        present[0, 0, LINE_ITEMS.index(item)] = True
+    return FinancialStore(["A00001"], ["2024"], values, present)
+
+
+@pytest.mark.parametrize("builder, expected", [
+    (assets_figure, [0, 0, 50_000]),
+    (liabilities_figure, [80_000, 0]),
+    # Alleen het netto-saldo bekend: de deelstromen tellen als 0
+    (cash_flow_figure, [0, 0, 0, 0]),
+])
+def test_partial_statements_count_missing_items_as_zero(partial_store, builder, expected):
+    trace = builder(partial_store, "A00001", "2024").data[0]
+    values = trace.y if builder is cash_flow_figure else trace.values
+    assert list(values) == expected
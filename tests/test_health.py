@@ -0,0 +1,18 @@
+from formatting import format_value
+from health import HEALTH_RULES, NO_DATA, health, health_for
+from synthetic_data import synthetic_store
+
+
+def test_missing_ratios_show_not_applicable():
+    store = synthetic_store(50, 6, late_start=0.5)
+    entity = next(e for e in store.entities if len(store.entity_years(e)) < len(store.years))
+    year = store.years[0]
+    assert (health(store)["codes"][store.entity_index(entity), store.year_index(year)] == NO_DATA).all()
+    for rule, value, level, verdict in health_for(store, entity, year):
+        assert format_value(value, rule.fmt) == "n.v.t."
+        assert (level, verdict) == ("info", "Geen gegevens")
+
+
+def test_known_ratios_use_rule_format():
+    rule = HEALTH_RULES[1]
+    assert format_value(42.0, rule.fmt) == "42.0%"
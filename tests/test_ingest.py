@@ -0,0 +1,93 @@
+import numpy as np
+import pandas as pd
+import pytest
+
+from disk_cache import load_or_ingest
+from incremental import apply_append
+from ingest import ingest_exports
+from synthetic_data import synthetic_store, write_synthetic_exports
+
+N_ENTITIES, N_YEARS, LAST_YEAR, SEED = 30, 4, 2024, 1
+
+
+def assert_same_store(actual, expected):
+    assert actual.entities == expected.entities
+    assert actual.years == expected.years
+    assert actual.entity_names == expected.entity_names
+    assert actual.entity_sectors == expected.entity_sectors
+    np.testing.assert_array_equal(actual.present, expected.present)
+    np.testing.assert_array_equal(actual.values, expected.values)
+
+
+@pytest.fixture
+def exports(tmp_path):
+    return write_synthetic_exports(tmp_path / "exports", N_ENTITIES, N_YEARS, LAST_YEAR, seed=SEED, entities_per_file=10)
+
+
+def split_last_year(paths, directory, entities=None):
+    # Zelfde mutaties, maar het laatste jaar in een apart (later) exportbestand;
+    # met ``entities`` alleen voor die administraties
+    directory.mkdir()
+    frames = [pd.read_csv(path, dtype=str) for path in paths]
+    ledger = pd.concat(frames, ignore_index=True)
+    late = ledger["Boekdatum"].str.endswith(str(LAST_YEAR))
+    base, new = directory / "grootboek_basis.csv", directory / "grootboek_nieuw.csv"
+    ledger[~late].to_csv(base, index=False)
+    if entities is not None:
+        late &= ledger["Administratie"].isin(entities)
+    ledger[late].to_csv(new, index=False)
+    return base, new
+
+
+def test_ingest_matches_synthetic_store(exports):
+    store = ingest_exports(exports).to_store()
+    assert_same_store(store, synthetic_store(N_ENTITIES, N_YEARS, LAST_YEAR, seed=SEED))
+
+
+def test_disk_cache_round_trip(exports, tmp_path, monkeypatch):
+    monkeypatch.setenv("SNELSTART_CACHE_DIR", str(tmp_path / "cache"))
+    expected = synthetic_store(N_ENTITIES, N_YEARS, LAST_YEAR, seed=SEED)
+    assert_same_store(load_or_ingest(exports), expected)
+    # Tweede keer uit de cache
+    assert_same_store(load_or_ingest(exports), expected)
+
+
+def test_append_new_file_matches_rebuild(exports):
+    aggregate = ingest_exports(exports[:-1])
+    store, affected = apply_append(aggregate.to_store(), aggregate, exports[-1:])
+
+    assert {entity for entity, _ in affected} == set(store.entities[20:])
+    assert_same_store(store, ingest_exports(exports).to_store())
+
+
+def test_append_new_year_matches_rebuild(exports, tmp_path):
+    base, new = split_last_year(exports, tmp_path / "split")
+    aggregate = ingest_exports([base])
+    previous = aggregate.to_store()
+    assert previous.years[-1] == str(LAST_YEAR - 1)
+
+    store, affected = apply_append(previous, aggregate, [new])
+    assert {year for _, year in affected} == {LAST_YEAR}
+    assert_same_store(store, ingest_exports([base, new]).to_store())
+
+
+def test_partial_new_year_only_for_booked_entities(exports, tmp_path):
+    booked = ["A00003", "A00017"]
+    base, new = split_last_year(exports, tmp_path / "split", entities=booked)
+    aggregate = ingest_exports([base])
+    store, _ = apply_append(aggregate.to_store(), aggregate, [new])
+
+    assert store.years[-1] == str(LAST_YEAR)
+    assert_same_store(store, ingest_exports([base, new]).to_store())
+    for entity in store.entities:
+        assert (store.entity_years(entity)[-1] == str(LAST_YEAR)) == (entity in booked)
+        # Geen (lege) winst-en-verliesrekening in een jaar zonder boekingen
+        assert store.has(entity, str(LAST_YEAR), "Netto-omzet") == (entity in booked)
+
+
+def test_disk_cache_appends_new_files(exports, tmp_path, monkeypatch):
+    monkeypatch.setenv("SNELSTART_CACHE_DIR", str(tmp_path / "cache"))
+    base, new = split_last_year(exports, tmp_path / "split")
+    load_or_ingest([base])
+    # De tweede stand bouwt voort op de cache-entry van de eerste
+    assert_same_store(load_or_ingest([base, new]), ingest_exports([base, new]).to_store())
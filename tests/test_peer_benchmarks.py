@@ -0,0 +1,45 @@
+import numpy as np
+import pytest
+
+from peer_benchmarks import QuantileSketch
+
+# Rangfout van de sketch (fractie van n) bij de standaard-k
+TOLERANCE = 0.02
+
+
+@pytest.fixture
+def data():
+    rng = np.random.default_rng(7)
+    # Scheef verdeeld, met negatieve waarden en veel gelijke waarden
+    return np.concatenate([rng.lognormal(10, 1.5, 80_000), -rng.exponential(1e4, 15_000), np.zeros(5_000)])
+
+
+def exact_rank(data, value):
+    return np.mean(data <= value)
+
+
+def test_rank_matches_exact_percentiles(data):
+    sketch = QuantileSketch(seed=1)
+    sketch.update(data)
+    assert len(sketch) == len(data)
+    for q in (0.01, 0.1, 0.25, 0.5, 0.75, 0.9, 0.99):
+        value = np.quantile(data, q)
+        assert sketch.rank(value) == pytest.approx(exact_rank(data, value), abs=TOLERANCE)
+        assert exact_rank(data, sketch.quantile(q)) == pytest.approx(q, abs=TOLERANCE)
+
+
+def test_merged_sketches_stay_accurate(data):
+    merged = QuantileSketch(seed=1)
+    for part in np.array_split(data, 16):
+        sketch = QuantileSketch(seed=2)
+        sketch.update(part)
+        merged.merge(sketch)
+    assert len(merged) == len(data)
+    for value in np.quantile(data, [0.05, 0.5, 0.95]):
+        assert merged.rank(value) == pytest.approx(exact_rank(data, value), abs=TOLERANCE)
+
+
+def test_small_input_is_exact():
+    sketch = QuantileSketch()
+    sketch.update([3.0, 1.0, 2.0])
+    assert [sketch.rank(v) for v in (0.5, 1.0, 2.5, 3.0)] == pytest.approx([0, 1 / 3, 2 / 3, 1])
@@ -0,0 +1,33 @@
+import json
+
+from profiling import latency_summary
+
+
+def write_records(path, records):
+    with open(path, "w", encoding="utf-8") as handle:
+        for scope, total_ms in records:
+            handle.write(json.dumps({"scope": scope, "total_ms": total_ms}) + "\n")
+
+
+def test_fragment_reruns_do_not_skew_app_latency(tmp_path):
+    path = tmp_path / "reruns.jsonl"
+    write_records(path, [("app", 400.0)] * 10 + [("jaar", 20.0)] * 90)
+    summary = latency_summary(path)
+    assert list(summary) == ["app", "jaar"]
+    assert summary["app"]["reruns"] == 10
+    assert summary["app"]["p50_ms"] == summary["app"]["p95_ms"] == 400
+    assert summary["jaar"]["p95_ms"] == 20
+
+
+def test_last_reruns_per_scope(tmp_path):
+    path = tmp_path / "reruns.jsonl"
+    write_records(path, [("app", 1000.0)] * 5 + [("app", 100.0)] * 5 + [("jaar", 10.0)] * 50)
+    summary = latency_summary(path, last=5)
+    assert summary["app"]["max_ms"] == 100
+    assert summary["jaar"]["reruns"] == 5
+
+
+def test_no_metrics(tmp_path):
+    assert latency_summary(tmp_path / "ontbreekt.jsonl") is None
+    (tmp_path / "leeg.jsonl").write_text("")
+    assert latency_summary(tmp_path / "leeg.jsonl") is None
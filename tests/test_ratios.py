@@ -0,0 +1,59 @@
+import re
+
+import numpy as np
+import pytest
+
+from financial_store import LINE_ITEMS, FinancialStore
+from formatting import PERCENT, RATIO, format_value
+from ratios import RATIO_COLUMNS, ratio_frame, ratios_for
+from reports import build_report
+
+
+def make_store(rows):
+    # rows: per jaar {rubriek: bedrag}; ontbrekende rubrieken zijn niet gerapporteerd
+    values = np.zeros((1, len(rows), len(LINE_ITEMS)), dtype=np.int64)
+    present = np.zeros(values.shape, dtype=bool)
+    for y, row in enumerate(rows):
+        for item, amount in row.items():
+            values[0, y, LINE_ITEMS.index(item)] = amount * 100
+            present[0, y, LINE_ITEMS.index(item)] = True
+    return FinancialStore(["A00001"], [str(2022 + y) for y in range(len(rows))], values, present)
+
+
+FULL = {
+    "Immateriële vaste activa": 0, "Materiële vaste activa": 100, "Financiële vaste activa": 0,
+    "Vorderingen en overlopende activa": 50, "Liquide middelen": 50, "Kortlopende schulden": 50,
+    "Eigen vermogen": 100, "Netto-omzet": 400, "Brutomarge": 200, "Bedrijfsresultaat": 40, "Nettowinst": 20,
+}
+
+
+def test_ratios():
+    ratios = ratios_for(make_store([FULL]), "A00001", "2022")
+    assert ratios["current_ratio"] == pytest.approx(2)
+    assert ratios["solvabiliteit"] == pytest.approx(50)
+    assert ratios["roe"] == pytest.approx(20)
+    assert ratios["winstmarge"] == pytest.approx(5)
+    assert ratios["werkkapitaal"] == pytest.approx(50)
+
+
+def test_zero_and_missing_denominators_give_nan():
+    zero = {**FULL, "Kortlopende schulden": 0, "Eigen vermogen": 0, "Netto-omzet": 0}
+    missing = {item: amount for item, amount in FULL.items() if item not in ("Kortlopende schulden", "Netto-omzet")}
+    frame = ratio_frame(make_store([zero, missing]))
+
+    for row in range(2):
+        for name in ("current_ratio", "quick_ratio", "winstmarge", "brutomarge"):
+            assert np.isnan(frame[name].iat[row]), (row, name)
+    assert np.isnan(frame["roe"].iat[0])
+    assert frame["solvabiliteit"].iat[0] == pytest.approx(0)
+    assert not np.isinf(frame[list(RATIO_COLUMNS)].to_numpy()).any()
+
+
+def test_nan_ratios_are_shown_as_not_applicable():
+    store = make_store([{**FULL, "Kortlopende schulden": 0}])
+    ratios = ratios_for(store, "A00001", "2022")
+    assert format_value(ratios["current_ratio"], RATIO) == "n.v.t."
+    assert format_value(ratios["solvabiliteit"], PERCENT) == "50.0%"
+    report = build_report(store, "A00001", "2022")
+    assert "Current Ratio: n.v.t." in report
+    assert not re.search(r"\bnan\b", report)
@@ -0,0 +1,103 @@
+import asyncio
+import threading
+from datetime import datetime, timedelta, timezone
+from email.utils import format_datetime
+
+import aiohttp
+import numpy as np
+import pytest
+
+from ingest import ingest_exports
+from snelstart_stub import StubData, start_stub
+from snelstart_sync import SnelStartClient, SyncConfig, SyncError, SyncStats, main, retry_after_seconds, sync
+from synthetic_data import synthetic_store
+
+N_ENTITIES, N_YEARS, SEED = 12, 3, 3
+
+# Snel genoeg voor een test; de backoff blijft zoals in productie
+FAST = {"rate_limit": 1000.0, "concurrency": 16}
+
+
+@pytest.fixture
+def stub(request):
+    # Stub in een eigen event loop op een achtergrondthread, zodat main()
+    # (met zijn eigen asyncio.run) ertegen kan draaien
+    options = getattr(request, "param", {})
+    data = StubData(N_ENTITIES, N_YEARS, seed=SEED, bookings_per_year=2)
+    loop = asyncio.new_event_loop()
+    thread = threading.Thread(target=loop.run_forever, daemon=True)
+    thread.start()
+    runner, url = asyncio.run_coroutine_threadsafe(start_stub(data, **options), loop).result()
+    yield url
+    asyncio.run_coroutine_threadsafe(runner.cleanup(), loop).result()
+    loop.call_soon_threadsafe(loop.stop)
+    thread.join()
+
+
+def run_main(url, out, monkeypatch, *args):
+    monkeypatch.setenv("SNELSTART_API_URL", url)
+    return main(["--out", str(out), "--rate", str(FAST["rate_limit"]), "--concurrency", str(FAST["concurrency"]), *args])
+
+
+def test_retry_after_seconds():
+    assert retry_after_seconds("3") == 3
+    assert retry_after_seconds(None) == 0
+    assert retry_after_seconds("morgen") == 0
+    later = format_datetime(datetime.now(timezone.utc) + timedelta(seconds=30), usegmt=True)
+    assert 25 < retry_after_seconds(later) <= 30
+    assert retry_after_seconds("Wed, 21 Oct 2015 07:28:00 GMT") == 0
+
+
+@pytest.mark.parametrize("stub", [{"failure_rate": 0.2, "retry_after": "Wed, 21 Oct 2015 07:28:00 GMT"}], indirect=True)
+def test_sync_with_failures_matches_synthetic_store(stub, tmp_path, monkeypatch):
+    out = tmp_path / "exports"
+    assert run_main(stub, out, monkeypatch) == 0
+    assert not (tmp_path / "exports.partial").exists()
+
+    store = ingest_exports([out]).to_store()
+    expected = synthetic_store(N_ENTITIES, N_YEARS, seed=SEED)
+    assert store.entities == expected.entities
+    assert store.years == expected.years
+    np.testing.assert_array_equal(store.present, expected.present)
+    np.testing.assert_array_equal(store.values, expected.values)
+
+
+@pytest.mark.parametrize("stub", [{"failure_rate": 1.0}], indirect=True)
+def test_exhausted_retry_budget_keeps_previous_exports(stub, tmp_path, monkeypatch):
+    out = tmp_path / "exports"
+    out.mkdir()
+    previous = out / "snelstart_api_0000.csv"
+    previous.write_text("vorige stand")
+    (tmp_path / "exports.partial").mkdir()
+
+    assert run_main(stub, out, monkeypatch, "--retries", "2") == 1
+    assert previous.read_text() == "vorige stand"
+    assert not (tmp_path / "exports.partial").exists()
+
+
+@pytest.mark.parametrize("stub", [{"failure_rate": 1.0}], indirect=True)
+def test_retry_budget_is_shared_by_the_run(stub):
+    config = SyncConfig(base_url=stub, retries=3, **FAST)
+    with pytest.raises(SyncError, match="retry-budget op"):
+        asyncio.run(sync(config, lambda frame: None))
+
+
+async def paged_requests(url, page_size, page_window=4):
+    # (aantal items, aantal verzoeken) voor één gepagineerde lijst
+    config = SyncConfig(base_url=url, page_size=page_size, page_window=page_window, **FAST)
+    stats = SyncStats()
+    async with aiohttp.ClientSession() as session:
+        items = await SnelStartClient(session, config, stats).paged("/administraties")
+    return [item["id"] for item in items], stats.requests
+
+
+@pytest.mark.parametrize("page_size, requests", [
+    (20, 1),  # past op één pagina
+    (12, 2),  # precies één volle pagina: daarna een lege
+    (5, 4),   # 1 + 1 + 2 pagina's; de derde pagina is de laatste
+    (1, 16),  # 1 + vensters 1, 2, 4, 4, 4; de 13e pagina is leeg
+])
+def test_paging_windows(stub, page_size, requests):
+    ids, made = asyncio.run(paged_requests(stub, page_size))
+    assert ids == [f"A{i:05d}" for i in range(1, N_ENTITIES + 1)]
+    assert made == requests
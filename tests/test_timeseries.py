@@ -0,0 +1,63 @@
+import numpy as np
+import pandas as pd
+import pytest
+
+from timeseries import downsample, lttb, minmax_buckets
+
+
+@pytest.fixture
+def series():
+    rng = np.random.default_rng(4)
+    values = np.cumsum(rng.normal(size=10_000))
+    # Eén uitschieter naar boven en één naar beneden
+    values[3_333] += 500
+    values[6_666] -= 500
+    return pd.date_range("2000-01-01", periods=len(values), freq="D"), values
+
+
+def test_lttb_keeps_endpoints_and_length(series):
+    index, values = series
+    picks = lttb(np.arange(len(values)), values, 500)
+    assert len(picks) == 500
+    assert picks[0] == 0 and picks[-1] == len(values) - 1
+    assert (np.diff(picks) > 0).all()
+    # Uitschieters vallen op in hun driehoek
+    assert {3_333, 6_666} <= set(picks)
+
+
+def test_minmax_keeps_endpoints_and_extremes(series):
+    _, values = series
+    picks = minmax_buckets(values, 100)
+    assert len(picks) <= 202
+    assert picks[0] == 0 and picks[-1] == len(values) - 1
+    assert (np.diff(picks) > 0).all()
+    assert {int(values.argmin()), int(values.argmax())} <= set(picks)
+    # Per bucket het eigen minimum en maximum
+    size = len(values) // 100
+    for bucket in range(100):
+        block = values[bucket * size:(bucket + 1) * size]
+        assert {bucket * size + int(block.argmin()), bucket * size + int(block.argmax())} <= set(picks)
+
+
+@pytest.mark.parametrize("method", ["lttb", "minmax"])
+def test_downsample_respects_max_points(series, method):
+    index, values = series
+    x, y = downsample(index, values, 400, method)
+    if method == "lttb":
+        assert len(x) == 400
+    else:
+        assert len(x) <= 400
+    assert x[0] == index[0] and x[-1] == index[-1]
+    np.testing.assert_array_equal(y, values[index.get_indexer(x)])
+
+
+@pytest.mark.parametrize("method", ["lttb", "minmax"])
+@pytest.mark.parametrize("n", [0, 1, 399, 400])
+def test_short_series_pass_through(method, n):
+    index = pd.date_range("2020-01-01", periods=n, freq="D")
+    values = np.arange(n, dtype=np.float64)
+    x, y = downsample(index, values, 400, method)
+    assert x.equals(index)
+    np.testing.assert_array_equal(y, values)
+    assert len(lttb(np.arange(n), values, n)) == n
+    assert len(minmax_buckets(values, n)) == n
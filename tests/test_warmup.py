@@ -0,0 +1,33 @@
+from figures import FIGURES
+from synthetic_data import synthetic_store
+from warmup import PREPARE_STEPS, WarmupProgress, iter_warmup_tasks, start_warmup, warmup_tasks
+
+
+def test_tasks_cover_the_grid_most_recent_year_first():
+    store = synthetic_store(5, 3, late_start=0)
+    tasks = list(iter_warmup_tasks(store))
+    assert tasks[0][2] in (store.years[-1], None)
+    assert {(entity, year) for _, entity, year in tasks if year} == {(e, y) for e in store.entities for y in store.years}
+    # Jaaronafhankelijke figuren één keer per administratie
+    assert sum(1 for _, _, year in tasks if year is None) == len(store.entities) * sum(
+        not per_year for _, per_year in FIGURES.values())
+
+
+def test_limit_reports_skipped_entities():
+    store = synthetic_store(40, 2, late_start=0, seed=5)
+    tasks = warmup_tasks(store, limit=30)
+    assert len(tasks) == 30
+    warmed = {entity for _, entity, _ in tasks}
+
+    progress = start_warmup(store, limit=30)
+    assert progress.total == len(PREPARE_STEPS) + 30
+    assert set(progress.skipped) == set(store.entities) - warmed
+    assert progress.skipped and len(progress.skipped) + len(warmed) == len(store.entities)
+
+
+def test_progress():
+    progress = WarmupProgress("v", 2)
+    assert progress.running and progress.skipped == ()
+    progress.advance()
+    progress.advance(failed=True)
+    assert not progress.running and progress.fraction == 1 and progress.errors == 1
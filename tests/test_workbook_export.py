@@ -0,0 +1,65 @@
+import io
+
+import openpyxl
+import pytest
+
+import workbook_export
+from synthetic_data import synthetic_store
+from workbook_export import SheetWriter, workbook_file, write_workbook
+
+
+@pytest.fixture
+def store():
+    return synthetic_store(10, 3, late_start=0)
+
+
+def data_rows(sheet):
+    return list(sheet.iter_rows(min_row=2, values_only=True))
+
+
+def test_sheet_writer_rolls_over_at_row_limit(monkeypatch):
+    # Kopregel plus 4 rijen per blad
+    monkeypatch.setattr(workbook_export, "EXCEL_MAX_ROWS", 5)
+    workbook = openpyxl.Workbook(write_only=True)
+    writer = SheetWriter(workbook, "Test", ["a", "b"])
+    writer.write([i, i * 2] for i in range(10))
+    writer.close()
+    assert writer.rows == 10 and writer.sheets == 3
+    assert workbook.sheetnames == ["Test", "Test (2)", "Test (3)"]
+    workbook.save(io.BytesIO())
+
+
+def test_empty_sheet_has_header():
+    workbook = openpyxl.Workbook(write_only=True)
+    writer = SheetWriter(workbook, "Leeg", ["a"])
+    writer.close()
+    assert writer.rows == 0 and workbook.sheetnames == ["Leeg"]
+    workbook.save(io.BytesIO())
+
+
+def test_workbook_rollover_keeps_every_row(store, monkeypatch, tmp_path):
+    monkeypatch.setattr(workbook_export, "EXCEL_MAX_ROWS", 8)
+    path = tmp_path / "export.xlsx"
+    counts = write_workbook(store, path)
+    # Elke administratie heeft elk jaar een balans: 30 rijen, 7 per blad
+    assert counts["Balans"] == 30
+
+    workbook = openpyxl.load_workbook(path, read_only=True)
+    balance = [name for name in workbook.sheetnames if name.startswith("Balans")]
+    assert balance == ["Balans", "Balans (2)", "Balans (3)", "Balans (4)", "Balans (5)"]
+    rows = [row for name in balance for row in data_rows(workbook[name])]
+    assert [len(data_rows(workbook[name])) for name in balance] == [7, 7, 7, 7, 2]
+    assert len(rows) == counts["Balans"]
+    assert [row[:3] for row in rows[:3]] == [("A00001", store.entity_names[0], int(y)) for y in store.years]
+    assert rows[0][3:] == tuple(store.values[0, 0, store.item_index(item)] / 100 for item in
+                                workbook_export.STATEMENTS["balance"])
+
+
+def test_workbook_file_is_readable(store):
+    handle = workbook_file(store, entities=["A00002"])
+    try:
+        workbook = openpyxl.load_workbook(handle, read_only=True)
+        assert workbook.sheetnames == ["Balans", "Winst & verlies", "Kasstroom", "Ratio's"]
+        assert {row[0] for row in data_rows(workbook["Balans"])} == {"A00002"}
+    finally:
+        handle.close()
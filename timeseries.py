@@ -0,0 +1,173 @@
+import numpy as np
+import pandas as pd
+
+from ingest import BALANCE_RUBRICS, CREDIT_RUBRICS, LEDGER_RUBRICS
+
+# Label in de UI -> pandas periode-alias
+GRANULARITIES = {
+    "Jaar": "YE",
+    "Kwartaal": "QE",
+    "Maand": "ME",
+    "Dag": "D",
+}
+
+# Richtwaarde: ongeveer één punt per horizontale pixel van een grafiek
+DEFAULT_MAX_POINTS = 1200
+
+FLOW_METRICS = ("Netto-omzet", "Brutomarge", "Bedrijfskosten", "Bedrijfsresultaat", "Nettowinst")
+BALANCE_METRICS = ("Liquide middelen", "Eigen vermogen", "Vorderingen en overlopende activa", "Kortlopende schulden")
+
+# Administraties per blok bij maandcijfers voor de hele portefeuille:
+# het raster is blok x maanden x rubrieken, dus begrensd in geheugen
+MONTHLY_BLOCK = 256
+
+SIGNS = np.array([-1 if r in CREDIT_RUBRICS else 1 for r in LEDGER_RUBRICS], dtype=np.int64)
+
+
+def daily_matrix(daily, entity):
+    # Dag x rubriek met getekende bedragen in euro's, doorlopende datumindex
+    rows = daily[daily["entity"] == entity]
+    if rows.empty:
+        return pd.DataFrame(columns=list(LEDGER_RUBRICS), dtype=np.float64)
+    matrix = rows.pivot_table(index="date", columns="rubric", values="cents", aggfunc="sum", fill_value=0)
+    matrix = matrix.reindex(columns=list(LEDGER_RUBRICS), fill_value=0)
+    matrix = matrix.reindex(pd.date_range(matrix.index.min(), matrix.index.max(), freq="D"), fill_value=0)
+    return matrix * SIGNS / 100
+
+
+def period_series(daily, entity, granularity="Maand"):
+    """Stromen (som per periode) en balansstanden (stand aan periode-einde)."""
+    matrix = daily_matrix(daily, entity)
+    flows = pd.DataFrame(index=matrix.index)
+    flows["Netto-omzet"] = matrix["Netto-omzet"]
+    flows["Brutomarge"] = matrix["Netto-omzet"] - matrix["Kostprijs van de omzet"]
+    flows["Bedrijfskosten"] = matrix["Bedrijfskosten"]
+    flows["Bedrijfsresultaat"] = flows["Brutomarge"] - flows["Bedrijfskosten"]
+    flows["Nettowinst"] = flows["Bedrijfsresultaat"] + matrix["Financiële baten en lasten"]
+
+    balances = matrix[list(BALANCE_RUBRICS)].cumsum()
+    balances["Eigen vermogen"] += flows["Nettowinst"].cumsum()
+
+    rule = GRANULARITIES[granularity]
+    if rule == "D":
+        return pd.concat([flows, balances[list(BALANCE_METRICS)]], axis=1)
+    return pd.concat([
+        flows.resample(rule).sum(),
+        balances[list(BALANCE_METRICS)].resample(rule).last(),
+    ], axis=1)
+
+
+def _monthly_block(daily, codes, block):
+    # Alleen de rijen van dit blok: daily staat gesorteerd op administratie
+    ordered = sorted(block)
+    lo = np.searchsorted(codes, ordered[0], side="left")
+    hi = np.searchsorted(codes, ordered[-1], side="right")
+    rows = daily.iloc[lo:hi]
+    e = pd.Categorical(rows["entity"], categories=block).codes.astype(np.int64)
+    keep = e >= 0
+    e = e[keep]
+    if not len(e):
+        return None
+    months = rows["date"].to_numpy()[keep].astype("datetime64[M]").astype(np.int64)
+    r = pd.Categorical(rows["rubric"], categories=LEDGER_RUBRICS).codes[keep].astype(np.int64)
+    cents = rows["cents"].to_numpy()[keep]
+
+    # Eerste en laatste maand per administratie, zoals de datumindex van period_series
+    n, first_month = len(block), int(months.min())
+    n_months, n_rubrics = int(months.max()) - first_month + 1, len(LEDGER_RUBRICS)
+    first = np.full(n, np.iinfo(np.int64).max)
+    last = np.full(n, np.iinfo(np.int64).min)
+    np.minimum.at(first, e, months)
+    np.maximum.at(last, e, months)
+
+    flat = (e * n_months + (months - first_month)) * n_rubrics + r
+    grid = np.bincount(flat, weights=cents, minlength=n * n_months * n_rubrics)
+    grid = np.rint(grid).astype(np.int64).reshape(n, n_months, n_rubrics) * SIGNS
+
+    rubric = {name: grid[:, :, i] for i, name in enumerate(LEDGER_RUBRICS)}
+    flows = {"Netto-omzet": rubric["Netto-omzet"]}
+    flows["Brutomarge"] = rubric["Netto-omzet"] - rubric["Kostprijs van de omzet"]
+    flows["Bedrijfskosten"] = rubric["Bedrijfskosten"]
+    flows["Bedrijfsresultaat"] = flows["Brutomarge"] - flows["Bedrijfskosten"]
+    flows["Nettowinst"] = flows["Bedrijfsresultaat"] + rubric["Financiële baten en lasten"]
+    balances = {name: np.cumsum(rubric[name], axis=1) for name in BALANCE_METRICS}
+    balances["Eigen vermogen"] = balances["Eigen vermogen"] + np.cumsum(flows["Nettowinst"], axis=1)
+
+    month = first_month + np.arange(n_months)
+    active = (month >= first[:, None]) & (month <= last[:, None])
+    ent, pos = np.nonzero(active)
+    frame = pd.DataFrame({
+        "entity": np.asarray(block, dtype=object)[ent],
+        "year": 1970 + month[pos] // 12,
+        "month": month[pos] % 12 + 1,
+    })
+    for name, values in {**flows, **balances}.items():
+        frame[name] = values[ent, pos] / 100
+    return frame
+
+
+def monthly_blocks(daily, entities, block_size=MONTHLY_BLOCK):
+    """Maandcijfers (als ``period_series(..., "Maand")``) voor veel administraties.
+
+    Per blok van ``block_size`` administraties één frame met entity, year,
+    month, FLOW_METRICS en BALANCE_METRICS; administraties zonder mutaties
+    ontbreken. Gevectoriseerd per blok in plaats van een pivot per administratie.
+    """
+    codes = daily["entity"].to_numpy(dtype=object)
+    for start in range(0, len(entities), block_size):
+        frame = _monthly_block(daily, codes, list(entities[start:start + block_size]))
+        if frame is not None:
+            yield frame
+
+
+def lttb(x, y, threshold=DEFAULT_MAX_POINTS):
+    """Largest-Triangle-Three-Buckets: behoudt de visuele vorm met ``threshold`` punten."""
+    n = len(y)
+    if threshold >= n or threshold < 3:
+        return np.arange(n)
+
+    x = np.asarray(x, dtype=np.float64)
+    y = np.asarray(y, dtype=np.float64)
+    edges = np.linspace(1, n - 1, threshold - 1).astype(np.int64)
+    selected = np.empty(threshold, dtype=np.int64)
+    selected[0], selected[-1] = 0, n - 1
+
+    a = 0
+    for i in range(threshold - 2):
+        start, end = edges[i], edges[i + 1]
+        next_start, next_end = edges[i + 1], edges[i + 2] if i + 2 < len(edges) else n
+        avg_x = x[next_start:next_end].mean()
+        avg_y = y[next_start:next_end].mean()
+        area = np.abs(
+            (x[a] - avg_x) * (y[start:end] - y[a]) - (x[a] - x[start:end]) * (avg_y - y[a])
+        )
+        a = start + int(np.argmax(area))
+        selected[i + 1] = a
+    return selected
+
+
+def minmax_buckets(y, n_buckets=DEFAULT_MAX_POINTS // 2 - 1):
+    # Per bucket het minimum en maximum, plus het eerste en laatste punt
+    # (hooguit 2 * n_buckets + 2 punten); volledig gevectoriseerd
+    n = len(y)
+    if n <= 2 * n_buckets + 2:
+        return np.arange(n)
+    y = np.asarray(y, dtype=np.float64)
+    size = n // n_buckets
+    usable = size * n_buckets
+    blocks = y[:usable].reshape(n_buckets, size)
+    offsets = np.arange(n_buckets) * size
+    picks = np.concatenate([[0, n - 1], offsets + blocks.argmin(axis=1), offsets + blocks.argmax(axis=1)])
+    return np.unique(picks)
+
+
+def downsample(index, values, max_points=DEFAULT_MAX_POINTS, method="lttb"):
+    values = np.asarray(values, dtype=np.float64)
+    if len(values) <= max_points:
+        return index, values
+    if method == "minmax":
+        picks = minmax_buckets(values, max(max_points // 2 - 1, 1))
+    else:
+        x = np.asarray(index.asi8 if isinstance(index, pd.DatetimeIndex) else index, dtype=np.float64)
+        picks = lttb(x, values, max_points)
+    return index[picks], values[picks]
@@ -0,0 +1,118 @@
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from itertools import islice
+
+from deltas import year_deltas
+from entity_search import search_index
+from figures import FIGURES, figure_cache, get_figure
+from health import health
+from peer_benchmarks import peer_benchmarks
+from ratios import ratio_frame
+
+# Eén achtergrondthread: opwarmen mag nooit met de interactieve sessies
+# concurreren om meer dan één core
+_executor = ThreadPoolExecutor(max_workers=1, thread_name_prefix="cache-warmup")
+_runs = {}
+_MAX_RUNS = 8
+_lock = threading.Lock()
+
+# Datasetbrede voorbereidingen, vóór de figuren
+PREPARE_STEPS = (ratio_frame, health, year_deltas, search_index, peer_benchmarks)
+
+
+class WarmupProgress:
+    def __init__(self, version, total, skipped=()):
+        self.version = version
+        self.total = total
+        # Administraties zonder enige opgewarmde figuur (buiten de figuurcache)
+        self.skipped = tuple(skipped)
+        self.done = 0
+        self.errors = 0
+        self.started_at = time.time()
+        self.finished_at = None
+        self._lock = threading.Lock()
+
+    def advance(self, failed=False):
+        with self._lock:
+            self.done += 1
+            self.errors += int(failed)
+            if self.done >= self.total:
+                self.finished_at = time.time()
+
+    @property
+    def running(self):
+        return self.finished_at is None
+
+    @property
+    def fraction(self):
+        return self.done / self.total if self.total else 1.0
+
+    @property
+    def elapsed(self):
+        return (self.finished_at or time.time()) - self.started_at
+
+
+def iter_warmup_tasks(store, entities=None):
+    # Meest recente jaren eerst
+    entities = list(entities or store.entities)
+    for year in reversed(store.years):
+        for entity in entities:
+            for figure_id, (_, per_year) in FIGURES.items():
+                if per_year:
+                    if figure_id == "kasstroom" and not store.has(entity, year, "Netto kasstroom"):
+                        continue
+                    if not store.has(entity, year, "Eigen vermogen"):
+                        continue
+                    yield figure_id, entity, year
+                elif year == store.years[-1]:
+                    yield figure_id, entity, None
+
+
+def warmup_tasks(store, entities=None, limit=None):
+    # Niet meer figuren dan de cache kan houden; stopt zodra dat aantal er is,
+    # zodat het script van de sessie niet op de hele portefeuille wacht
+    return list(islice(iter_warmup_tasks(store, entities), limit or figure_cache.maxsize))
+
+
+def _run(store, tasks, progress):
+    for prepare in PREPARE_STEPS:
+        try:
+            prepare(store)
+            progress.advance()
+        except Exception:
+            progress.advance(failed=True)
+    for figure_id, entity, year in tasks:
+        try:
+            get_figure(figure_id, store, entity, year)
+            progress.advance()
+        except Exception:
+            progress.advance(failed=True)
+
+
+def start_warmup(store, entities=None, limit=None):
+    """Start (eenmalig per datasetversie) het opwarmen van ratio- en figuurcaches.
+
+    Keert direct terug met een ``WarmupProgress``; het werk loopt op de
+    achtergrondthread.
+    """
+    with _lock:
+        progress = _runs.get(store.version)
+        if progress is not None:
+            return progress
+        tasks = warmup_tasks(store, entities, limit)
+        # Boven de figuurcache vallen administraties buiten de opwarmronde;
+        # die worden bijgehouden zodat de diagnostiek ze kan tonen
+        warmed = {entity for _, entity, _ in tasks}
+        skipped = [entity for entity in (entities or store.entities) if entity not in warmed]
+        progress = WarmupProgress(store.version, len(PREPARE_STEPS) + len(tasks), skipped)
+        _runs[store.version] = progress
+        while len(_runs) > _MAX_RUNS:
+            _runs.pop(next(iter(_runs)))
+    _executor.submit(_run, store, tasks, progress)
+    return progress
+
+
+def warmup_progress(store):
+    with _lock:
+        return _runs.get(store.version)
@@ -0,0 +1,216 @@
+"""Excel-export van balans, winst & verlies, kasstroom, ratio's en maandcijfers.
+
+openpyxl in write-only modus: rijen gaan direct naar (tijdelijke) XML op
+schijf, dus het geheugengebruik blijft begrensd, ook bij honderdduizenden
+rijen. Rijen worden per blok administraties uit de store-arrays gemaakt;
+een blad dat groter wordt dan Excel toestaat loopt door in "<naam> (2)".
+
+    python workbook_export.py --out portefeuille.xlsx
+    python workbook_export.py --out A00042.xlsx --entities A00042
+"""
+import argparse
+import tempfile
+import time
+
+import numpy as np
+
+from financial_store import STATEMENTS
+from ratios import RATIO_COLUMNS, ratio_frame
+from timeseries import BALANCE_METRICS, FLOW_METRICS, monthly_blocks
+
+# Excel: 1.048.576 rijen per blad, inclusief de kopregel
+EXCEL_MAX_ROWS = 1_048_576
+
+# Administraties per blok bij het opbouwen van de rijen
+EXPORT_BLOCK = 512
+
+STATEMENT_SHEETS = {
+    "balance": "Balans",
+    "profit_loss": "Winst & verlies",
+    "cash_flow": "Kasstroom",
+}
+
+RATIO_LABELS = {
+    "current_ratio": "Current ratio",
+    "quick_ratio": "Quick ratio",
+    "solvabiliteit": "Solvabiliteit (%)",
+    "roe": "ROE (%)",
+    "roa": "ROA (%)",
+    "winstmarge": "Winstmarge (%)",
+    "brutomarge": "Brutomarge (%)",
+    "werkkapitaal": "Werkkapitaal",
+}
+
+XLSX_MIME = "application/vnd.openxmlformats-officedocument.spreadsheetml.sheet"
+
+
+class SheetWriter:
+    # Rijen naar een write-only blad; bij de rijlimiet verder in een nieuw blad
+    def __init__(self, workbook, title, header, widths=None):
+        self.workbook = workbook
+        self.title = title
+        self.header = header
+        self.widths = widths or {}
+        self.rows = 0
+        self.sheets = 0
+        self._sheet = None
+        self._free = 0
+
+    def _next_sheet(self):
+        from openpyxl.cell import WriteOnlyCell
+        from openpyxl.styles import Font
+
+        self.sheets += 1
+        title = self.title if self.sheets == 1 else f"{self.title} ({self.sheets})"
+        sheet = self.workbook.create_sheet(title)
+        sheet.freeze_panes = "A2"
+        for column, width in self.widths.items():
+            sheet.column_dimensions[column].width = width
+        header = []
+        for label in self.header:
+            cell = WriteOnlyCell(sheet, value=label)
+            cell.font = Font(bold=True)
+            header.append(cell)
+        sheet.append(header)
+        self._sheet = sheet
+        self._free = EXCEL_MAX_ROWS - 1
+
+    def write(self, rows):
+        for row in rows:
+            if not self._free:
+                self._next_sheet()
+            self._sheet.append(row)
+            self._free -= 1
+            self.rows += 1
+
+    def close(self):
+        # Ook zonder rijen een blad met kopregel
+        if self._sheet is None:
+            self._next_sheet()
+
+
+def _cells(values, missing):
+    # Bedragen als Python-objecten, lege cel (None) waar niets bekend is
+    cells = values.astype(object)
+    cells[missing] = None
+    return cells.tolist()
+
+
+def _entity_blocks(positions):
+    for start in range(0, len(positions), EXPORT_BLOCK):
+        yield positions[start:start + EXPORT_BLOCK]
+
+
+def _statement_rows(store, positions, items):
+    columns = [store.item_index(item) for item in items]
+    years = np.array(store.years, dtype=object)
+    for block in _entity_blocks(positions):
+        present = store.present[block][:, :, columns]
+        # Alleen (administratie, jaar) waarin iets van dit overzicht gerapporteerd is
+        e, y = np.nonzero(present.any(axis=2))
+        values = _cells(store.values[block][:, :, columns][e, y] / 100, ~present[e, y])
+        entities = np.array(store.entities, dtype=object)[block][e]
+        names = np.array(store.entity_names, dtype=object)[block][e]
+        for entity, name, year, amounts in zip(entities, names, years[y], values):
+            yield [entity, name, int(year), *amounts]
+
+
+def _ratio_rows(store, positions):
+    frame = ratio_frame(store)
+    n_years = len(store.years)
+    ratios = frame[list(RATIO_COLUMNS)].to_numpy()
+    years = np.array(store.years, dtype=object)
+    for block in _entity_blocks(positions):
+        rows = (np.asarray(block)[:, None] * n_years + np.arange(n_years)).reshape(-1)
+        values = ratios[rows]
+        # Jaren zonder enige ratio (geen cijfers) overslaan
+        keep = ~np.isnan(values).all(axis=1)
+        rows, values = rows[keep], values[keep]
+        cells = _cells(values, np.isnan(values))
+        entities = np.array(store.entities, dtype=object)[rows // n_years]
+        names = np.array(store.entity_names, dtype=object)[rows // n_years]
+        for entity, name, year, amounts in zip(entities, names, years[rows % n_years], cells):
+            yield [entity, name, int(year), *amounts]
+
+
+def _monthly_rows(store, daily, positions):
+    entities = [store.entities[p] for p in positions]
+    names = dict(zip(store.entities, store.entity_names))
+    metrics = list(FLOW_METRICS + BALANCE_METRICS)
+    for frame in monthly_blocks(daily, entities):
+        values = frame[metrics].to_numpy().tolist()
+        for entity, year, month, amounts in zip(frame["entity"], frame["year"].tolist(), frame["month"].tolist(), values):
+            yield [entity, names.get(entity, entity), year, month, *amounts]
+
+
+def write_workbook(store, target, entities=None, daily=None):
+    """Werkmap naar ``target`` (pad of binair bestandsobject); alle administraties als ``entities`` None is.
+
+    Maandcijfers alleen als er dagtotalen (``daily``) zijn, dus bij
+    ingelezen grootboekexports. Geeft het aantal rijen per blad terug.
+    """
+    # openpyxl (~0,5 s importtijd) pas bij de eerste export laden
+    from openpyxl import Workbook
+
+    positions = list(range(len(store.entities))) if entities is None else [store.entity_index(e) for e in entities]
+    workbook = Workbook(write_only=True)
+    key = ["Administratie", "Naam", "Jaar"]
+    widths = {"A": 14, "B": 32}
+    counts = {}
+
+    for statement, title in STATEMENT_SHEETS.items():
+        items = STATEMENTS[statement]
+        writer = SheetWriter(workbook, title, key + list(items), widths)
+        writer.write(_statement_rows(store, positions, items))
+        writer.close()
+        counts[title] = writer.rows
+
+    writer = SheetWriter(workbook, "Ratio's", key + [RATIO_LABELS[name] for name in RATIO_COLUMNS], widths)
+    writer.write(_ratio_rows(store, positions))
+    writer.close()
+    counts["Ratio's"] = writer.rows
+
+    if daily is not None:
+        writer = SheetWriter(workbook, "Maandcijfers", key + ["Maand", *FLOW_METRICS, *BALANCE_METRICS], widths)
+        writer.write(_monthly_rows(store, daily, positions))
+        writer.close()
+        counts["Maandcijfers"] = writer.rows
+
+    workbook.save(target)
+    return counts
+
+
+def workbook_file(store, entities=None, daily=None):
+    # Voor st.download_button(data=...): pas bij de klik opgebouwd, op schijf
+    # in plaats van in het geheugen; het tijdelijke bestand verdwijnt bij close.
+    # Ongebufferd, want Streamlit leest alleen bytes, BytesIO en raw/reader-bestanden
+    handle = tempfile.TemporaryFile(prefix="snelstart-export-", suffix=".xlsx", buffering=0)
+    write_workbook(store, handle, entities, daily)
+    handle.seek(0)
+    return handle
+
+
+def workbook_filename(entity=None):
+    return f"{entity}_cijfers.xlsx" if entity else "portefeuille_cijfers.xlsx"
+
+
+def main(argv=None):
+    from dataset import load_daily_totals, load_dataset
+    from ingest import export_paths_from_env
+
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--out", required=True, help="Excel-bestand (.xlsx)")
+    parser.add_argument("--exports", nargs="*", default=None, help="exportbestanden of -mappen (standaard SNELSTART_EXPORTS)")
+    parser.add_argument("--entities", nargs="*", default=None, help="administraties (standaard alle)")
+    args = parser.parse_args(argv)
+
+    export_paths = tuple(export_paths_from_env() if args.exports is None else args.exports)
+    started = time.perf_counter()
+    store = load_dataset(export_paths)
+    counts = write_workbook(store, args.out, args.entities, load_daily_totals(export_paths))
+    print(", ".join(f"{title}: {rows:,}".replace(",", ".") for title, rows in counts.items())
+          + f" rijen -> {args.out} ({time.perf_counter() - started:.1f}s)")
+
+
+if __name__ == "__main__":
+    main()